@@ -0,0 +1,221 @@
+# to run:
+# python asset_cache.py fetch checkpoints/*.jsonl --cache assets
+# python asset_cache.py path assets "https://cdn.metatft.com/file/metatft/tacticians/x.png"
+import os
+import re
+import json
+import glob
+import asyncio
+import hashlib
+import argparse
+import tempfile
+from urllib.parse import urljoin, urlsplit
+from http_fetcher import HttpFetcher
+
+SITE = 'https://www.metatft.com/'
+ASSET_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.webp', '.gif', '.svg', '.avif')
+# <host>/cdn-cgi/image/<options>/<source>, the source being a full URL or a path on the same host
+CDN_RESIZE = re.compile(r'^(https?://[^/]+)/cdn-cgi/image/[^/]+/(.+)$')
+CSS_URL = re.compile(r'url\(\s*[\'"]?([^\'")]+)[\'"]?\s*\)')
+
+
+def normalize_asset_url(url):
+    """Absolute URL of the original image: relative paths are resolved and cdn-cgi resizing is dropped"""
+    url = urljoin(SITE, url.strip())
+    resized = CDN_RESIZE.match(url)
+    if resized:
+        host, source = resized.groups()
+        url = source if source.startswith(('http://', 'https://')) else f"{host}/{source}"
+    return url
+
+def is_asset_url(url):
+    return urlsplit(url).path.lower().endswith(ASSET_EXTENSIONS)
+
+def urls_in_text(text):
+    """Asset URLs in a src value or a CSS declaration such as mask-image: url(...)"""
+    text = str(text or '')
+    found = CSS_URL.findall(text) or [text]
+    return [url for url in found if is_asset_url(url.strip())]
+
+def collect_asset_urls(obj, urls=None):
+    """Every asset URL in nested match data"""
+    urls = set() if urls is None else urls
+    if isinstance(obj, dict):
+        for value in obj.values():
+            collect_asset_urls(value, urls)
+    elif isinstance(obj, (list, tuple)):
+        for value in obj:
+            collect_asset_urls(value, urls)
+    elif isinstance(obj, str) and ('/' in obj or 'url(' in obj):
+        urls.update(urls_in_text(obj))
+    return urls
+
+
+class AssetCache:
+    """
+    Local copies of the icons referenced by scraped pages and match data.
+
+    collect() only records URLs, so it is cheap enough to call while parsing.
+    fetch_pending() then downloads every new URL once over a pooled
+    HttpFetcher. Files are stored by the sha256 of their content, so the
+    resized and raw variants of one icon share one file. index.json maps
+    every URL seen (as written and normalized) to its hash; lookups never
+    touch the network.
+    """
+
+    def __init__(self, directory='assets', concurrency=8, fetcher=None):
+        self.directory = directory
+        self.concurrency = concurrency
+        self.fetcher = fetcher
+        self.index_path = os.path.join(directory, 'index.json')
+        os.makedirs(directory, exist_ok=True)
+        self.index = {}
+        if os.path.exists(self.index_path):
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                self.index = json.load(f)
+        # normalized URL -> URLs as written on the page, waiting for fetch_pending
+        self.pending = {}
+        self.fetched = 0
+        self.failed = 0
+
+    def __contains__(self, url):
+        return url in self.index or normalize_asset_url(url) in self.index
+
+    def add_url(self, url):
+        if url in self.index:
+            return
+        normalized = normalize_asset_url(url)
+        if normalized in self.index:
+            self.index[url] = self.index[normalized]
+            return
+        self.pending.setdefault(normalized, set()).add(url)
+
+    def collect(self, match_data):
+        for url in collect_asset_urls(match_data):
+            self.add_url(url)
+
+    def collect_soup(self, soup):
+        """Image sources and CSS url() values of a parsed page"""
+        for tag in soup.select('img[src], image[href], [style*="url("]'):
+            for value in (tag.get('src'), tag.get('href'), tag.get('style')):
+                if value:
+                    for url in urls_in_text(value):
+                        self.add_url(url)
+
+    def blob_path(self, digest, url):
+        extension = os.path.splitext(urlsplit(url).path)[1].lower() or '.bin'
+        return os.path.join(self.directory, 'blobs', digest[:2], f"{digest}{extension}")
+
+    def _store(self, url, content):
+        digest = hashlib.sha256(content).hexdigest()
+        path = self.blob_path(digest, url)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # identical content means an identical path, so concurrent writers each need their own temp file
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(content)
+                os.replace(tmp_path, path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+        return f"{digest}{os.path.splitext(path)[1]}"
+
+    def save(self):
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.index, f, indent=0, sort_keys=True)
+        os.replace(tmp_path, self.index_path)
+
+    async def fetch_pending(self):
+        """Download every collected URL not in the cache yet; returns how many were stored"""
+        pending, self.pending = self.pending, {}
+        if not pending:
+            return 0
+        fetcher = self.fetcher or HttpFetcher(pool_size=self.concurrency)
+        fetched_before = self.fetched
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def fetch(url):
+            async with semaphore:
+                content = None
+                # the normalized URL first, then the variants as written on the page
+                for candidate in [url, *sorted(pending[url] - {url})]:
+                    content = await asyncio.to_thread(fetcher.get_content, candidate)
+                    if content:
+                        break
+                if not content:
+                    self.failed += 1
+                    return
+                try:
+                    key = await asyncio.to_thread(self._store, url, content)
+                except OSError as e:
+                    print(f"Could not store asset {url}: {e}")
+                    self.failed += 1
+                    # kept for the next fetch_pending call
+                    self.pending.setdefault(url, set()).update(pending[url])
+                    return
+                self.fetched += 1
+                for alias in {url, *pending[url]}:
+                    self.index[alias] = key
+
+        try:
+            await asyncio.gather(*(fetch(url) for url in pending))
+        finally:
+            if self.fetcher is None:
+                fetcher.close()
+            self.save()
+        return self.fetched - fetched_before
+
+    def path(self, url):
+        """Local file of a cached URL, None when it was never fetched"""
+        key = self.index.get(url) or self.index.get(normalize_asset_url(url))
+        if key is None:
+            return None
+        return os.path.join(self.directory, 'blobs', key[:2], key)
+
+    def rewrite(self, obj):
+        """Copy of match data with every cached URL replaced by its local file"""
+        if isinstance(obj, dict):
+            return {key: self.rewrite(value) for key, value in obj.items()}
+        if isinstance(obj, list):
+            return [self.rewrite(value) for value in obj]
+        if isinstance(obj, str):
+            for url in urls_in_text(obj):
+                path = self.path(url)
+                if path is not None:
+                    obj = obj.replace(url, path)
+        return obj
+
+
+def argparse_args():
+    parser = argparse.ArgumentParser(description='Local cache of the icons referenced by scraped matches')
+    commands = parser.add_subparsers(dest='command', required=True)
+    fetch = commands.add_parser('fetch', help='Download the assets referenced by history/lobby result files')
+    fetch.add_argument('inputs', nargs='+', help='.jsonl files or glob patterns')
+    fetch.add_argument('--cache', default='assets', help='Cache directory')
+    fetch.add_argument('--concurrency', type=int, default=8, help='Downloads in flight')
+    path = commands.add_parser('path', help='Print the local file of a cached URL')
+    path.add_argument('cache', help='Cache directory')
+    path.add_argument('url', help='Asset URL')
+    return parser.parse_args()
+
+async def main():
+    args = argparse_args()
+    if args.command == 'path':
+        print(AssetCache(args.cache).path(args.url) or 'not cached')
+        return
+    cache = AssetCache(args.cache, args.concurrency)
+    for path in sorted({path for pattern in args.inputs for path in glob.glob(pattern)}):
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    cache.collect(json.loads(line))
+    print(f"{len(cache.pending)} new assets")
+    await cache.fetch_pending()
+    print(f"{cache.fetched} fetched, {cache.failed} failed, {len(cache.index)} URLs cached in {args.cache}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
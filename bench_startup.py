@@ -0,0 +1,58 @@
+# to run:
+# python bench_startup.py
+# python bench_startup.py -n 20 --modules metatft_getdata history
+import sys
+import time
+import json
+import argparse
+import subprocess
+from statistics import median
+
+MODULES = ('metatft_getdata', 'history', 'lobby', 'distributed', 'output', 'match_index')
+# dependencies that should only load on the code paths that use them
+HEAVY = ('playwright', 'bs4', 'numpy', 'dotenv', 'pyperclip', 'tabulate')
+
+PROBE = '''
+import sys, time, json
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+print(json.dumps({{"ms": elapsed * 1000, "heavy": sorted(m for m in {heavy!r} if m in sys.modules)}}))
+'''
+
+
+def heavy_modules_loaded(module):
+    """Heavy dependencies pulled in by a plain `import module`"""
+    return probe(module)['heavy']
+
+def probe(module):
+    result = subprocess.run([sys.executable, '-c', PROBE.format(module=module, heavy=HEAVY)],
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout)
+
+def time_help(script, runs):
+    """Wall time of `python script --help` in ms, interpreter start included"""
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, script, '--help'], capture_output=True, check=True)
+        timings.append((time.perf_counter() - started) * 1000)
+    return median(timings)
+
+def argparse_args():
+    parser = argparse.ArgumentParser(description='Measure import and CLI startup time of the crawler modules')
+    parser.add_argument('-n', '--runs', type=int, default=5, help='Fresh interpreters per measurement')
+    parser.add_argument('--modules', nargs='+', default=MODULES, help='Modules to import')
+    return parser.parse_args()
+
+def main():
+    args = argparse_args()
+    print(f"{'module':<18} {'import ms':>10}  heavy dependencies loaded")
+    for module in args.modules:
+        results = [probe(module) for _ in range(args.runs)]
+        heavy = results[-1]['heavy']
+        print(f"{module:<18} {median(r['ms'] for r in results):10.1f}  {', '.join(heavy) or '-'}")
+    print(f"{'metatft_getdata.py --help':<30} {time_help('metatft_getdata.py', args.runs):.1f} ms wall")
+
+if __name__ == "__main__":
+    main()
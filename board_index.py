@@ -0,0 +1,177 @@
+# to run:
+# python board_index.py build checkpoints/*.jsonl -o boards.npz
+# python board_index.py query boards.npz "Jinx:3:Guinsoo's Rageblade|Infinity Edge" "Vi:2" -k 10
+import os
+import glob
+import json
+import time
+import array
+import argparse
+import numpy as np
+
+# feature weights: which units matter most, then their star level and items
+UNIT_WEIGHT = 1.0
+STAR_WEIGHT = 0.5
+ITEM_WEIGHT = 0.5
+
+
+def board_features(units):
+    """
+    Multi-hot features of a board from `extract_units`-style dicts
+    ({'name', 'tier', 'items'}): the unit, the unit at its star level and
+    every item it holds.
+    """
+    features = {}
+    for unit in units:
+        name = unit.get('name')
+        if not name:
+            continue
+        features[f"unit:{name}"] = UNIT_WEIGHT
+        features[f"star:{name}:{unit.get('tier', '1')}"] = STAR_WEIGHT
+        for item in unit.get('items', []):
+            if item:
+                features[f"item:{item}"] = ITEM_WEIGHT
+    return features
+
+def parse_board(specs):
+    """CLI board spec: 'Name[:star][:item|item]' per unit"""
+    units = []
+    for spec in specs:
+        parts = spec.split(':')
+        units.append({
+            'name': parts[0],
+            'tier': parts[1] if len(parts) > 1 and parts[1] else '1',
+            'items': parts[2].split('|') if len(parts) > 2 and parts[2] else [],
+        })
+    return units
+
+
+class BoardIndex:
+    """
+    Cosine top-k over multi-hot board vectors.
+
+    The board x feature matrix is kept column-wise: one growable posting list
+    of board rows per feature, plus each board's vector norm. A query adds
+    its feature weights into a score array through the posting lists of its
+    own ~30 features only, so neither memory nor query time grows with the
+    vocabulary, and new boards are appended without rebuilding anything.
+    """
+
+    def __init__(self):
+        self.board_ids = []
+        self.rows = {}
+        self.features = {}
+        self.feature_weights = []
+        self.postings = []
+        self.norms = array.array('f')
+
+    def __len__(self):
+        return len(self.board_ids)
+
+    def _feature(self, name, weight):
+        if name not in self.features:
+            self.features[name] = len(self.feature_weights)
+            self.feature_weights.append(weight)
+            self.postings.append(array.array('i'))
+        return self.features[name]
+
+    def add(self, board_id, units):
+        features = board_features(units)
+        if not features or board_id in self.rows:
+            return self.rows.get(board_id)
+        row = len(self.board_ids)
+        self.board_ids.append(board_id)
+        self.rows[board_id] = row
+        for name, weight in features.items():
+            self.postings[self._feature(name, weight)].append(row)
+        self.norms.append(float(np.sqrt(sum(weight * weight for weight in features.values()))))
+        return row
+
+    def add_match(self, match_data):
+        """Index every final board on the Players tab of a match"""
+        for player in match_data.get('players', []):
+            units = player.get('units')
+            if units:
+                self.add(f"{match_data.get('match_id')}:{player.get('name', '')}", units)
+
+    def query(self, units, k=10):
+        """[(board_id, cosine similarity)] of the `k` closest boards"""
+        features = board_features(units)
+        if not features or not self.board_ids:
+            return []
+        scores = np.zeros(len(self.board_ids), dtype=np.float32)
+        query_norm = np.sqrt(sum(weight * weight for weight in features.values()))
+        for name, weight in features.items():
+            column = self.features.get(name)
+            if column is None:
+                continue
+            # each board holds a feature once, so plain fancy-index += is exact
+            scores[np.frombuffer(self.postings[column], dtype=np.int32)] += weight * self.feature_weights[column]
+        scores /= np.frombuffer(self.norms, dtype=np.float32) * query_norm
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self.board_ids[i], float(scores[i])) for i in top if scores[i] > 0]
+
+    def save(self, path):
+        lengths = np.array([len(posting) for posting in self.postings], dtype=np.int64)
+        np.savez_compressed(
+            path,
+            board_ids=np.array(self.board_ids, dtype=str),
+            feature_names=np.array(list(self.features), dtype=str),
+            feature_weights=np.array(self.feature_weights, dtype=np.float32),
+            offsets=np.concatenate([[0], np.cumsum(lengths)]),
+            postings=np.concatenate([np.frombuffer(p, dtype=np.int32) for p in self.postings]) if self.postings else np.empty(0, np.int32),
+            norms=np.frombuffer(self.norms, dtype=np.float32))
+
+    @classmethod
+    def load(cls, path):
+        index = cls()
+        with np.load(path) as data:
+            index.board_ids = data['board_ids'].tolist()
+            index.rows = {board_id: i for i, board_id in enumerate(index.board_ids)}
+            index.features = {name: i for i, name in enumerate(data['feature_names'].tolist())}
+            index.feature_weights = data['feature_weights'].tolist()
+            offsets = data['offsets']
+            postings = data['postings'].astype(np.int32)
+            index.postings = [array.array('i', postings[offsets[i]:offsets[i + 1]].tobytes()) for i in range(len(index.features))]
+            index.norms = array.array('f', data['norms'].astype(np.float32).tobytes())
+        return index
+
+
+def argparse_args():
+    parser = argparse.ArgumentParser(description='Board similarity search over scraped final compositions')
+    commands = parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('build', help='Add the boards of history/lobby result files to an index')
+    build.add_argument('inputs', nargs='+', help='.jsonl files or glob patterns')
+    build.add_argument('-o', '--output', default='boards.npz', help='Index file, extended when it exists')
+    query = commands.add_parser('query', help='Find the closest boards')
+    query.add_argument('index', help='Index file written by build')
+    query.add_argument('units', nargs='+', help="Units as Name[:star][:item|item]")
+    query.add_argument('-k', type=int, default=10, help='Number of boards to return')
+    return parser.parse_args()
+
+def main():
+    args = argparse_args()
+    if args.command == 'build':
+        index = BoardIndex.load(args.output) if os.path.exists(args.output) else BoardIndex()
+        before = len(index)
+        for path in sorted({path for pattern in args.inputs for path in glob.glob(pattern)}):
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        index.add_match(json.loads(line))
+        index.save(args.output)
+        print(f"Indexed {len(index) - before} new boards, {len(index)} total, in {args.output}")
+        return
+
+    index = BoardIndex.load(args.index)
+    started = time.perf_counter()
+    results = index.query(parse_board(args.units), args.k)
+    elapsed = (time.perf_counter() - started) * 1000
+    for board_id, score in results:
+        print(f"{score:.3f}  {board_id}")
+    print(f"{len(results)} boards in {elapsed:.1f} ms over {len(index)} boards")
+
+if __name__ == "__main__":
+    main()
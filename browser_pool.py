@@ -0,0 +1,187 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+DEFAULT_VIEWPORT = {'width': 1920, 'height': 1080}
+DEFAULT_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+# performance.memory is Chromium only, other engines return null
+JS_HEAP_USED = '() => performance.memory ? performance.memory.usedJSHeapSize : 0'
+
+
+def async_playwright():
+    """playwright.async_api.async_playwright(), imported on first use to keep startup fast"""
+    from playwright.async_api import async_playwright as playwright_factory
+    return playwright_factory()
+
+
+class PooledBrowser:
+    """One warm browser + context pair owned by a BrowserPool."""
+
+    def __init__(self, browser, context):
+        self.browser = browser
+        self.context = context
+        self.pages_served = 0
+        self.crashed = False
+
+    def is_healthy(self):
+        if self.crashed:
+            return False
+        is_connected = getattr(self.browser, 'is_connected', None)
+        return bool(is_connected()) if callable(is_connected) else True
+
+    def mark_crashed(self, *args):
+        self.crashed = True
+
+
+class BrowserPool:
+    """
+    Keep `size` Chromium browsers with an open context warm across calls.
+
+    Pages are borrowed through `async with pool.page() as page:`. A context is
+    recycled after `max_pages` pages or once a page reports more than
+    `max_js_heap_mb` of JS heap; a browser that disconnected or whose page
+    crashed is replaced before it is handed out again. With a MemoryWatermark
+    no page is handed out while the process RSS is above its limit.
+    """
+
+    def __init__(self, size=1, max_pages=50, max_js_heap_mb=512, headless=True,
+                 viewport=None, user_agent=DEFAULT_USER_AGENT, playwright_factory=None,
+                 memory_watermark=None):
+        self.size = size
+        self.max_pages = max_pages
+        self.max_js_heap = max_js_heap_mb * 1024 * 1024 if max_js_heap_mb else None
+        self.headless = headless
+        self.viewport = viewport or DEFAULT_VIEWPORT
+        self.user_agent = user_agent
+        self.playwright_factory = playwright_factory or async_playwright
+        self.memory_watermark = memory_watermark
+        self.recycled = 0
+        self.replaced = 0
+        self._playwright_manager = None
+        self._playwright = None
+        self._idle = asyncio.Queue()
+        self._slots = []
+        self._lock = asyncio.Lock()
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def start(self):
+        async with self._lock:
+            if self._playwright is not None:
+                return
+            manager = self.playwright_factory()
+            playwright = await manager.__aenter__()
+            slots = []
+            try:
+                for _ in range(self.size):
+                    slots.append(await self._launch(playwright))
+            except BaseException:
+                # leave the pool unstarted, so the next start() tries again instead of serving no slots
+                for slot in slots:
+                    await self._close_browser(slot)
+                await manager.__aexit__(None, None, None)
+                raise
+            self._playwright_manager = manager
+            self._playwright = playwright
+            self._slots = slots
+            for slot in slots:
+                self._idle.put_nowait(slot)
+
+    async def close(self):
+        async with self._lock:
+            for slot in self._slots:
+                await self._close_browser(slot)
+            self._slots = []
+            self._idle = asyncio.Queue()
+            if self._playwright_manager is not None:
+                await self._playwright_manager.__aexit__(None, None, None)
+            self._playwright_manager = None
+            self._playwright = None
+
+    async def _launch(self, playwright=None):
+        browser = await (playwright or self._playwright).chromium.launch(headless=self.headless)
+        slot = PooledBrowser(browser, await self._new_context(browser))
+        if hasattr(browser, 'on'):
+            browser.on('disconnected', slot.mark_crashed)
+        return slot
+
+    async def _new_context(self, browser):
+        return await browser.new_context(viewport=self.viewport, user_agent=self.user_agent)
+
+    async def _close_browser(self, slot):
+        try:
+            await slot.browser.close()
+        except Exception as e:
+            print(f"Error closing browser: {e}")
+
+    async def _replace(self, slot):
+        await self._close_browser(slot)
+        new_slot = await self._launch()
+        self._slots[self._slots.index(slot)] = new_slot
+        self.replaced += 1
+        return new_slot
+
+    async def _recycle(self, slot):
+        try:
+            await slot.context.close()
+        except Exception as e:
+            print(f"Error closing context: {e}")
+        slot.context = await self._new_context(slot.browser)
+        slot.pages_served = 0
+        self.recycled += 1
+
+    async def _js_heap_used(self, page):
+        try:
+            used = await page.evaluate(JS_HEAP_USED)
+            return used if isinstance(used, (int, float)) else 0
+        except Exception:
+            return 0
+
+    async def _release(self, slot, page):
+        slot.pages_served += 1
+        over_memory = False
+        if self.max_js_heap and not slot.crashed:
+            over_memory = await self._js_heap_used(page) > self.max_js_heap
+        try:
+            await page.close()
+        except Exception:
+            pass
+
+        try:
+            if not slot.is_healthy():
+                slot = await self._replace(slot)
+            elif over_memory or (self.max_pages and slot.pages_served >= self.max_pages):
+                await self._recycle(slot)
+        except Exception as e:
+            # the slot goes back anyway, marked so the next borrower relaunches it;
+            # dropping it would shrink the pool and leave borrowers waiting forever
+            print(f"Error refreshing browser: {e}")
+            slot.mark_crashed()
+        finally:
+            self._idle.put_nowait(slot)
+
+    @asynccontextmanager
+    async def page(self):
+        """Borrow a fresh page from a warm context, returned to the pool on exit."""
+        await self.start()
+        if self.memory_watermark is not None:
+            await self.memory_watermark.wait()
+        slot = await self._idle.get()
+        try:
+            if not slot.is_healthy():
+                slot = await self._replace(slot)
+            page = await slot.context.new_page()
+        except Exception:
+            self._idle.put_nowait(slot)
+            raise
+        if hasattr(page, 'on'):
+            page.on('crash', slot.mark_crashed)
+        try:
+            yield page
+        finally:
+            await self._release(slot, page)
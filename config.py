@@ -0,0 +1,202 @@
+# Crawl settings: built-in profiles, optionally overridden by a TOML file.
+# example crawl.toml:
+#   profile = "polite"        # built-in profile the file starts from
+#   [crawl]
+#   region = "euw"
+#   [profiles.nightly]        # custom profile, picked with --crawl-profile nightly
+#   base = "fast"
+#   crawl = { concurrency = 6, asset_cache = "assets" }
+import copy
+import typing
+from dataclasses import dataclass, field, fields
+from typing import List, Optional
+from browser_pool import DEFAULT_USER_AGENT
+from resilience import Resilience, Backoff, AdaptiveTimeout
+
+
+@dataclass
+class BrowserConfig:
+    headless: bool = True
+    viewport_width: int = 1920
+    viewport_height: int = 1080
+    user_agent: str = DEFAULT_USER_AGENT
+    # pages a browser context serves before it is recycled, see browser_pool.py
+    max_pages: int = 50
+    max_js_heap_mb: int = 512
+
+    def viewport(self):
+        return {'width': self.viewport_width, 'height': self.viewport_height}
+
+@dataclass
+class WaitConfig:
+    # first navigation timeout, then adapted between min and max, see resilience.AdaptiveTimeout
+    navigation_ms: int = 30000
+    min_navigation_ms: int = 5000
+    max_navigation_ms: int = 60000
+    # pause after clicking a tab or control so the page can render
+    settle_ms: int = 500
+    # pause after expanding a match
+    expand_ms: int = 1000
+    load_more_ms: int = 10000
+
+@dataclass
+class RetryConfig:
+    attempts: int = 3
+    run_retries: int = 200
+    player_retries: int = 6
+    backoff_base: float = 1.0
+    backoff_max: float = 30.0
+
+@dataclass
+class CrawlConfig:
+    base_url: str = "https://www.metatft.com/player"
+    region: str = 'tw'
+    concurrency: int = 2
+    # None scrapes every tab / keeps every field
+    tabs: Optional[List[str]] = None
+    fields: Optional[List[str]] = None
+    modes: List[str] = field(default_factory=lambda: ['ranked'])
+    match_list_ttl: int = 300
+    max_rps: Optional[float] = None
+    # list matches over plain HTTP before opening a browser
+    http: bool = True
+    match_index: Optional[str] = None
+    asset_cache: Optional[str] = None
+
+@dataclass
+class OutputConfig:
+    console: bool = True
+    clipboard: bool = True
+    file: bool = True
+    directory: str = '.'
+
+@dataclass
+class Config:
+    name: str = 'default'
+    browser: BrowserConfig = field(default_factory=BrowserConfig)
+    waits: WaitConfig = field(default_factory=WaitConfig)
+    retries: RetryConfig = field(default_factory=RetryConfig)
+    crawl: CrawlConfig = field(default_factory=CrawlConfig)
+    output: OutputConfig = field(default_factory=OutputConfig)
+
+
+SECTIONS = ('browser', 'waits', 'retries', 'crawl', 'output')
+# profile -> {section: {setting: value}} applied over the defaults
+PROFILES = {
+    'default': {},
+    'fast': {
+        'browser': {'max_pages': 100},
+        'waits': {'navigation_ms': 20000, 'settle_ms': 250, 'expand_ms': 500, 'load_more_ms': 5000},
+        'retries': {'attempts': 2},
+        # one request per second per worker; without it the 1 rps per-host default caps the whole profile
+        'crawl': {'concurrency': 4, 'tabs': ['players'], 'max_rps': 4.0},
+        'output': {'console': False, 'clipboard': False},
+    },
+    'polite': {
+        'waits': {'settle_ms': 1000, 'expand_ms': 2000},
+        'retries': {'attempts': 5, 'backoff_base': 2.0, 'backoff_max': 120.0},
+        'crawl': {'concurrency': 1, 'max_rps': 0.5},
+    },
+    'debug': {
+        'browser': {'headless': False},
+        'waits': {'navigation_ms': 60000, 'max_navigation_ms': 120000, 'settle_ms': 1500, 'expand_ms': 2000},
+        'retries': {'attempts': 1},
+        'crawl': {'concurrency': 1, 'http': False},
+    },
+}
+
+
+def _check(value, hint, where):
+    """`value` as the annotated type, ValueError when it does not fit"""
+    if typing.get_origin(hint) is typing.Union:
+        if value is None:
+            return None
+        hint = next(arg for arg in typing.get_args(hint) if arg is not type(None))
+    if typing.get_origin(hint) is list:
+        if isinstance(value, str):
+            value = [part.strip() for part in value.split(',') if part.strip()]
+        if isinstance(value, list) and all(isinstance(item, str) for item in value):
+            return list(value)
+    elif hint is float and isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    elif hint is int and isinstance(value, int) and not isinstance(value, bool):
+        return value
+    elif hint in (bool, str) and isinstance(value, hint):
+        return value
+    raise ValueError(f"{where}: expected {getattr(hint, '__name__', hint)}, got {value!r}")
+
+def apply_overrides(config, overrides, source):
+    """Set {section: {setting: value}} on `config`, checking names and types"""
+    for section, values in overrides.items():
+        if section not in SECTIONS or not isinstance(values, dict):
+            raise ValueError(f"{source}: unknown section [{section}], expected one of {', '.join(SECTIONS)}")
+        target = getattr(config, section)
+        hints = typing.get_type_hints(type(target))
+        known = {f.name for f in fields(target)}
+        for key, value in values.items():
+            if key not in known:
+                raise ValueError(f"{source}: unknown setting {section}.{key}")
+            setattr(target, key, _check(value, hints[key], f"{source}: {section}.{key}"))
+    return config
+
+def load_config(path=None, profile=None):
+    """
+    Config for `profile`: a built-in profile, or one of the file's [profiles.<name>].
+    Built-in defaults come first, then the file's top-level sections, then the
+    custom profile's sections.
+    """
+    data = {}
+    if path:
+        import tomllib
+        with open(path, 'rb') as f:
+            data = tomllib.load(f)
+    unknown = set(data) - {*SECTIONS, 'profile', 'profiles'}
+    if unknown:
+        raise ValueError(f"{path}: unknown section [{', '.join(sorted(unknown))}], expected one of {', '.join(SECTIONS)}")
+    custom = data.get('profiles', {})
+    name = profile or data.get('profile') or 'default'
+    if name in custom:
+        # without a base a custom profile starts from the file's profile, unless it is that profile
+        default_base = data.get('profile', 'default')
+        base = custom[name].get('base', 'default' if default_base == name else default_base)
+    elif name in PROFILES:
+        base = name
+    else:
+        raise ValueError(f"Unknown crawl profile {name!r}, expected one of {', '.join([*PROFILES, *custom])}")
+    if base not in PROFILES:
+        raise ValueError(f"Profile {name!r} is based on unknown profile {base!r}")
+
+    config = Config(name=name)
+    apply_overrides(config, copy.deepcopy(PROFILES[base]), f"profile {base}")
+    apply_overrides(config, {key: value for key, value in data.items() if key in SECTIONS}, path)
+    if name in custom:
+        apply_overrides(config, {key: value for key, value in custom[name].items() if key != 'base'}, f"{path} [profiles.{name}]")
+    from metatft_getdata import select_tabs, normalize_queue_mode
+    try:
+        select_tabs(config.crawl.tabs, config.crawl.fields)
+        if not config.crawl.modes:
+            raise ValueError("crawl.modes needs at least one queue mode")
+        for mode in config.crawl.modes:
+            normalize_queue_mode(mode)
+    except ValueError as e:
+        raise ValueError(f"{path or f'profile {name}'}: {e}") from None
+    return config
+
+def make_resilience(config):
+    """Retry policy and navigation timeouts of a config"""
+    retries, waits = config.retries, config.waits
+    return Resilience(
+        attempts=retries.attempts,
+        backoff=Backoff(base=retries.backoff_base, max_delay=retries.backoff_max),
+        run_retries=retries.run_retries,
+        player_retries=retries.player_retries,
+        timeout_factory=lambda: AdaptiveTimeout(initial_ms=waits.navigation_ms, min_ms=waits.min_navigation_ms,
+                                                max_ms=waits.max_navigation_ms))
+
+
+def add_config_arguments(parser):
+    parser.add_argument('--config', default=None, help='TOML file with crawl settings and custom profiles')
+    parser.add_argument('--crawl-profile', default=None, help=f"Named settings profile ({', '.join(PROFILES)} or one from --config)")
+
+def config_from_args(args):
+    return load_config(args.config, args.crawl_profile)
@@ -0,0 +1,626 @@
+# to run:
+# on one box, sharing a SQLite queue file:
+#   python distributed.py coordinator "name#tag" --queue crawl_queue.sqlite --output results.jsonl
+#   python distributed.py worker --queue crawl_queue.sqlite --concurrency 2
+# across boxes, the coordinator serves its queue over a socket; both sides need
+# the same secret in CRAWL_QUEUE_TOKEN, and --serve without a host binds 127.0.0.1:
+#   CRAWL_QUEUE_TOKEN=... python distributed.py coordinator --players players.txt --serve 0.0.0.0:8765
+#   CRAWL_QUEUE_TOKEN=... python distributed.py worker --connect coordinator-host:8765
+import os
+import hmac
+import json
+import time
+import uuid
+import socket
+import sqlite3
+import asyncio
+import argparse
+import threading
+import socketserver
+from contextlib import contextmanager
+from memory import MemoryWatermark
+from metatft_getdata import MetaTFT
+from resilience import CircuitOpenError, gather_or_cancel
+from history import parse_player, read_players
+from lobby import SEED_PRIORITY, rank_priority, riot_id_from_player
+from config import add_config_arguments, config_from_args
+from rate_limiter import configure_rate_limiter
+from validation import SelectorDriftError, add_drift_arguments, drift_monitor_from_args
+
+PLAYER = 'player'
+# every new match of one player, scraped from a single profile load
+MATCHES = 'matches'
+TOKEN_ENV = 'CRAWL_QUEUE_TOKEN'
+
+
+class SqliteQueue:
+    """
+    Lease-based job queue in one SQLite file.
+
+    A job is leased to one worker for `lease_seconds`; the worker extends the
+    lease with heartbeats. A lease that runs out goes back to pending for the
+    next `lease()` call, so the jobs of a dead worker are reassigned, and a
+    result sent on a lost lease is rejected. Jobs are unique per (kind, key),
+    and put_batch() remembers every item it queued, which makes the queue the
+    coordinator's dedup set as well.
+    Safe to share between threads and between processes on the same box.
+    """
+
+    def __init__(self, path='crawl_queue.sqlite', max_attempts=3, clock=time.time):
+        self.max_attempts = max_attempts
+        self.clock = clock
+        self._lock = threading.Lock()
+        self.db = sqlite3.connect(path, isolation_level=None, check_same_thread=False, timeout=30)
+        self.db.executescript('''
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                kind TEXT NOT NULL,
+                key TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                priority INTEGER NOT NULL DEFAULT 0,
+                state TEXT NOT NULL DEFAULT 'pending',
+                worker TEXT,
+                lease_expires REAL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                result TEXT,
+                error TEXT,
+                collected INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                UNIQUE (kind, key)
+            );
+            CREATE INDEX IF NOT EXISTS jobs_pending ON jobs (state, priority DESC, job_id);
+            CREATE TABLE IF NOT EXISTS batch_items (
+                kind TEXT NOT NULL,
+                item TEXT NOT NULL,
+                PRIMARY KEY (kind, item)
+            );
+        ''')
+
+    def close(self):
+        self.db.close()
+
+    @contextmanager
+    def _transaction(self):
+        with self._lock:
+            self.db.execute('BEGIN IMMEDIATE')
+            try:
+                yield self.db
+            except Exception:
+                self.db.execute('ROLLBACK')
+                raise
+            self.db.execute('COMMIT')
+
+    def put(self, kind, key, payload, priority=0):
+        """Queue a job; False when (kind, key) was queued before"""
+        with self._transaction() as db:
+            cursor = db.execute(
+                'INSERT OR IGNORE INTO jobs (kind, key, payload, priority, created_at) VALUES (?, ?, ?, ?, ?)',
+                (kind, key, json.dumps(payload), priority, self.clock()))
+            return cursor.rowcount == 1
+
+    def put_batch(self, kind, key, payload, items_field, priority=0):
+        """
+        Queue one job with the items of payload[items_field] that no earlier
+        batch of `kind` had; False when none of them are new
+        """
+        with self._transaction() as db:
+            new_items = [item for item in payload[items_field] if db.execute(
+                'INSERT OR IGNORE INTO batch_items (kind, item) VALUES (?, ?)', (kind, item)).rowcount == 1]
+            if not new_items:
+                return False
+            cursor = db.execute(
+                'INSERT OR IGNORE INTO jobs (kind, key, payload, priority, created_at) VALUES (?, ?, ?, ?, ?)',
+                (kind, key, json.dumps({**payload, items_field: new_items}), priority, self.clock()))
+            return cursor.rowcount == 1
+
+    def lease(self, worker, lease_seconds=120):
+        """Claim the highest-priority pending job for `worker`, None when there is none"""
+        now = self.clock()
+        with self._transaction() as db:
+            # expired leases: give up on jobs that already used every attempt, requeue the rest
+            db.execute('''
+                UPDATE jobs SET state = 'failed', error = 'lease expired', worker = NULL
+                WHERE state = 'leased' AND lease_expires < ? AND attempts >= ?
+            ''', (now, self.max_attempts))
+            db.execute('''
+                UPDATE jobs SET state = 'pending', worker = NULL
+                WHERE state = 'leased' AND lease_expires < ?
+            ''', (now,))
+            row = db.execute('''
+                SELECT job_id, kind, key, payload, attempts FROM jobs WHERE state = 'pending'
+                ORDER BY priority DESC, job_id LIMIT 1
+            ''').fetchone()
+            if row is None:
+                return None
+            db.execute('''
+                UPDATE jobs SET state = 'leased', worker = ?, lease_expires = ?, attempts = attempts + 1
+                WHERE job_id = ?
+            ''', (worker, now + lease_seconds, row[0]))
+        return {'job_id': row[0], 'kind': row[1], 'key': row[2], 'payload': json.loads(row[3]), 'attempts': row[4] + 1}
+
+    def heartbeat(self, job_id, worker, lease_seconds=120):
+        """Extend a lease; False when the worker no longer holds it"""
+        with self._transaction() as db:
+            cursor = db.execute('''
+                UPDATE jobs SET lease_expires = ? WHERE job_id = ? AND worker = ? AND state = 'leased'
+            ''', (self.clock() + lease_seconds, job_id, worker))
+            return cursor.rowcount == 1
+
+    def complete(self, job_id, worker, result):
+        with self._transaction() as db:
+            cursor = db.execute('''
+                UPDATE jobs SET state = 'done', result = ?, lease_expires = NULL
+                WHERE job_id = ? AND worker = ? AND state = 'leased'
+            ''', (json.dumps(result, default=list), job_id, worker))
+            return cursor.rowcount == 1
+
+    def fail(self, job_id, worker, error):
+        """Give a job back; it is retried until it used max_attempts leases"""
+        with self._transaction() as db:
+            cursor = db.execute('''
+                UPDATE jobs SET state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,
+                    error = ?, worker = NULL, lease_expires = NULL
+                WHERE job_id = ? AND worker = ? AND state = 'leased'
+            ''', (self.max_attempts, str(error), job_id, worker))
+            return cursor.rowcount == 1
+
+    def collect(self, limit=100):
+        """Finished jobs the coordinator has not acked yet; they are returned again until ack()"""
+        with self._lock:
+            rows = self.db.execute('''
+                SELECT job_id, kind, key, payload, result FROM jobs
+                WHERE state = 'done' AND collected = 0 ORDER BY job_id LIMIT ?
+            ''', (limit,)).fetchall()
+        return [{'job_id': row[0], 'kind': row[1], 'key': row[2], 'payload': json.loads(row[3]),
+                 'result': json.loads(row[4])} for row in rows]
+
+    def ack(self, job_ids):
+        """Mark collected jobs as handled, once their results are safely stored"""
+        with self._transaction() as db:
+            db.executemany('UPDATE jobs SET collected = 1 WHERE job_id = ?', [(job_id,) for job_id in job_ids])
+
+    def stats(self):
+        with self._lock:
+            rows = self.db.execute('SELECT state, COUNT(*) FROM jobs GROUP BY state').fetchall()
+            uncollected = self.db.execute("SELECT COUNT(*) FROM jobs WHERE state = 'done' AND collected = 0").fetchone()[0]
+        stats = {'pending': 0, 'leased': 0, 'done': 0, 'failed': 0}
+        stats.update(dict(rows))
+        stats['uncollected'] = uncollected
+        return stats
+
+
+# region local socket service
+QUEUE_METHODS = ('put', 'put_batch', 'lease', 'heartbeat', 'complete', 'fail', 'collect', 'ack', 'stats')
+
+
+class QueueServer(socketserver.ThreadingTCPServer):
+    """
+    Serve a queue to workers on other boxes, one JSON request per line:
+    {"token": "...", "method": "lease", "args": [...]} -> {"result": ...} or {"error": "..."}
+
+    Every request must carry the shared `token`; a connection that sends a
+    wrong one gets an error and is closed.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, queue, address=('127.0.0.1', 8765), token=None):
+        if not token:
+            raise ValueError(f"The queue server needs a shared token, set {TOKEN_ENV}")
+        self.queue = queue
+        self.token = token
+        super().__init__(address, QueueRequestHandler)
+
+    def start(self):
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
+
+
+class QueueRequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+            except ValueError:
+                request = None
+            token = request.get('token') if isinstance(request, dict) else None
+            if not hmac.compare_digest(str(token or '').encode('utf-8'), self.server.token.encode('utf-8')):
+                self.wfile.write(b'{"error": "unauthorized"}\n')
+                self.wfile.flush()
+                return
+            try:
+                if request.get('method') not in QUEUE_METHODS:
+                    raise ValueError(f"Unknown method: {request.get('method')}")
+                method = getattr(self.server.queue, request['method'])
+                response = {'result': method(*request.get('args', []))}
+            except Exception as e:
+                response = {'error': str(e)}
+            self.wfile.write((json.dumps(response, default=list) + '\n').encode('utf-8'))
+            self.wfile.flush()
+
+
+class SocketQueue:
+    """Client side of QueueServer with the same methods as SqliteQueue"""
+
+    def __init__(self, address=('127.0.0.1', 8765), token=None, timeout=30):
+        self.address = address
+        self.token = token
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._socket = None
+        self._file = None
+
+    def close(self):
+        if self._socket is not None:
+            self._file.close()
+            self._socket.close()
+        self._socket = None
+        self._file = None
+
+    def _server_closed(self):
+        """True when the server closed the idle connection, e.g. after a coordinator restart"""
+        try:
+            self._socket.setblocking(False)
+            try:
+                return self._socket.recv(1, socket.MSG_PEEK) == b''
+            finally:
+                self._socket.settimeout(self.timeout)
+        except BlockingIOError:
+            return False
+        except OSError:
+            return True
+
+    def _call(self, method, *args):
+        request = (json.dumps({'token': self.token, 'method': method, 'args': args}, default=list) + '\n').encode('utf-8')
+        with self._lock:
+            if self._socket is not None and self._server_closed():
+                self.close()
+            # a request is only sent again when it never left; once written the
+            # server may have applied it, and a second lease/complete/put_batch would too
+            for attempt in range(2):
+                try:
+                    if self._socket is None:
+                        self._socket = socket.create_connection(self.address, timeout=self.timeout)
+                        self._file = self._socket.makefile('rwb')
+                    self._file.write(request)
+                    self._file.flush()
+                    break
+                except OSError:
+                    self.close()
+                    if attempt:
+                        raise
+            try:
+                line = self._file.readline()
+            except OSError:
+                self.close()
+                raise
+            if not line:
+                self.close()
+                raise ConnectionError('queue server closed the connection before answering')
+        response = json.loads(line)
+        if 'error' in response:
+            raise RuntimeError(response['error'])
+        return response['result']
+
+    def put(self, kind, key, payload, priority=0):
+        return self._call('put', kind, key, payload, priority)
+
+    def put_batch(self, kind, key, payload, items_field, priority=0):
+        return self._call('put_batch', kind, key, payload, items_field, priority)
+
+    def lease(self, worker, lease_seconds=120):
+        return self._call('lease', worker, lease_seconds)
+
+    def heartbeat(self, job_id, worker, lease_seconds=120):
+        return self._call('heartbeat', job_id, worker, lease_seconds)
+
+    def complete(self, job_id, worker, result):
+        return self._call('complete', job_id, worker, result)
+
+    def fail(self, job_id, worker, error):
+        return self._call('fail', job_id, worker, error)
+
+    def collect(self, limit=100):
+        return self._call('collect', limit)
+
+    def ack(self, job_ids):
+        return self._call('ack', job_ids)
+
+    def stats(self):
+        return self._call('stats')
+
+def parse_address(text, default_port=8765, default_host='127.0.0.1'):
+    """'host:port', 'host' or 'port' -> (host, port)"""
+    if text.isdigit():
+        return default_host, int(text)
+    host, _, port = text.rpartition(':')
+    if not host:
+        return text, default_port
+    return host, int(port)
+# endregion
+
+
+class Coordinator:
+    """
+    Owns the crawl frontier. Player jobs come back with the player's match
+    ids, which become one batch job per player. Every match id is queued only
+    once, however many lobby members list it. Finished matches are appended
+    to `output`.
+    With `discover`, their lobby members are queued as new players, stronger
+    lobbies first.
+    """
+
+    def __init__(self, queue, output='results.jsonl', matches_per_player=10, discover=False, max_players=None,
+                 poll_interval=2, report_interval=30):
+        self.queue = queue
+        self.output = output
+        self.matches_per_player = matches_per_player
+        self.discover = discover
+        self.max_players = max_players
+        self.poll_interval = poll_interval
+        self.report_interval = report_interval
+        self.players_queued = 0
+        self.matches_saved = 0
+        self.matches_failed = 0
+
+    def add_player(self, riot_id, region, priority=0):
+        if self.max_players is not None and self.players_queued >= self.max_players:
+            return False
+        queued = self.queue.put(PLAYER, f"{region}:{riot_id}",
+                                {'riot_id': riot_id, 'region': region, 'max_matches': self.matches_per_player}, priority)
+        self.players_queued += queued
+        return queued
+
+    def seed(self, players):
+        for riot_id, region in players:
+            self.add_player(riot_id, region, SEED_PRIORITY)
+
+    def handle(self, job):
+        payload, result = job['payload'], job['result']
+        if job['kind'] == PLAYER:
+            self.queue.put_batch(MATCHES, job['key'], {'riot_id': payload['riot_id'], 'region': payload['region'],
+                                                       'match_ids': result.get('match_ids', [])}, 'match_ids')
+            return
+        self.matches_failed += len(result.get('failed', []))
+        with open(self.output, 'a', encoding='utf-8') as f:
+            for match_data in result.get('matches', []):
+                f.write(json.dumps({'riot_id': payload['riot_id'], **match_data}, default=list) + '\n')
+        self.matches_saved += len(result.get('matches', []))
+        if self.discover:
+            for match_data in result.get('matches', []):
+                priority = rank_priority(match_data.get('avg_opponent_rank'))
+                for player in match_data.get('players', []):
+                    riot_id = riot_id_from_player(player)
+                    if riot_id:
+                        self.add_player(riot_id, payload['region'], priority)
+
+    def step(self):
+        """
+        Handle every finished job; False once nothing is queued, leased or waiting.
+        A job is acked only after handle() stored it, so a coordinator crash in
+        between handles it again on restart rather than losing it.
+        """
+        jobs = self.queue.collect()
+        for job in jobs:
+            self.handle(job)
+            self.queue.ack([job['job_id']])
+        stats = self.queue.stats()
+        return bool(jobs) or stats['pending'] + stats['leased'] + stats['uncollected'] > 0
+
+    def report(self):
+        stats = self.queue.stats()
+        print(f"[coordinator] players queued {self.players_queued} | matches saved {self.matches_saved} "
+              f"({self.matches_failed} failed) | "
+              f"pending {stats['pending']} leased {stats['leased']} done {stats['done']} failed {stats['failed']}")
+
+    async def run(self):
+        last_report = time.monotonic()
+        while await asyncio.to_thread(self.step):
+            if time.monotonic() - last_report >= self.report_interval:
+                self.report()
+                last_report = time.monotonic()
+            await asyncio.sleep(self.poll_interval)
+        self.report()
+
+
+class Worker:
+    """
+    Lease jobs from a queue and run them with MetaTFT, `concurrency` at a time.
+
+    Every leased job gets a heartbeat task that extends its lease while the
+    browser works. A job whose lease was lost is dropped, because it has
+    already been handed to another worker.
+    """
+
+    def __init__(self, tft, queue, worker_id=None, concurrency=1, lease_seconds=120, heartbeat_interval=30,
+                 idle_interval=5, max_pages=50, exit_when_idle=False):
+        self.tft = tft
+        self.queue = queue
+        self.worker_id = worker_id or f"{socket.gethostname()}-{uuid.uuid4().hex[:8]}"
+        self.concurrency = concurrency
+        self.lease_seconds = lease_seconds
+        self.heartbeat_interval = heartbeat_interval
+        self.idle_interval = idle_interval
+        self.max_pages = max_pages
+        self.exit_when_idle = exit_when_idle
+        self.jobs_done = 0
+        self.jobs_failed = 0
+
+    async def run_player_http(self, payload):
+        """Enough match ids over plain HTTP, or None to fall back to the browser"""
+        if not self.tft.http_lists_queue():
+            # the HTTP page mixes every queue; only the browser can apply the queue filter
+            return None
+        match_ids = await self.tft.http_match_ids(payload['riot_id'], payload['region'])
+        if match_ids and len(match_ids) >= payload.get('max_matches', 10):
+            return {'match_ids': match_ids[:payload.get('max_matches', 10)]}
+        return None
+
+    async def run_player(self, page, payload):
+        await self.tft.open_profile(page, payload['riot_id'], payload['region'])
+        match_ids = await self.tft.list_match_ids(page)
+        for _ in range(self.max_pages):
+            if len(match_ids) >= payload.get('max_matches', 10) or not await self.tft.load_more_matches(page):
+                break
+            match_ids = await self.tft.list_match_ids(page)
+        return {'match_ids': match_ids[:payload.get('max_matches', 10)]}
+
+    async def find_match_card(self, page, match_id):
+        for _ in range(self.max_pages):
+            if await page.query_selector(f'#{match_id}'):
+                return True
+            if not await self.tft.load_more_matches(page):
+                return False
+        return False
+
+    async def run_matches(self, page, payload):
+        """Every match of a batch from one profile load, each collapsed again once read"""
+        await self.tft.open_profile(page, payload['riot_id'], payload['region'])
+        matches, failed = [], []
+        for match_id in payload['match_ids']:
+            if not await self.find_match_card(page, match_id):
+                print(f"Match {match_id} is no longer listed for {payload['riot_id']}")
+                failed.append(match_id)
+                continue
+            match_data = await self.tft.get_match_details(page, match_id)
+            if match_data is None:
+                failed.append(match_id)
+                continue
+            matches.append(match_data)
+            await self.tft.collapse_match(page, match_id)
+        if not matches:
+            raise RuntimeError(f"Could not scrape any of {len(failed)} matches of {payload['riot_id']}")
+        return {'matches': matches, 'failed': failed}
+
+    async def _heartbeat(self, job, lost):
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            if not await asyncio.to_thread(self.queue.heartbeat, job['job_id'], self.worker_id, self.lease_seconds):
+                lost.set()
+                return
+
+    async def run_job(self, pool, job):
+        lost = asyncio.Event()
+        heartbeat = asyncio.create_task(self._heartbeat(job, lost))
+        try:
+            result = await self.run_player_http(job['payload']) if job['kind'] == PLAYER else None
+            if result is None:
+                async with pool.page() as page:
+                    if job['kind'] == PLAYER:
+                        result = await self.run_player(page, job['payload'])
+                    else:
+                        result = await self.run_matches(page, job['payload'])
+        except asyncio.CancelledError:
+            # another slot halted the worker; the lease runs out and the job goes to someone else
+            heartbeat.cancel()
+            raise
+        except Exception as e:
+            heartbeat.cancel()
+            if not isinstance(e, CircuitOpenError):
+                print(f"Error in {job['kind']} job {job['key']}: {e}")
+            self.jobs_failed += 1
+            await asyncio.to_thread(self.queue.fail, job['job_id'], self.worker_id, str(e))
+            if isinstance(e, SelectorDriftError):
+                raise
+            return
+        heartbeat.cancel()
+        if lost.is_set() or not await asyncio.to_thread(self.queue.complete, job['job_id'], self.worker_id, result):
+            print(f"Lease on {job['kind']} job {job['key']} was lost, result dropped")
+            return
+        self.jobs_done += 1
+
+    async def _slot(self, pool):
+        while True:
+            job = await asyncio.to_thread(self.queue.lease, self.worker_id, self.lease_seconds)
+            if job is None:
+                if self.exit_when_idle:
+                    return
+                await asyncio.sleep(self.idle_interval)
+                continue
+            await self.run_job(pool, job)
+            await self.drain_assets()
+
+    async def drain_assets(self):
+        """Download the icons the finished jobs referenced, so the cache doesn't grow for the whole run"""
+        if self.tft.asset_cache is not None and self.tft.asset_cache.pending:
+            await self.tft.asset_cache.fetch_pending()
+
+    async def run(self):
+        pool = self.tft.browser_pool or self.tft.new_browser_pool(self.concurrency)
+        try:
+            await gather_or_cancel(*(self._slot(pool) for _ in range(self.concurrency)))
+        finally:
+            if pool is not self.tft.browser_pool:
+                await pool.close()
+
+
+def argparse_args():
+    parser = argparse.ArgumentParser(description='Distributed TFT crawl: one coordinator, many workers')
+    commands = parser.add_subparsers(dest='command', required=True)
+    coordinator = commands.add_parser('coordinator', help='Own the frontier and collect results')
+    coordinator.add_argument('riot_ids', nargs='*', help='Seed Riot IDs (name#tag or name#tag,region)')
+    coordinator.add_argument('--players', help='File with one name#tag[,region] per line')
+    coordinator.add_argument('--region', default='tw', help='Region for players without one')
+    coordinator.add_argument('--output', default='results.jsonl', help='File the scraped matches are appended to')
+    coordinator.add_argument('--matches-per-player', type=int, default=10, help='Recent matches queued per player')
+    coordinator.add_argument('--discover', action='store_true', help='Queue the lobby members of every scraped match')
+    coordinator.add_argument('--max-players', type=int, default=None, help='Stop queueing players after this many')
+    coordinator.add_argument('--serve', default=None,
+                             help=f"[host:]port to serve the queue to remote workers (host defaults to 127.0.0.1, needs {TOKEN_ENV})")
+    worker = commands.add_parser('worker', help='Lease and run crawl jobs')
+    worker.add_argument('--connect', default=None, help='host:port of a coordinator started with --serve')
+    worker.add_argument('--concurrency', type=int, default=None, help='Jobs run in parallel (default from the crawl profile)')
+    worker.add_argument('--lease-seconds', type=int, default=120, help='Lease length, renewed by heartbeats')
+    worker.add_argument('--exit-when-idle', action='store_true', help='Stop once the queue has nothing to lease')
+    add_drift_arguments(worker)
+    worker.add_argument('--no-http', action='store_true', help='Always open a browser, even to list match ids')
+    worker.add_argument('--max-rss-mb', type=int, default=None, help='Pause new page work while the process uses more memory than this')
+    add_config_arguments(worker)
+    for command in (coordinator, worker):
+        command.add_argument('--queue', default='crawl_queue.sqlite', help='SQLite queue file')
+    return parser.parse_args()
+
+async def main():
+    args = argparse_args()
+    if args.command == 'coordinator':
+        queue = SqliteQueue(args.queue)
+        server = QueueServer(queue, parse_address(args.serve), os.getenv(TOKEN_ENV)) if args.serve else None
+        if server:
+            server.start()
+            print(f"Serving the queue on {args.serve}")
+        players = [parse_player(riot_id, args.region) for riot_id in args.riot_ids]
+        if args.players:
+            players.extend(read_players(args.players, args.region))
+        coordinator = Coordinator(queue, args.output, args.matches_per_player, args.discover, args.max_players)
+        coordinator.seed(players)
+        try:
+            await coordinator.run()
+        finally:
+            if server:
+                server.shutdown()
+            queue.close()
+        return
+
+    queue = SocketQueue(parse_address(args.connect), os.getenv(TOKEN_ENV)) if args.connect else SqliteQueue(args.queue)
+    config = config_from_args(args)
+    if config.crawl.max_rps:
+        configure_rate_limiter(global_rate=config.crawl.max_rps)
+    overrides = {'http_fetcher': None} if args.no_http else {}
+    tft = MetaTFT.from_config(config,
+                              memory_watermark=MemoryWatermark(args.max_rss_mb) if args.max_rss_mb else None,
+                              drift_monitor=drift_monitor_from_args(args),
+                              **overrides)
+    worker = Worker(tft, queue, concurrency=args.concurrency or config.crawl.concurrency, lease_seconds=args.lease_seconds,
+                    heartbeat_interval=args.lease_seconds / 4, exit_when_idle=args.exit_when_idle)
+    try:
+        await worker.run()
+    finally:
+        queue.close()
+        print(f"Worker {worker.worker_id}: {worker.jobs_done} jobs done, {worker.jobs_failed} failed")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,291 @@
+# to run:
+# python history.py "name#tag" "other#tag" --region tw --max-matches 200
+# python history.py --players players.txt --concurrency 3
+# python history.py "name#tag" --max-matches 20 --profile-dir profile  # then: flamegraph.pl profile/profile.folded > crawl.svg
+import os
+import re
+import json
+import time
+import asyncio
+import argparse
+from memory import MemoryWatermark
+from metatft_getdata import MetaTFT
+from resilience import CircuitOpenError, gather_or_cancel
+from match_index import MatchIndex
+from asset_cache import AssetCache
+from profiler import Profiler
+from config import add_config_arguments, config_from_args
+from rate_limiter import configure_rate_limiter
+from validation import SelectorDriftError, add_drift_arguments, drift_monitor_from_args
+
+
+def parse_player(line, default_region='tw'):
+    """'name#tag' or 'name#tag,region' -> (riot_id, region); Riot names may contain spaces"""
+    riot_id, _, region = line.strip().partition(',')
+    return riot_id.strip(), (region.strip() or default_region).lower()
+
+def read_players(path, default_region='tw'):
+    with open(path, 'r', encoding='utf-8') as f:
+        return [parse_player(line, default_region) for line in f if line.strip() and not line.startswith('#')]
+
+
+class Checkpoint:
+    """
+    Progress of one player's backfill.
+
+    `<dir>/<region>_<name-tag>.json` holds the enumerated match ids, the ones
+    already scraped and whether the history end was reached; scraped matches
+    are appended to the `.jsonl` file next to it. Both are written before a
+    match counts as done, so a crash at most repeats the match in flight.
+    """
+
+    def __init__(self, directory, riot_id, region):
+        safe_name = re.sub(r'[^\w.-]+', '_', riot_id.replace('#', '-'))
+        base = os.path.join(directory, f"{region}_{safe_name}")
+        self.path = f"{base}.json"
+        self.results_path = f"{base}.jsonl"
+        self.riot_id = riot_id
+        self.region = region
+        self.match_ids = []
+        self.done = set()
+        self.exhausted = False
+        os.makedirs(directory, exist_ok=True)
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        self.match_ids = state.get('match_ids', [])
+        self.done = set(state.get('done', []))
+        self.exhausted = state.get('exhausted', False)
+
+    def save(self):
+        state = {
+            'riot_id': self.riot_id,
+            'region': self.region,
+            'match_ids': self.match_ids,
+            'done': sorted(self.done),
+            'exhausted': self.exhausted,
+        }
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.path)
+
+    def add_match_ids(self, match_ids):
+        known = set(self.match_ids)
+        new_ids = [match_id for match_id in match_ids if match_id not in known]
+        self.match_ids.extend(new_ids)
+        return new_ids
+
+    def pending(self):
+        return [match_id for match_id in self.match_ids if match_id not in self.done]
+
+    def mark_done(self, match_id, match_data):
+        with open(self.results_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'riot_id': self.riot_id, **match_data}, default=list) + '\n')
+        self.done.add(match_id)
+        self.save()
+
+
+class Progress:
+    def __init__(self, players):
+        self.players = players
+        self.players_done = 0
+        self.matches_done = 0
+        self.matches_failed = 0
+        self.started = time.monotonic()
+
+    def report(self):
+        elapsed = time.monotonic() - self.started
+        rate = self.matches_done / elapsed * 60 if elapsed else 0
+        print(f"[history] players {self.players_done}/{self.players} | matches {self.matches_done} "
+              f"({self.matches_failed} failed) | {rate:.1f} matches/min")
+
+
+class HistoryCrawler:
+    """
+    Backfill whole match histories: page through each profile, checkpoint the
+    match ids and scrape every match not already done, several players at once.
+    """
+
+    def __init__(self, tft, checkpoint_dir='checkpoints', concurrency=2, max_matches=None,
+                 max_pages=50, report_interval=30, summary_only=False):
+        self.tft = tft
+        self.checkpoint_dir = checkpoint_dir
+        self.concurrency = concurrency
+        self.max_matches = max_matches
+        self.max_pages = max_pages
+        self.report_interval = report_interval
+        # store the collapsed cards' summary fields only, never expanding a match
+        self.summary_only = summary_only
+        self.progress = None
+
+    async def enumerate_matches(self, page, checkpoint):
+        """Load older matches until the history ends or max_matches ids are known"""
+        for _ in range(self.max_pages):
+            checkpoint.add_match_ids(await self.tft.list_match_ids(page))
+            checkpoint.save()
+            if self.max_matches and len(checkpoint.match_ids) >= self.max_matches:
+                return
+            if not await self.tft.load_more_matches(page):
+                checkpoint.exhausted = True
+                checkpoint.save()
+                return
+
+    async def refresh_matches(self, page, checkpoint):
+        """
+        Matches played since the history was exhausted: the list is newest
+        first, so take ids up to the first one already checkpointed.
+        """
+        known = set(checkpoint.match_ids)
+        for _ in range(self.max_pages):
+            match_ids = await self.tft.list_match_ids(page)
+            seen = [i for i, match_id in enumerate(match_ids) if match_id in known]
+            if seen or not await self.tft.load_more_matches(page):
+                break
+        new_ids = match_ids[:seen[0]] if seen else match_ids
+        checkpoint.match_ids[:0] = [match_id for match_id in new_ids if match_id not in known]
+        checkpoint.save()
+
+    async def load_match_card(self, page, match_id):
+        """Older cards only exist after paging down again on a fresh page"""
+        for _ in range(self.max_pages):
+            if await page.query_selector(f'#{match_id}'):
+                return True
+            if not await self.tft.load_more_matches(page):
+                return False
+        return False
+
+    async def record_summaries(self, page, checkpoint, pending):
+        """Summary-only mode: mark matches done from their list cards, paging down for older ones"""
+        pending = set(pending)
+        for _ in range(self.max_pages):
+            for summary in await self.tft.list_match_summaries(page):
+                if summary['match_id'] in pending:
+                    pending.discard(summary['match_id'])
+                    checkpoint.mark_done(summary['match_id'], {'match_id': summary['match_id'], 'summary': summary})
+                    self.progress.matches_done += 1
+            if not pending or not await self.tft.load_more_matches(page):
+                return
+
+    async def crawl_player(self, page, riot_id, region):
+        checkpoint = Checkpoint(self.checkpoint_dir, riot_id, region)
+        budget = self.tft.resilience.player_budget()
+        await self.tft.open_profile(page, riot_id, region, budget)
+        if checkpoint.exhausted:
+            await self.refresh_matches(page, checkpoint)
+        else:
+            await self.enumerate_matches(page, checkpoint)
+
+        pending = checkpoint.pending()
+        if self.max_matches:
+            pending = pending[:max(0, self.max_matches - len(checkpoint.done))]
+        if self.summary_only:
+            await self.record_summaries(page, checkpoint, pending)
+            return
+        for match_id in pending:
+            if not await self.load_match_card(page, match_id):
+                print(f"Match {match_id} is no longer listed for {riot_id}")
+                self.progress.matches_failed += 1
+                continue
+            match_data = await self.tft.get_match_details(page, match_id)
+            if match_data is None:
+                self.progress.matches_failed += 1
+                continue
+            checkpoint.mark_done(match_id, match_data)
+            await self.tft.collapse_match(page, match_id)
+            self.progress.matches_done += 1
+
+    async def _crawl_one(self, pool, semaphore, riot_id, region):
+        async with semaphore:
+            try:
+                async with pool.page() as page:
+                    await self.crawl_player(page, riot_id, region)
+            except CircuitOpenError as e:
+                print(f"Skipping {riot_id}: {e}")
+            except SelectorDriftError:
+                raise
+            except Exception as e:
+                print(f"Error backfilling {riot_id}: {e}")
+            finally:
+                self.progress.players_done += 1
+
+    async def _report_loop(self):
+        while True:
+            await asyncio.sleep(self.report_interval)
+            self.progress.report()
+
+    async def crawl(self, players):
+        """Backfill every (riot_id, region) in `players`, `concurrency` at a time"""
+        self.progress = Progress(len(players))
+        pool = self.tft.browser_pool or self.tft.new_browser_pool(self.concurrency)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        reporter = asyncio.create_task(self._report_loop())
+        try:
+            await gather_or_cancel(*(self._crawl_one(pool, semaphore, riot_id, region) for riot_id, region in players))
+        finally:
+            reporter.cancel()
+            if pool is not self.tft.browser_pool:
+                await pool.close()
+        self.progress.report()
+        return self.progress
+
+
+def argparse_args():
+    parser = argparse.ArgumentParser(description='Backfill full TFT match histories with resumable checkpoints')
+    parser.add_argument('riot_ids', nargs='*', help='Riot IDs (name#tag or name#tag,region)')
+    parser.add_argument('--players', help='File with one name#tag[,region] per line')
+    parser.add_argument('--region', default=None, help='Region for players without one (default from the crawl profile)')
+    parser.add_argument('--checkpoint-dir', default='checkpoints', help='Directory for progress and results')
+    parser.add_argument('--concurrency', type=int, default=None, help='Players crawled in parallel (default from the crawl profile)')
+    parser.add_argument('--max-matches', type=int, default=None, help='Stop after this many matches per player')
+    parser.add_argument('--match-index', default=None, help='SQLite match index shared with other crawls')
+    parser.add_argument('--summary-only', action='store_true', help='Store the match list summary fields only, without expanding matches')
+    add_drift_arguments(parser)
+    parser.add_argument('--max-rss-mb', type=int, default=None, help='Pause new page work while the process uses more memory than this')
+    parser.add_argument('--asset-cache', default=None, help='Directory to keep local copies of the icons seen during the crawl')
+    parser.add_argument('--profile-dir', default=None, metavar='DIR', help='Profile the crawl; writes profile.folded (flamegraph), report.txt and matches.jsonl to DIR')
+    add_config_arguments(parser)
+    return parser.parse_args()
+
+async def main():
+    args = argparse_args()
+    config = config_from_args(args)
+    region = args.region or config.crawl.region
+    players = [parse_player(riot_id, region) for riot_id in args.riot_ids]
+    if args.players:
+        players.extend(read_players(args.players, region))
+    if not players:
+        print("No players given")
+        return
+    if config.crawl.max_rps:
+        configure_rate_limiter(global_rate=config.crawl.max_rps)
+    overrides = {}
+    if args.match_index:
+        overrides['match_index'] = MatchIndex(args.match_index)
+    if args.asset_cache:
+        overrides['asset_cache'] = AssetCache(args.asset_cache)
+    tft = MetaTFT.from_config(config,
+                              memory_watermark=MemoryWatermark(args.max_rss_mb) if args.max_rss_mb else None,
+                              drift_monitor=drift_monitor_from_args(args),
+                              profiler=Profiler() if args.profile_dir else None,
+                              **overrides)
+    concurrency = args.concurrency or config.crawl.concurrency
+    crawler = HistoryCrawler(tft, args.checkpoint_dir, concurrency, args.max_matches, summary_only=args.summary_only)
+    if tft.profiler is not None:
+        tft.profiler.start()
+    try:
+        await crawler.crawl(players)
+    finally:
+        if tft.profiler is not None:
+            tft.profiler.stop()
+            tft.profiler.write(args.profile_dir)
+            print(f"Profile written to {args.profile_dir}")
+    if tft.asset_cache is not None:
+        print(f"{await tft.asset_cache.fetch_pending()} new assets cached in {tft.asset_cache.directory}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
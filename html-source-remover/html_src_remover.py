@@ -1,94 +1,265 @@
 # to run:
 # python html-source-remover/html_src_remover.py input file
 # python html-source-remover/html_src_remover.py data-sample/timeline-stage1-3.txt
+# python html-source-remover/html_src_remover.py captures/ "archive/**/*.html.gz" -j 8
 import os
-import re
-from bs4 import BeautifulSoup
+import glob
+import gzip
 import argparse
+from html import escape
+from html.parser import HTMLParser
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# Read size for streaming input; the rewriter never holds more than one chunk
+# plus whatever HTMLParser buffers for an unfinished tag.
+CHUNK_SIZE = 1 << 20
+DEFAULT_PATTERNS = ('*.html', '*.htm', '*.txt', '*.html.gz', '*.htm.gz', '*.txt.gz')
+STRIPPED_ATTRIBUTES = ('src', 'style')
+
+
+class SrcRemovingRewriter(HTMLParser):
+    """
+    Single pass, tokenizer based rewriter.
+
+    Drops src and style attributes from every tag, removes svg elements without
+    a class and empties the rest down to `<svg class="...">`. Markup that needs no
+    change is written back exactly as it was read.
+    """
+
+    def __init__(self, write):
+        super().__init__(convert_charrefs=False)
+        self.write = write
+        # > 0 while inside an svg whose children are being dropped
+        self.svg_depth = 0
+
+    def _format_tag(self, tag, attrs, close=''):
+        parts = [tag]
+        for name, value in attrs:
+            if value is None:
+                parts.append(name)
+            else:
+                parts.append(f'{name}="{escape(value, quote=True)}"')
+        return f"<{' '.join(parts)}{close}>"
+
+    def _rewrite_start(self, tag, attrs, self_closing):
+        raw = self.get_starttag_text()
+        if tag == 'svg':
+            class_value = next((value for name, value in attrs if name == 'class'), None)
+            if class_value is None:
+                return ''
+            # children are dropped, so the element is always closed right away
+            return f'{self._format_tag(tag, [("class", class_value)])}</svg>'
+        if not any(name in STRIPPED_ATTRIBUTES for name, _ in attrs):
+            return raw
+        kept = [(name, value) for name, value in attrs if name not in STRIPPED_ATTRIBUTES]
+        return self._format_tag(tag, kept, ' /' if self_closing else '')
+
+    def handle_starttag(self, tag, attrs):
+        if self.svg_depth:
+            if tag == 'svg':
+                self.svg_depth += 1
+            return
+        self.write(self._rewrite_start(tag, attrs, False))
+        if tag == 'svg':
+            self.svg_depth = 1
+
+    def handle_startendtag(self, tag, attrs):
+        if self.svg_depth:
+            return
+        self.write(self._rewrite_start(tag, attrs, True))
+
+    def handle_endtag(self, tag):
+        if self.svg_depth:
+            if tag == 'svg':
+                self.svg_depth -= 1
+            return
+        self.write(f'</{tag}>')
+
+    def handle_data(self, data):
+        if not self.svg_depth:
+            self.write(data)
+
+    def handle_entityref(self, name):
+        if not self.svg_depth:
+            self.write(f'&{name};')
+
+    def handle_charref(self, name):
+        if not self.svg_depth:
+            self.write(f'&#{name};')
+
+    def handle_comment(self, data):
+        if not self.svg_depth:
+            self.write(f'<!--{data}-->')
+
+    def handle_decl(self, decl):
+        self.write(f'<!{decl}>')
+
+    def handle_pi(self, data):
+        self.write(f'<?{data}>')
+
+    def unknown_decl(self, data):
+        if not self.svg_depth:
+            self.write(f'<![{data}]>')
+
 
 def remove_attributes_and_svg(content):
     """
     Remove src and style attributes from HTML content and clean SVG elements.
-    
+
     Args:
         content (str): The content to process
-        
+
     Returns:
         str: Processed content
     """
     try:
-        soup = BeautifulSoup(content, 'html.parser')
-        
-        # Find all elements with src or style attributes
-        for tag in soup.find_all(attrs={'src': True, 'style': True}):
-            # Remove both src and style attributes
-            del tag['src']
-            del tag['style']
-        
-        # Find elements with only src attribute
-        for tag in soup.find_all(attrs={'src': True}):
-            del tag['src']
-            
-        # Find elements with only style attribute
-        for tag in soup.find_all(attrs={'style': True}):
-            del tag['style']
-            
-        # Handle SVG elements
-        for svg in soup.find_all('svg'):
-            if not svg.has_attr('class'):
-                # Remove SVG elements without class
-                svg.decompose()
-            else:
-                # Keep only the class attribute
-                class_value = svg['class']
-                svg.attrs.clear()
-                svg['class'] = class_value
-                svg.clear()  # Remove children
-        
-        return str(soup)
-        
+        output = []
+        rewriter = SrcRemovingRewriter(output.append)
+        rewriter.feed(content)
+        rewriter.close()
+        return ''.join(output)
+
     except Exception as e:
         print(f"Error processing content: {str(e)}")
         return content
 
-def remove_html_src(input_file, output_file=None):
+def _open_text(path, mode, compressed=None):
+    if compressed is None:
+        compressed = path.endswith('.gz')
+    if compressed:
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+def remove_html_src(input_file, output_file=None, verbose=True):
     """
     Remove src and style attributes from HTML content in a file and clean SVG elements.
-    
+    Gzip-compressed files (*.gz) are read and written compressed.
+
     Args:
         input_file (str): Path to the input file
         output_file (str, optional): Path to the output file. If not provided, will overwrite input file.
+        verbose (bool, optional): Print a line per processed file.
+
+    Returns:
+        tuple: (input size in bytes, output size in bytes), or None on error
     """
     try:
-        # Read the input file
-        with open(input_file, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # Process the content
-        processed_content = remove_attributes_and_svg(content)
-        
         # Determine output file
         if output_file is None:
             output_file = input_file
-        
-        # Write the cleaned content
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(processed_content)
-            
-        print(f"Successfully processed {input_file}")
-        print(f"Output saved to {output_file}")
-        
+
+        # Stream into a temporary file next to the target so an in-place run never
+        # reads and writes the same file at once
+        size_in = os.path.getsize(input_file)
+        tmp_file = f"{output_file}.tmp{os.getpid()}"
+        # the codec follows the final name, not the temporary one
+        with _open_text(input_file, 'r') as src, _open_text(tmp_file, 'w', output_file.endswith('.gz')) as dst:
+            rewriter = SrcRemovingRewriter(dst.write)
+            while True:
+                chunk = src.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                rewriter.feed(chunk)
+            rewriter.close()
+        os.replace(tmp_file, output_file)
+
+        if verbose:
+            print(f"Successfully processed {input_file}")
+            print(f"Output saved to {output_file}")
+        return size_in, os.path.getsize(output_file)
+
     except Exception as e:
-        print(f"Error processing file: {str(e)}")
+        print(f"Error processing file {input_file}: {str(e)}")
+        if 'tmp_file' in locals() and os.path.exists(tmp_file):
+            os.remove(tmp_file)
+        return None
+
+def collect_input_files(inputs, patterns=DEFAULT_PATTERNS):
+    """
+    Expand files, directories (searched recursively for `patterns`) and glob
+    expressions into a sorted list of unique file paths.
+    """
+    files = set()
+    for item in inputs:
+        if os.path.isdir(item):
+            for pattern in patterns:
+                files.update(glob.glob(os.path.join(item, '**', pattern), recursive=True))
+        elif os.path.isfile(item):
+            files.add(item)
+        else:
+            files.update(path for path in glob.glob(item, recursive=True) if os.path.isfile(path))
+    return sorted(files)
+
+def _output_path(input_file, output_dir, root):
+    if output_dir is None:
+        return None
+    relative = os.path.relpath(input_file, root)
+    output_file = os.path.join(output_dir, relative)
+    os.makedirs(os.path.dirname(output_file) or '.', exist_ok=True)
+    return output_file
+
+def _process_one(args):
+    input_file, output_file = args
+    result = remove_html_src(input_file, output_file, verbose=False)
+    return (input_file, *result) if result else (input_file, 0, None)
+
+def remove_html_src_batch(inputs, output_dir=None, workers=None, patterns=DEFAULT_PATTERNS):
+    """
+    Process every file matched by `inputs` in parallel worker processes.
+
+    Args:
+        inputs (list): Files, directories or glob patterns
+        output_dir (str, optional): Mirror the cleaned files into this directory
+            instead of rewriting them in place.
+        workers (int, optional): Worker process count, defaults to the CPU count.
+
+    Returns:
+        dict: processed/failed counts and total bytes before and after
+    """
+    files = collect_input_files(inputs, patterns)
+    root = os.path.commonpath([os.path.dirname(os.path.abspath(f)) for f in files]) if files else ''
+    jobs = [(f, _output_path(os.path.abspath(f), output_dir, root)) for f in files]
+    stats = {'processed': 0, 'failed': 0, 'bytes_in': 0, 'bytes_out': 0}
+    if not jobs:
+        print("No input files found")
+        return stats
+
+    def record(input_file, size_in, size_out):
+        if size_out is None:
+            stats['failed'] += 1
+            return
+        stats['processed'] += 1
+        stats['bytes_in'] += size_in
+        stats['bytes_out'] += size_out
+
+    if workers == 1 or len(jobs) == 1:
+        for job in jobs:
+            record(*_process_one(job))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(_process_one, job) for job in jobs]
+            for done, future in enumerate(as_completed(futures), 1):
+                record(*future.result())
+                if done % 100 == 0:
+                    print(f"{done}/{len(jobs)} files processed")
+
+    print(f"Processed {stats['processed']} files ({stats['failed']} failed): "
+          f"{stats['bytes_in'] / 1e6:.1f} MB -> {stats['bytes_out'] / 1e6:.1f} MB")
+    return stats
 
 def main():
     parser = argparse.ArgumentParser(description='Remove src and style attributes from HTML content and clean SVG elements')
-    parser.add_argument('input_file', help='Input file path')
-    parser.add_argument('-o', '--output', help='Output file path (optional)')
-    
+    parser.add_argument('inputs', nargs='+', help='Input files, directories or glob patterns')
+    parser.add_argument('-o', '--output', help='Output file path for a single input, or output directory for a batch (optional)')
+    parser.add_argument('-j', '--jobs', type=int, default=None, help='Number of worker processes (default: CPU count)')
+
     args = parser.parse_args()
-    
-    remove_html_src(args.input_file, args.output)
+
+    files = collect_input_files(args.inputs)
+    if len(files) == 1 and len(args.inputs) == 1 and os.path.isfile(args.inputs[0]):
+        remove_html_src(files[0], args.output)
+        return
+    remove_html_src_batch(args.inputs, args.output, args.jobs)
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -0,0 +1,41 @@
+import os
+import gzip
+from html_src_remover import remove_attributes_and_svg, remove_html_src, remove_html_src_batch
+
+# test_html_src_remover.py
+
+PAGE = ('<div class="Unit" style="color: red"><img class="Icon" src="https://cdn.example.com/a.png" alt="Vi"/>'
+        '<svg class="StageHPIcon"><path d="M0 0"/></svg><svg><circle r="1"/></svg>&amp; text</div>')
+CLEANED = '<div class="Unit"><img class="Icon" alt="Vi" /><svg class="StageHPIcon"></svg>&amp; text</div>'
+
+
+def test_rewriter_strips_src_style_and_svg_children():
+    assert remove_attributes_and_svg(PAGE) == CLEANED
+    untouched = '<p id="x">plain <b>markup</b></p><!-- note -->'
+    assert remove_attributes_and_svg(untouched) == untouched
+
+def test_gzip_file_stays_gzip_in_place(tmp_path):
+    path = str(tmp_path / 'page.html.gz')
+    with gzip.open(path, 'wt', encoding='utf-8') as f:
+        f.write(PAGE)
+
+    assert remove_html_src(path, verbose=False) is not None
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        assert f.read() == CLEANED
+    assert os.listdir(tmp_path) == ['page.html.gz']
+
+def test_batch_mirrors_files_into_output_dir(tmp_path):
+    source = tmp_path / 'captures'
+    (source / 'sub').mkdir(parents=True)
+    (source / 'a.html').write_text(PAGE, encoding='utf-8')
+    with gzip.open(source / 'sub' / 'b.html.gz', 'wt', encoding='utf-8') as f:
+        f.write(PAGE)
+    output = tmp_path / 'clean'
+
+    stats = remove_html_src_batch([str(source)], str(output), workers=1)
+
+    assert stats['processed'] == 2 and stats['failed'] == 0
+    assert (output / 'a.html').read_text(encoding='utf-8') == CLEANED
+    with gzip.open(output / 'sub' / 'b.html.gz', 'rt', encoding='utf-8') as f:
+        assert f.read() == CLEANED
+    assert (source / 'a.html').read_text(encoding='utf-8') == PAGE
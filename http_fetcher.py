@@ -0,0 +1,100 @@
+import re
+import asyncio
+import threading
+from browser_pool import DEFAULT_USER_AGENT
+
+# Riot match ids are <platform>_<game id>: TW2_123456789, NA1_..., EUW1_..., KR_...
+MATCH_ID = re.compile(r'\b([A-Z]{2,4}\d?_\d{6,})\b')
+
+
+def match_ids_from_html(html):
+    """Match ids in a server-rendered profile page, in page order, without building a soup"""
+    seen = set()
+    match_ids = []
+    for match_id in MATCH_ID.findall(html or ''):
+        if match_id not in seen:
+            seen.add(match_id)
+            match_ids.append(match_id)
+    return match_ids
+
+
+class HttpFetcher:
+    """
+    Plain HTTP client for the pages that don't need a browser.
+
+    One keep-alive client is shared by every call, so polls reuse warm
+    connections. HTTP/2 is used when httpx and h2 are installed, otherwise
+    a pooled requests.Session. Calls return None on errors or non-200
+    responses, and the caller then falls back to Playwright.
+    """
+
+    def __init__(self, pool_size=10, timeout=10, http2=True, user_agent=DEFAULT_USER_AGENT, client=None):
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.http2 = http2
+        self.user_agent = user_agent
+        self.requests_sent = 0
+        self.bytes_received = 0
+        self.failures = 0
+        self._client = client
+        self._lock = threading.Lock()
+
+    def _make_client(self):
+        headers = {'User-Agent': self.user_agent, 'Accept': 'text/html,application/json'}
+        if self.http2:
+            try:
+                import h2  # noqa: F401, httpx needs it for http2=True
+                import httpx
+                limits = httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size)
+                return httpx.Client(http2=True, headers=headers, limits=limits, follow_redirects=True)
+            except ImportError:
+                pass
+        import requests
+        from requests.adapters import HTTPAdapter
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.headers.update(headers)
+        return session
+
+    def client(self):
+        with self._lock:
+            if self._client is None:
+                self._client = self._make_client()
+            return self._client
+
+    def close(self):
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+    def get_response(self, url):
+        self.requests_sent += 1
+        try:
+            response = self.client().get(url, timeout=self.timeout)
+        except Exception as e:
+            self.failures += 1
+            print(f"HTTP fetch failed for {url}: {e}")
+            return None
+        self.bytes_received += len(response.content)
+        if response.status_code != 200:
+            self.failures += 1
+            return None
+        return response
+
+    def get(self, url):
+        response = self.get_response(url)
+        return response.text if response is not None else None
+
+    def get_content(self, url):
+        response = self.get_response(url)
+        return response.content if response is not None else None
+
+    async def fetch(self, url):
+        return await asyncio.to_thread(self.get, url)
+
+    async def list_match_ids(self, url):
+        """Match ids of a profile page, [] when the page holds none without JS"""
+        html = await self.fetch(url)
+        return match_ids_from_html(html) if html else []
@@ -0,0 +1,281 @@
+# to run:
+# python lobby.py "name#tag" --region tw --max-players 500
+import json
+import time
+import sqlite3
+import asyncio
+import argparse
+from memory import MemoryWatermark
+from metatft_getdata import MetaTFT
+from resilience import CircuitOpenError, gather_or_cancel
+from rank import ladder_score
+from config import add_config_arguments, config_from_args
+from rate_limiter import configure_rate_limiter
+from validation import SelectorDriftError, add_drift_arguments, drift_monitor_from_args
+
+# above any ladder score, see rank.py
+SEED_PRIORITY = 100000
+
+
+def rank_priority(avg_rank):
+    """Higher for stronger lobbies: the lobby average's ladder score, 0 when unknown"""
+    score = ladder_score(avg_rank)
+    return 0 if score is None else score + 1
+
+def riot_id_from_player(player):
+    """players_tab_player_data name/tag -> 'name#tag', None without a tag"""
+    name = player.get('name', '')
+    tag = player.get('tag', '')
+    if not tag:
+        return None
+    if name.endswith(tag):
+        name = name[:-len(tag)]
+    name = name.strip()
+    tag = tag.strip().lstrip('#')
+    return f"{name}#{tag}" if name and tag else None
+
+
+class Frontier:
+    """
+    SQLite-backed crawl frontier shared across runs.
+
+    `players` is the priority queue of Riot IDs still to visit; a player
+    deferred while its region's circuit breaker is open waits in it until
+    `not_before`. `matches` is where the crawl's results are stored, and its
+    INSERT OR IGNORE claim is what keeps two concurrent workers from
+    scraping the same lobby. A MatchIndex can't replace it: it is optional,
+    only keeps the lobby-wide fields and is filled after a scrape, not
+    claimed before one.
+    """
+
+    def __init__(self, path='frontier.sqlite'):
+        self.db = sqlite3.connect(path)
+        self.db.executescript('''
+            CREATE TABLE IF NOT EXISTS players (
+                riot_id TEXT NOT NULL,
+                region TEXT NOT NULL,
+                priority INTEGER NOT NULL DEFAULT 0,
+                depth INTEGER NOT NULL DEFAULT 0,
+                state TEXT NOT NULL DEFAULT 'pending',
+                added_at REAL NOT NULL,
+                not_before REAL NOT NULL DEFAULT 0,
+                PRIMARY KEY (riot_id, region)
+            );
+            CREATE INDEX IF NOT EXISTS players_pending ON players (state, priority DESC, added_at);
+            CREATE TABLE IF NOT EXISTS matches (
+                match_id TEXT PRIMARY KEY,
+                region TEXT,
+                scraped_by TEXT,
+                data TEXT,
+                scraped_at REAL
+            );
+        ''')
+        # players popped and matches claimed by a run that crashed go back to the queue
+        self.db.execute("UPDATE players SET state = 'pending' WHERE state = 'in_progress'")
+        self.db.execute('DELETE FROM matches WHERE data IS NULL')
+        self.db.commit()
+
+    def close(self):
+        self.db.close()
+
+    def push(self, riot_id, region, priority=0, depth=0):
+        """Add a player, or raise the priority of one still pending"""
+        self.db.execute('''
+            INSERT INTO players (riot_id, region, priority, depth, added_at) VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (riot_id, region) DO UPDATE SET priority = MAX(priority, excluded.priority)
+            WHERE state = 'pending'
+        ''', (riot_id, region, priority, depth, time.time()))
+        self.db.commit()
+
+    def pop(self):
+        row = self.db.execute('''
+            SELECT riot_id, region, depth FROM players WHERE state = 'pending' AND not_before <= ?
+            ORDER BY priority DESC, added_at LIMIT 1
+        ''', (time.time(),)).fetchone()
+        if row is None:
+            return None
+        self.set_state(row[0], row[1], 'in_progress')
+        return row
+
+    def set_state(self, riot_id, region, state):
+        self.db.execute('UPDATE players SET state = ? WHERE riot_id = ? AND region = ?', (state, riot_id, region))
+        self.db.commit()
+
+    def defer(self, riot_id, region, seconds):
+        """Put a popped player back, not to be popped again for `seconds`"""
+        self.db.execute("UPDATE players SET state = 'pending', not_before = ? WHERE riot_id = ? AND region = ?",
+                        (time.time() + seconds, riot_id, region))
+        self.db.commit()
+
+    def is_scraped(self, match_id):
+        return self.db.execute('SELECT 1 FROM matches WHERE match_id = ?', (match_id,)).fetchone() is not None
+
+    def pending_count(self):
+        return self.db.execute("SELECT COUNT(*) FROM players WHERE state = 'pending'").fetchone()[0]
+
+    def claim_match(self, match_id, region, riot_id):
+        """True if nobody scraped `match_id` yet; the caller must save or release it"""
+        cursor = self.db.execute(
+            'INSERT OR IGNORE INTO matches (match_id, region, scraped_by) VALUES (?, ?, ?)',
+            (match_id, region, riot_id))
+        self.db.commit()
+        return cursor.rowcount == 1
+
+    def release_match(self, match_id):
+        self.db.execute('DELETE FROM matches WHERE match_id = ? AND data IS NULL', (match_id,))
+        self.db.commit()
+
+    def save_match(self, match_id, match_data):
+        self.db.execute('UPDATE matches SET data = ?, scraped_at = ? WHERE match_id = ?',
+                        (json.dumps(match_data, default=list), time.time(), match_id))
+        self.db.commit()
+
+
+class LobbyCrawler:
+    """
+    Breadth-first ladder discovery: scrape a player's recent matches and queue
+    the other lobby members, strongest lobbies first.
+    """
+
+    def __init__(self, tft, frontier, concurrency=2, matches_per_player=5, max_players=None, max_depth=None):
+        self.tft = tft
+        self.frontier = frontier
+        self.concurrency = concurrency
+        self.matches_per_player = matches_per_player
+        self.max_players = max_players
+        self.max_depth = max_depth
+        self.players_crawled = 0
+        self.matches_scraped = 0
+        self.matches_skipped = 0
+        self._active = 0
+
+    def _details_selection(self):
+        # discovery needs the lobby list even when the caller trimmed the tabs
+        tabs = self.tft.tabs | {'players'}
+        fields = self.tft.fields | {'players', 'avg_opponent_rank'} if self.tft.fields else None
+        return tabs, fields
+
+    def discover(self, match_data, region, depth):
+        if self.max_depth is not None and depth >= self.max_depth:
+            return
+        priority = rank_priority(match_data.get('avg_opponent_rank'))
+        for player in match_data.get('players', []):
+            riot_id = riot_id_from_player(player)
+            if riot_id:
+                self.frontier.push(riot_id, region, priority, depth + 1)
+
+    async def crawl_player(self, page, riot_id, region, depth):
+        await self.tft.open_profile(page, riot_id, region)
+        match_ids = (await self.tft.list_match_ids(page))[:self.matches_per_player]
+        tabs, fields = self._details_selection()
+        for match_id in match_ids:
+            if not self.frontier.claim_match(match_id, region, riot_id):
+                self.matches_skipped += 1
+                continue
+            match_data = await self.tft.get_match_details(page, match_id, tabs=tabs, fields=fields)
+            if match_data is None:
+                self.frontier.release_match(match_id)
+                continue
+            self.frontier.save_match(match_id, match_data)
+            self.matches_scraped += 1
+            self.discover(match_data, region, depth)
+            await self.tft.collapse_match(page, match_id)
+
+    async def has_new_matches(self, riot_id, region):
+        """
+        Cheap HTTP poll: False only when every recent match is known already.
+        The HTTP ids span every queue, so this is change detection only: the
+        newest ids being all scraped means no new match in the crawled queue
+        either, anything else opens the browser, which applies the filter.
+        """
+        match_ids = await self.tft.http_match_ids(riot_id, region)
+        if not match_ids:
+            return True
+        return any(not self.frontier.is_scraped(match_id) for match_id in match_ids[:self.matches_per_player])
+
+    def _budget_left(self):
+        return self.max_players is None or self.players_crawled < self.max_players
+
+    async def _worker(self, pool):
+        while self._budget_left():
+            job = self.frontier.pop()
+            if job is None:
+                if self._active == 0 and self.frontier.pending_count() == 0:
+                    return
+                # another worker may still discover players, or a deferred one becomes due
+                await asyncio.sleep(1)
+                continue
+            riot_id, region, depth = job
+            self._active += 1
+            self.players_crawled += 1
+            try:
+                # a player whose recent lobbies were all scraped costs one HTTP request, not a page
+                if await self.has_new_matches(riot_id, region):
+                    async with pool.page() as page:
+                        await self.crawl_player(page, riot_id, region, depth)
+                self.frontier.set_state(riot_id, region, 'done')
+            except CircuitOpenError as e:
+                # retried once the breaker lets calls through again, and not counted against max_players
+                print(f"Deferring {riot_id}: {e}")
+                self.frontier.defer(riot_id, region, max(e.retry_after, 1.0))
+                self.players_crawled -= 1
+            except (SelectorDriftError, asyncio.CancelledError):
+                # a drift halt, or a sibling worker's halt cancelling this one
+                self.frontier.set_state(riot_id, region, 'pending')
+                raise
+            except Exception as e:
+                print(f"Error crawling {riot_id}: {e}")
+                self.frontier.set_state(riot_id, region, 'failed')
+            finally:
+                self._active -= 1
+            print(f"[lobby] players {self.players_crawled} | matches {self.matches_scraped} scraped, "
+                  f"{self.matches_skipped} already seen | frontier {self.frontier.pending_count()}")
+
+    async def crawl(self, seeds):
+        for riot_id, region in seeds:
+            self.frontier.push(riot_id, region, SEED_PRIORITY, 0)
+        pool = self.tft.browser_pool or self.tft.new_browser_pool(self.concurrency)
+        try:
+            await gather_or_cancel(*(self._worker(pool) for _ in range(self.concurrency)))
+        finally:
+            if pool is not self.tft.browser_pool:
+                await pool.close()
+
+
+def argparse_args():
+    parser = argparse.ArgumentParser(description='Discover and crawl TFT lobbies breadth-first')
+    parser.add_argument('riot_ids', nargs='*', help='Seed Riot IDs (name#tag)')
+    parser.add_argument('--region', default=None, help='Region of the seeds (default from the crawl profile)')
+    parser.add_argument('--frontier', default='frontier.sqlite', help='SQLite file holding the frontier and scraped matches')
+    parser.add_argument('--concurrency', type=int, default=None, help='Players crawled in parallel (default from the crawl profile)')
+    parser.add_argument('--matches-per-player', type=int, default=5, help='Recent matches scraped per player')
+    parser.add_argument('--max-players', type=int, default=None, help='Stop after crawling this many players')
+    parser.add_argument('--max-depth', type=int, default=None, help='Do not queue players further than this many lobbies from a seed')
+    add_drift_arguments(parser)
+    parser.add_argument('--no-http', action='store_true', help='Always open a browser, even to list match ids')
+    parser.add_argument('--max-rss-mb', type=int, default=None, help='Pause new page work while the process uses more memory than this')
+    add_config_arguments(parser)
+    return parser.parse_args()
+
+async def main():
+    args = argparse_args()
+    config = config_from_args(args)
+    if config.crawl.max_rps:
+        configure_rate_limiter(global_rate=config.crawl.max_rps)
+    frontier = Frontier(args.frontier)
+    try:
+        overrides = {'http_fetcher': None} if args.no_http else {}
+        tft = MetaTFT.from_config(config,
+                                  memory_watermark=MemoryWatermark(args.max_rss_mb) if args.max_rss_mb else None,
+                                  drift_monitor=drift_monitor_from_args(args),
+                                  **overrides)
+        crawler = LobbyCrawler(tft, frontier, args.concurrency or config.crawl.concurrency,
+                               args.matches_per_player, args.max_players, args.max_depth)
+        await crawler.crawl([(riot_id, args.region or config.crawl.region) for riot_id in args.riot_ids])
+        if tft.asset_cache is not None:
+            print(f"{await tft.asset_cache.fetch_pending()} new assets cached in {tft.asset_cache.directory}")
+    finally:
+        frontier.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,71 @@
+import math
+import json
+import time
+import sqlite3
+import hashlib
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter sized for `capacity` keys at `error_rate` false positives."""
+
+    def __init__(self, capacity=1_000_000, error_rate=0.001):
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, key):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class MatchIndex:
+    """
+    Match ids already scraped, shared across players and runs.
+
+    Lookups hit an in-memory Bloom filter first, so unseen matches (the common
+    case) never touch SQLite; a filter hit is confirmed against the exact
+    table. The table also keeps the lobby-wide fields scraped the first time,
+    so later players can reuse them instead of scraping them again.
+    """
+
+    def __init__(self, path='match_index.sqlite', capacity=1_000_000, error_rate=0.001):
+        self.db = sqlite3.connect(path)
+        self.db.execute('''
+            CREATE TABLE IF NOT EXISTS seen_matches (
+                match_id TEXT PRIMARY KEY,
+                shared TEXT,
+                added_at REAL
+            )
+        ''')
+        self.db.commit()
+        self.bloom = BloomFilter(capacity, error_rate)
+        for (match_id,) in self.db.execute('SELECT match_id FROM seen_matches'):
+            self.bloom.add(match_id)
+
+    def close(self):
+        self.db.close()
+
+    def __contains__(self, match_id):
+        if match_id not in self.bloom:
+            return False
+        return self.db.execute('SELECT 1 FROM seen_matches WHERE match_id = ?', (match_id,)).fetchone() is not None
+
+    def add(self, match_id, shared=None):
+        self.db.execute(
+            'INSERT OR REPLACE INTO seen_matches (match_id, shared, added_at) VALUES (?, ?, ?)',
+            (match_id, json.dumps(shared or {}, default=list), time.time()))
+        self.db.commit()
+        self.bloom.add(match_id)
+
+    def get_shared(self, match_id):
+        row = self.db.execute('SELECT shared FROM seen_matches WHERE match_id = ?', (match_id,)).fetchone()
+        return json.loads(row[0]) if row and row[0] else {}
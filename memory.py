@@ -0,0 +1,69 @@
+import gc
+import os
+import sys
+import time
+import asyncio
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+def rss_mb():
+    """Resident set size of this process in MB, None where it can't be read"""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, AttributeError, IndexError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    # peak rather than current RSS, the closest thing without /proc; KB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+class MemoryWatermark:
+    """
+    Hold back new page work while the process RSS is above `limit_mb`.
+
+    `wait()` collects garbage and polls every `interval` seconds until RSS
+    drops under the limit. After `max_pause` seconds it lets the caller go
+    anyway, so memory that is never handed back to the OS can't stall a
+    crawl forever.
+    """
+
+    def __init__(self, limit_mb, interval=5, max_pause=120, reader=rss_mb, clock=time.monotonic):
+        self.limit_mb = limit_mb
+        self.interval = interval
+        self.max_pause = max_pause
+        self.reader = reader
+        self.clock = clock
+        self.pauses = 0
+        self.peak_mb = 0
+
+    def over(self):
+        rss = self.reader()
+        if rss is None:
+            return False
+        self.peak_mb = max(self.peak_mb, rss)
+        return rss > self.limit_mb
+
+    async def wait(self):
+        if not self.limit_mb or not self.over():
+            return
+        self.pauses += 1
+        started = self.clock()
+        gc.collect()
+        while self.over():
+            if self.max_pause is not None and self.clock() - started >= self.max_pause:
+                print(f"RSS still above {self.limit_mb} MB after {self.max_pause}s, continuing")
+                return
+            await asyncio.sleep(self.interval)
+            gc.collect()
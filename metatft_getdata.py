@@ -1,18 +1,132 @@
 import os
 import time
+import contextlib
 import asyncio
 import argparse
-from playwright.async_api import async_playwright
-from bs4 import BeautifulSoup
-from datetime import datetime
-from tabulate import tabulate
-from dotenv import load_dotenv
-import pyperclip
-from pprint import pprint
 import array_help
-import re
+import output
+import traits
+# Playwright, BeautifulSoup, NumPy (positioning) and dotenv are imported on the code
+# paths that use them, see bench_startup.py
+from browser_pool import BrowserPool, async_playwright
+from resilience import CircuitOpenError
+from rate_limiter import default_rate_limiter, configure_rate_limiter
+from match_index import MatchIndex
+from asset_cache import AssetCache
+from http_fetcher import HttpFetcher
+from config import Config, make_resilience, add_config_arguments, config_from_args
+from profiler import Profiler, THROTTLE
 
 # python '.\metatft_getdata.py' --no-file
+# python '.\metatft_getdata.py' --tabs players,timeline
+# python '.\metatft_getdata.py' --no-clipboard --profile-dir profile
+# python '.\metatft_getdata.py' --crawl-profile polite --config crawl.toml
+
+# each Personal Summary graph is stored under this prefix + its title, so the prefix is the field name
+GRAPH_FIELD = 'personal_summary_graph_'
+# tab name as shown on the site (lower case) -> match_data fields it fills
+TAB_FIELDS = {
+    'players': ('players_summary', 'avg_opponent_rank', 'players'),
+    'personal summary': ('personal_summary', GRAPH_FIELD, 'stage_breakdown', 'economy', 'planning', 'key_rounds'),
+    'timeline': ('timeline',),
+    'round detail': ('round_detail',),
+}
+# tabs that look the same from every lobby member's profile; the rest are about
+# the profile owner and still have to be scraped per player (see match_index.py)
+SHARED_TABS = {'players'}
+# queue filter -> label of its button on the profile page
+QUEUE_MODES = {
+    'ranked': 'Ranked',
+    'normal': 'Normal',
+    'hyper roll': 'Hyper Roll',
+    'double up': 'Double Up',
+    'all': 'All',
+}
+
+# id and SummaryData fields (match.py) of every collapsed match card, in one round-trip
+MATCH_LIST_JS = '''() => Array.from(document.querySelectorAll('.PlayerGame')).filter(card => card.id).map(card => {
+    const text = selector => {
+        const element = card.querySelector(selector);
+        return element ? element.textContent.trim() : '';
+    };
+    const secondary = Array.from(card.querySelectorAll('.PlayerMatchSummarySecondary')).map(element => element.textContent.trim());
+    const timing = (secondary.find(value => value.includes('•')) || '').split('•').map(value => value.trim());
+    const tactician = card.querySelector('.PlayerMatchTactician img');
+    const rankImage = card.querySelector('.PlayerMatchRankIcon img');
+    return {
+        match_id: card.id,
+        player_placement: text('.PlayerMatchSummaryPlacement'),
+        queue: text('.PlayerMatchSummaryQueue'),
+        played_at: secondary.find(value => !value.includes('•')) || '',
+        duration: timing[0] || '',
+        stage: timing[1] || '',
+        player_tactician_src: tactician ? tactician.getAttribute('src') || '' : '',
+        player_level: text('.PlayerMatchTactician .PlayerLevel'),
+        player_rank: {
+            tier: rankImage ? (rankImage.getAttribute('alt') || '').replace(/ rank badge$/i, '').toLowerCase() : '',
+            division: text('.PlayerMatchRankIcon [class*="PlayerRankDivision"]'),
+            lp: text('.LPContainer .PlayerRankLP'),
+        },
+        lp_change: text('.LPContainer .LPChange'),
+    };
+})'''
+# true once a queue filter click took effect: the listed match ids differ from
+# `before`, or the clicked filter button shows as active
+QUEUE_SWITCHED_JS = '''([label, before]) => {
+    const ids = Array.from(document.querySelectorAll('.PlayerGame')).filter(card => card.id).map(card => card.id);
+    if (ids.length && ids.join() !== before.join()) return true;
+    return Array.from(document.querySelectorAll('button')).some(button => button.textContent.trim() === label
+        && (button.getAttribute('aria-pressed') === 'true' || button.getAttribute('aria-selected') === 'true'
+            || /active|selected/i.test(button.className)));
+}'''
+
+def format_summary(summary):
+    rank = summary.get('player_rank') or {}
+    return (f"{summary.get('match_id')}: #{summary.get('player_placement', '?')} {summary.get('queue', '')} "
+            f"{summary.get('played_at', '')} {summary.get('duration', '')} {summary.get('stage', '')} "
+            f"Lv {summary.get('player_level', '?')} {rank.get('tier', '')} {rank.get('division', '')} "
+            f"{rank.get('lp', '')} ({summary.get('lp_change', '')})")
+
+def make_soup(content):
+    from bs4 import BeautifulSoup
+    return BeautifulSoup(content, 'html.parser')
+
+def normalize_tab_name(name):
+    return name.strip().lower().replace('_', ' ')
+
+def normalize_queue_mode(mode):
+    normalized = normalize_tab_name(mode)
+    if normalized not in QUEUE_MODES:
+        raise ValueError(f"Unknown queue mode: {mode} ({', '.join(QUEUE_MODES)})")
+    return normalized
+
+def select_tabs(tabs=None, fields=None):
+    """
+    Tabs to click for a tab and/or field selection, e.g. tabs={'players', 'timeline'}.
+    With only fields given, just the tabs holding those fields are clicked;
+    with both, every field must be on a selected tab and every tab must hold one.
+    """
+    if fields:
+        unknown = set(fields) - {field for tab_fields in TAB_FIELDS.values() for field in tab_fields}
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    if tabs:
+        selected = {normalize_tab_name(tab) for tab in tabs}
+        unknown = selected - set(TAB_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown tabs: {', '.join(sorted(unknown))}")
+        if fields:
+            outside = set(fields) - {field for tab in selected for field in TAB_FIELDS[tab]}
+            if outside:
+                raise ValueError(f"Fields not on the selected tabs: {', '.join(sorted(outside))}")
+            idle = {tab for tab in selected if not set(fields) & set(TAB_FIELDS[tab])}
+            if idle:
+                raise ValueError(f"Tabs holding none of the selected fields: {', '.join(sorted(idle))}")
+        return selected
+    if fields:
+        return {tab for tab, tab_fields in TAB_FIELDS.items() if set(fields) & set(tab_fields)}
+    return set(TAB_FIELDS)
+
 class TabParser:
     def parse(self, soup, match_data):
         raise NotImplementedError
@@ -28,8 +142,80 @@ class PersonalSummaryTabParser(TabParser):
         return match_data
 
 class MetaTFT:
-    def __init__(self):
-        self.base_url = "https://www.metatft.com/player"
+    def __init__(self, browser_pool=None, resilience=None, rate_limiter=None, tabs=None, fields=None, match_index=None,
+                 memory_watermark=None, drift_monitor=None, http_fetcher=None, queue_mode='ranked', match_list_ttl=300,
+                 asset_cache=None, profiler=None, config=None):
+        # timeouts, waits, retries and browser settings, see config.py
+        self.config = config or Config()
+        self.base_url = self.config.crawl.base_url
+        # optional BrowserPool; without one every call launches its own browser
+        self.browser_pool = browser_pool
+        # retries, per-region circuit breakers and adaptive timeouts, shared across calls
+        self.resilience = resilience or make_resilience(self.config)
+        # token buckets shared by every page of the process, see rate_limiter.py
+        self.rate_limiter = rate_limiter or default_rate_limiter()
+        # default tab/field selection for get_match_details, None fields means all
+        self.tabs = select_tabs(tabs, fields)
+        self.fields = set(fields) if fields else None
+        # optional MatchIndex; known matches only get their per-player tabs scraped
+        self.match_index = match_index
+        # optional MemoryWatermark; new matches wait while the process RSS is too high
+        self.memory_watermark = memory_watermark
+        # optional validation.DriftMonitor; samples field completeness, may halt or slow the crawl
+        self.drift_monitor = drift_monitor
+        # optional HttpFetcher; match lists are tried over plain HTTP before opening a browser
+        self.http_fetcher = http_fetcher
+        # queue filter clicked after loading a profile, None keeps the site default
+        self.queue_mode = normalize_queue_mode(queue_mode) if queue_mode else None
+        # (riot_id, region, mode) -> (loaded at, match summaries), see match_lists
+        self.match_list_ttl = match_list_ttl
+        self.match_list_cache = {}
+        # optional AssetCache; icon URLs of parsed pages are collected, fetched later in bulk
+        self.asset_cache = asset_cache
+        # optional profiler.Profiler; times Playwright calls, sleeps and throttling per match and tab
+        self.profiler = profiler
+
+    @classmethod
+    def from_config(cls, config, **kwargs):
+        """MetaTFT with the tabs, caches and HTTP client of a config; keyword arguments take precedence"""
+        crawl = config.crawl
+        kwargs.setdefault('tabs', crawl.tabs)
+        kwargs.setdefault('fields', crawl.fields)
+        kwargs.setdefault('queue_mode', crawl.modes[0] if crawl.modes else None)
+        kwargs.setdefault('match_list_ttl', crawl.match_list_ttl)
+        # only opened when not given, so an override never leaves a second file handle behind
+        if 'match_index' not in kwargs and crawl.match_index:
+            kwargs['match_index'] = MatchIndex(crawl.match_index)
+        if 'http_fetcher' not in kwargs and crawl.http:
+            kwargs['http_fetcher'] = HttpFetcher(user_agent=config.browser.user_agent)
+        if 'asset_cache' not in kwargs and crawl.asset_cache:
+            kwargs['asset_cache'] = AssetCache(crawl.asset_cache)
+        return cls(config=config, **kwargs)
+
+    def new_browser_pool(self, size, **kwargs):
+        """BrowserPool with the configured browser settings, for crawlers that don't get one"""
+        browser = self.config.browser
+        return BrowserPool(size=size, max_pages=browser.max_pages, max_js_heap_mb=browser.max_js_heap_mb,
+                           headless=browser.headless, viewport=browser.viewport(), user_agent=browser.user_agent,
+                           memory_watermark=self.memory_watermark, **kwargs)
+
+    def wants(self, fields, field):
+        return fields is None or field in fields
+
+    async def throttle(self):
+        """Wait for a rate limiter token before anything that makes metatft.com do work"""
+        if self.profiler is None:
+            await self.rate_limiter.acquire(self.base_url)
+            return
+        with self.profiler.timed(THROTTLE):
+            await self.rate_limiter.acquire(self.base_url)
+
+    def profile_tab(self, tab_name):
+        return self.profiler.tab(tab_name) if self.profiler is not None else contextlib.nullcontext()
+
+    def profiled_page(self, page):
+        """The page itself, or a proxy timing its calls under --profile-dir"""
+        return self.profiler.wrap_page(page) if self.profiler is not None else page
 
     def extract_player_data(self, player_match):
         player_data = {}
@@ -115,20 +301,8 @@ class MetaTFT:
             return player_data
 
     def extract_traits(self, player_match):
-        traits = []
-        trait_containers = player_match.find_all('div', class_='TraitCompactContainer')
-        for trait in trait_containers:
-            icon_container = trait.find('div', class_='TraitCompactIconContainer')
-            style = icon_container.get('style', '') if icon_container else {}
-            if not style.get('mask-image'):
-                continue
-            trait_name = style.split('traits/')[1].split('.png')[0]
-            trait_data = {
-                'name': trait_name,
-                'count': trait.get_text(strip=True)
-            }
-            traits.append(trait_data)
-        return traits
+        """[{'name', 'count', 'tier'}] of a player row, see traits.py"""
+        return traits.extract_compact_traits(player_match)
 
     def extract_units(self, player_match):
         units = []
@@ -168,7 +342,8 @@ class MetaTFT:
         return items
         
     def tabs_content(self, tags):
-        return map(lambda tag: f"{tag.get_text(strip=True)}:{tag.get('class', [])[1].replace('PlayerTag', '')}" if len(tag.get('class', []))==2 else f"{tag.get_text(strip=True)}:none", tags)
+        # a list of plain strings, a lazy map would keep the whole soup alive inside match_data
+        return list(map(lambda tag: f"{tag.get_text(strip=True)}:{tag.get('class', [])[1].replace('PlayerTag', '')}" if len(tag.get('class', []))==2 else f"{tag.get_text(strip=True)}:none", tags))
 
     def players_tab_avg_rank(self, soup):
         rank_summary = soup.find('div', class_='GameRankSummary')
@@ -186,12 +361,11 @@ class MetaTFT:
         return avg_rank_data
     
     def players_tab_players(self, soup):
-        player_list = soup.find_all('div', class_='PlayerGameMatchDropdown')
-        players_data = []
-        for player in player_list:
-            player_data = self.players_tab_player_data(player)
-            players_data.append(player_data)
-        return players_data
+        return list(self.iter_players_tab_players(soup))
+
+    def iter_players_tab_players(self, soup):
+        for player in soup.find_all('div', class_='PlayerGameMatchDropdown'):
+            yield self.players_tab_player_data(player)
 
     def check_get_text(self, content):
         if not content:
@@ -248,15 +422,22 @@ class MetaTFT:
         except Exception:
             return player_data
             
-    def players_tab_content(self, soup, match_data):
-        summary_div = soup.find('div', class_='GameSummary')
-        match_data['players_summary'] = self.tabs_content(summary_div.find_all('div', class_='PlayerTag')) if summary_div else []
-        match_data['avg_opponent_rank'] = self.players_tab_avg_rank(soup)
-        match_data['players'] = self.players_tab_players(soup)
+    def players_tab_content(self, soup, match_data, fields=None):
+        if self.wants(fields, 'players_summary'):
+            summary_div = soup.find('div', class_='GameSummary')
+            match_data['players_summary'] = self.tabs_content(summary_div.find_all('div', class_='PlayerTag')) if summary_div else []
+        if self.wants(fields, 'avg_opponent_rank'):
+            match_data['avg_opponent_rank'] = self.players_tab_avg_rank(soup)
+        if self.wants(fields, 'players'):
+            match_data['players'] = self.players_tab_players(soup)
         return match_data
     
     async def round_detail_tab_content(self, page, match_data):
-        match_data['round_detail'] = []
+        match_data['round_detail'] = [round_data async for round_data in self.iter_round_details(page)]
+        return match_data
+
+    async def iter_round_details(self, page):
+        """Click through the rounds, yielding each round's data as soon as it is parsed"""
         rounds = await page.query_selector_all('div.tab-content > div.tab-pane.active > div > div > div.PlayerGameRoundList > div.PlayerGameRoundListItem')
         if len(rounds) == 0:
             rounds = await page.query_selector_all('.PlayerGameRoundList .PlayerGameRoundListItem')
@@ -265,134 +446,145 @@ class MetaTFT:
         for round_item in rounds:
             # tap on the round to get details
             try:
+                await self.throttle()
                 await round_item.click()
-                await page.wait_for_timeout(500)
+                await page.wait_for_timeout(self.config.waits.settle_ms)
                 active_tab = await page.query_selector('.tab-content .tab-pane.active')
                 if not active_tab:
                     active_tab = await page.query_selector('.PlayerGameDropdown')
-                
-                if active_tab:
-                    content = await active_tab.inner_html()
-                soup = BeautifulSoup(content, 'html.parser')
-                this_round = soup.select_one("div.PlayerGameRoundListItem.selected")
-                round_data = {}
-                round_data['round'] = self.check_get_text(this_round.find('div', class_='StageDetails'))
-                # region Get round outcome
-                if this_round.get('class') == 'PlayerGameRoundListItem victory selected':
-                    round_data['outcome'] = 'victory'
-                elif this_round.get('class') == 'PlayerGameRoundListItem defeat selected':
-                    round_data['outcome'] = 'defeat'
-                else:
-                    round_data['outcome'] = 'draw'
-                # endregion
-                RoundValues = this_round.find('div', class_='RoundValues')
-                # every round has hp, but not damage & roll
-                round_data['hp'] = self.check_get_text(self.find_div_with_stage_hp_icon(RoundValues) if RoundValues else None)
-
-                RoundValue_DamageNum = RoundValues.find("div", class_=["RoundValue", "DamageNum"]) if RoundValues else None
-                if RoundValue_DamageNum:
-                    round_data['round_damage'] = self.check_get_text(RoundValue_DamageNum)
-
-                reroll_div = self.find_div_with_reroll_icon(RoundValues) if RoundValues else None
-                if reroll_div:
-                    round_data['rerolls'] = self.check_get_text(reroll_div)
-
-                round_data['opponent'] = self.check_get_text(this_round.find('span', class_='OpponentName'))
-
-                # in PlayerGameRoundDetail
-                # in PlayerGameRoundDetail > StageDetailsMatchup
-                # in PlayerGameRoundDetail > StageDetailsMatchup > StageDetailsMatchupBoards
-                PlayerGameRoundDetail = soup.find('div', class_='PlayerGameRoundDetail')
-                round_data['traits_opponent'] = self.round_detail_tab_get_traits(PlayerGameRoundDetail.find("div", class_=["PlayerGameTraitContainer", "PlayerGameTraitContainerOpponent"]))
-                # as items data is not collected well, skip it for now
-                round_data['traits_player'] = self.round_detail_tab_get_traits(PlayerGameRoundDetail.find("div", class_=["PlayerGameTraitContainer", "PlayerGameTraitContainerPlayer"]))
-
-                team_map = PlayerGameRoundDetail.find('div', class_='team-builder')
-                round_data['team_map'] = self.round_detail_team_map(team_map)
-                bench_div = PlayerGameRoundDetail.find('div', class_='StageDetailBenchContainer')
-                StageDetailBenchSlotUnitImageContainers = bench_div.find_all('div', class_='StageDetailBenchSlotUnitImageContainer') if bench else []
-                bench = []
-                for container in StageDetailBenchSlotUnitImageContainers:
-                    StageDetailBenchSlotUnitTier = container.find('img', class_='StageDetailBenchSlotUnitTier')
-                    tier = StageDetailBenchSlotUnitTier.get('src', '').split('/')[-1].replace('.png', '') if StageDetailBenchSlotUnitTier else '1'
-                    StageDetailBenchSlotUnitImage = container.find('img', class_='StageDetailBenchSlotUnitImage')
-                    unit_name = StageDetailBenchSlotUnitImage.get('alt', '') if StageDetailBenchSlotUnitImage else 'Unknown'
-                    bench.append(f"{unit_name} : {tier}")
-
-                StageDetailsMatchupInfo = PlayerGameRoundDetail.find('div', class_='StageDetailsMatchupInfo')
-                StageDamageChartContainer = StageDetailsMatchupInfo.find('div', class_='StageDamageChartContainer')
-                y_axis_units = StageDamageChartContainer.find('g', class_='y-axis')
-                g_ticks = y_axis_units.find_all('g', class_='tick') if y_axis_units else []
-                champion_names = []
-                for tick in g_ticks:
-                    # transform is for sort
-                    transform = tick.get('transform', '')
-                    champion_name = tick.find('image', class_='DamageUnitimg').get('src', '').split('/')[-1].replace('tft14_', '').replace('.png', '')
-                    star = tick.find('image', class_='DamageUnitimgStars')
-                    stars = star.get('src', '').split('/')[-1].replace('.png', '') if star else '1'
-                    champion_names.append(f"{champion_name} : {stars}")
-
-                StageDamageChartContainer.find('g', class_='plot-area')
-                g_bars = StageDamageChartContainer.find_all('g', class_='bars')
-                damages = []
-                for bar in g_bars:
-                    damages.append(bar.gettext(strip=True))
-
-                round_data['champion_damage'] = []
-                for champion_name, damage in zip(champion_names, damages):
-                    round_data['champion_damage'].append({
-                        'champion': champion_name,
-                        'damage': damage
-                    })
-                
-                # TODO:shop
-                StageDetailShop = PlayerGameRoundDetail.find('div', class_='StageDetailShop')
-                StageLevelInfo = StageDetailShop.find('div', class_='StageLevelInfo')
-                StageLevelInfoNumbers = StageLevelInfo.find_all('div', class_='StageLevelInfoNumber')
-                shop_lv = StageLevelInfoNumbers[0].get_text(strip=True) if len(StageLevelInfoNumbers) > 0 else '0'
-                # but gold is not changed after click the down button
-                player_gold = StageLevelInfoNumbers[1].get_text(strip=True) if len(StageLevelInfoNumbers) > 1 else '0'
-
-                # here can have star on champion, website does not show it, don't know why
-                StageDetailShopUnitList = StageDetailShop.find('div', class_='StageDetailShopUnitList')
-                StageDetailShopSlots = StageDetailShopUnitList.find_all('div', class_='StageDetailShopSlot')
-                shop_units = []
-                for slot in StageDetailShopSlots:
-                    StageDetailShopSlotUnitImage = slot.find('img', class_='StageDetailShopSlotUnitImage')
-                    champion_name = StageDetailShopSlotUnitImage.get('alt', '') if StageDetailShopSlotUnitImage else 'Unknown'
-                    StageDetailShopSlotUnitBought = slot.find('img', class_='StageDetailShopSlotUnitBought')
-
-
-                StageDetailActions = PlayerGameRoundDetail.find('div', class_='StageDetailActions')
-                PlayerGameSummaryHighlightStatNumber = StageDetailActions.find_all('div', class_='PlayerGameSummaryHighlightStatNumber')
-                for stat in PlayerGameSummaryHighlightStatNumber:
-                    if not scouting_time:
-                        scouting_time = self.round_detail_tab_get_actions(stat, 'Scouting Time')
-                    if not round_apm:
-                        round_apm = self.round_detail_tab_get_actions(stat, 'Round APM')
-                    if not repositions:
-                        repositions = self.round_detail_tab_get_actions(stat, 'Repositions')
-                    if not board_changes:
-                        board_changes = self.round_detail_tab_get_actions(stat, 'Board Changes')
-
-                round_data['actions'] = {
-                    'scouting_time': scouting_time if 'scouting_time' in locals() else '0s',
-                    'round_apm': round_apm if 'round_apm' in locals() else '0',
-                    'repositions': repositions if 'repositions' in locals() else '0',
-                    'board_changes': board_changes if 'board_changes' in locals() else '0'
-                }
-
-                match_data['round_detail'].append(round_data)
+                if not active_tab:
+                    continue
+                round_data = self.round_detail_round_data(await active_tab.inner_html())
                 print(f"round_data: {round_data}")
             except Exception as e:
                 print(f"Error clicking on round: {str(e)}")
-        return match_data
+                continue
+            yield round_data
+
+    def round_detail_round_data(self, content):
+        """Parse the selected round; its soup is decomposed before returning"""
+        soup = make_soup(content)
+        try:
+            if self.asset_cache is not None:
+                self.asset_cache.collect_soup(soup)
+            this_round = soup.select_one("div.PlayerGameRoundListItem.selected")
+            round_data = {}
+            round_data['round'] = self.check_get_text(this_round.find('div', class_='StageDetails'))
+            # region Get round outcome
+            if this_round.get('class') == 'PlayerGameRoundListItem victory selected':
+                round_data['outcome'] = 'victory'
+            elif this_round.get('class') == 'PlayerGameRoundListItem defeat selected':
+                round_data['outcome'] = 'defeat'
+            else:
+                round_data['outcome'] = 'draw'
+            # endregion
+            RoundValues = this_round.find('div', class_='RoundValues')
+            # every round has hp, but not damage & roll
+            round_data['hp'] = self.check_get_text(self.find_div_with_hp_icon(RoundValues) if RoundValues else None)
+
+            RoundValue_DamageNum = RoundValues.find("div", class_=["RoundValue", "DamageNum"]) if RoundValues else None
+            if RoundValue_DamageNum:
+                round_data['round_damage'] = self.check_get_text(RoundValue_DamageNum)
+
+            reroll_div = self.find_div_with_reroll_icon(RoundValues) if RoundValues else None
+            if reroll_div:
+                round_data['rerolls'] = self.check_get_text(reroll_div)
+
+            round_data['opponent'] = self.check_get_text(this_round.find('span', class_='OpponentName'))
+
+            # in PlayerGameRoundDetail
+            # in PlayerGameRoundDetail > StageDetailsMatchup
+            # in PlayerGameRoundDetail > StageDetailsMatchup > StageDetailsMatchupBoards
+            PlayerGameRoundDetail = soup.find('div', class_='PlayerGameRoundDetail')
+            round_data['traits_opponent'] = self.round_detail_tab_get_traits(PlayerGameRoundDetail.find("div", class_=["PlayerGameTraitContainer", "PlayerGameTraitContainerOpponent"]))
+            # as items data is not collected well, skip it for now
+            round_data['traits_player'] = self.round_detail_tab_get_traits(PlayerGameRoundDetail.find("div", class_=["PlayerGameTraitContainer", "PlayerGameTraitContainerPlayer"]))
+
+            team_map = PlayerGameRoundDetail.find('div', class_='team-builder')
+            round_data['team_map'] = self.round_detail_team_map(team_map)
+            bench_div = PlayerGameRoundDetail.find('div', class_='StageDetailBenchContainer')
+            StageDetailBenchSlotUnitImageContainers = bench_div.find_all('div', class_='StageDetailBenchSlotUnitImageContainer') if bench_div else []
+            bench = []
+            for container in StageDetailBenchSlotUnitImageContainers:
+                StageDetailBenchSlotUnitTier = container.find('img', class_='StageDetailBenchSlotUnitTier')
+                tier = StageDetailBenchSlotUnitTier.get('src', '').split('/')[-1].replace('.png', '') if StageDetailBenchSlotUnitTier else '1'
+                StageDetailBenchSlotUnitImage = container.find('img', class_='StageDetailBenchSlotUnitImage')
+                unit_name = StageDetailBenchSlotUnitImage.get('alt', '') if StageDetailBenchSlotUnitImage else 'Unknown'
+                bench.append(f"{unit_name} : {tier}")
+            round_data['bench'] = bench
+
+            StageDetailsMatchupInfo = PlayerGameRoundDetail.find('div', class_='StageDetailsMatchupInfo')
+            StageDamageChartContainer = StageDetailsMatchupInfo.find('div', class_='StageDamageChartContainer')
+            y_axis_units = StageDamageChartContainer.find('g', class_='y-axis')
+            g_ticks = y_axis_units.find_all('g', class_='tick') if y_axis_units else []
+            champion_names = []
+            for tick in g_ticks:
+                # transform is for sort
+                transform = tick.get('transform', '')
+                champion_name = tick.find('image', class_='DamageUnitimg').get('src', '').split('/')[-1].replace('tft14_', '').replace('.png', '')
+                star = tick.find('image', class_='DamageUnitimgStars')
+                stars = star.get('src', '').split('/')[-1].replace('.png', '') if star else '1'
+                champion_names.append(f"{champion_name} : {stars}")
+
+            StageDamageChartContainer.find('g', class_='plot-area')
+            g_bars = StageDamageChartContainer.find_all('g', class_='bars')
+            damages = []
+            for bar in g_bars:
+                damages.append(bar.get_text(strip=True))
+
+            round_data['champion_damage'] = []
+            for champion_name, damage in zip(champion_names, damages):
+                round_data['champion_damage'].append({
+                    'champion': champion_name,
+                    'damage': damage
+                })
+
+            # TODO:shop
+            StageDetailShop = PlayerGameRoundDetail.find('div', class_='StageDetailShop')
+            StageLevelInfo = StageDetailShop.find('div', class_='StageLevelInfo')
+            StageLevelInfoNumbers = StageLevelInfo.find_all('div', class_='StageLevelInfoNumber')
+            shop_lv = StageLevelInfoNumbers[0].get_text(strip=True) if len(StageLevelInfoNumbers) > 0 else '0'
+            # but gold is not changed after click the down button
+            player_gold = StageLevelInfoNumbers[1].get_text(strip=True) if len(StageLevelInfoNumbers) > 1 else '0'
+
+            # here can have star on champion, website does not show it, don't know why
+            StageDetailShopUnitList = StageDetailShop.find('div', class_='StageDetailShopUnitList')
+            StageDetailShopSlots = StageDetailShopUnitList.find_all('div', class_='StageDetailShopSlot')
+            shop_units = []
+            for slot in StageDetailShopSlots:
+                StageDetailShopSlotUnitImage = slot.find('img', class_='StageDetailShopSlotUnitImage')
+                champion_name = StageDetailShopSlotUnitImage.get('alt', '') if StageDetailShopSlotUnitImage else 'Unknown'
+                StageDetailShopSlotUnitBought = slot.find('img', class_='StageDetailShopSlotUnitBought')
+
+
+            StageDetailActions = PlayerGameRoundDetail.find('div', class_='StageDetailActions')
+            PlayerGameSummaryHighlightStatNumber = StageDetailActions.find_all('div', class_='PlayerGameSummaryHighlightStatNumber')
+            scouting_time = round_apm = repositions = board_changes = None
+            for stat in PlayerGameSummaryHighlightStatNumber:
+                if not scouting_time:
+                    scouting_time = self.round_detail_tab_get_actions(stat, 'Scouting Time')
+                if not round_apm:
+                    round_apm = self.round_detail_tab_get_actions(stat, 'Round APM')
+                if not repositions:
+                    repositions = self.round_detail_tab_get_actions(stat, 'Repositions')
+                if not board_changes:
+                    board_changes = self.round_detail_tab_get_actions(stat, 'Board Changes')
+
+            round_data['actions'] = {
+                'scouting_time': scouting_time or '0s',
+                'round_apm': round_apm or '0',
+                'repositions': repositions or '0',
+                'board_changes': board_changes or '0'
+            }
+            return round_data
+        finally:
+            soup.decompose()
     
     async def round_detail_tab_tap_down_get_shop(self, page):
         page.query_selector('div.tab-content > div.tab-pane.active > div > div > div.PlayerGameRoundDetail > div.StageDetailBottom > div.StageDetailShopSection > div.StageDetailShop > div.ShopSelector > div.ShopSelectorButtons > div:nth-child(2)').click()
-        await page.wait_for_timeout(500)
+        await page.wait_for_timeout(self.config.waits.settle_ms)
         content = page.query_selector('StageDetailShopContainer')
-        soup = BeautifulSoup(content, 'html.parser')
+        soup = make_soup(content)
         StageDetailShopUnitList = soup.find('div', class_='StageDetailShopUnitList')
         StageDetailShopSlots = StageDetailShopUnitList.find_all('div', class_='StageDetailShopSlot')
         shop_units = []
@@ -408,18 +600,10 @@ class MetaTFT:
             
     
     def round_detail_tab_get_traits(self, soup):
-        result = []
-        PlayerGameTraits = soup.find('div', class_='PlayerGameTrait')
-        display_contents = PlayerGameTraits.find_all('div', class_='display-contents')
-        for display_content in display_contents:
-            TraitBG = display_content.find('img', class_=["TraitBG", "TraitTiny"])
-            Trait_src = TraitBG.get('src', '') if TraitBG else ''
-            Trait_color = Trait_src.split('/')[-1].replace('.png', '')
-
-            Trait = display_content.find('img', class_=["TraitIcon", "TraitTiny", "TraitIconDark"])
-            trait_name = Trait.get('alt', '')
-            result.append(f"{trait_name} : {Trait_color}")
-        return result
+        """[{'name', 'count', 'tier'}] of one side of the round's board, see traits.py"""
+        if soup is None:
+            return []
+        return traits.extract_round_traits(soup.find('div', class_='PlayerGameTrait'))
 
     def find_div_with_hp_icon(self, soup):
         def has_hp_icon(div):
@@ -433,33 +617,10 @@ class MetaTFT:
     
         return soup.find('div', has_reroll_icon)
     
-    # TODO: not finished, it is a draft only
     def round_detail_team_map(self, soup):
-        data = []
-        for g in soup.find_all("g"):
-            # defs = g.find("defs")
-            # pattern = defs.find("pattern", id=lambda x: x and x.startswith("mask-T")) if defs and polygon else None
-            # mask_id = pattern["id"] if pattern else ""
-            # parts = mask_id.split("_")
-            # if len(parts) >= 3:
-            # name = parts[1].split("-")[0]
-            name = g.gettext(strip=True)
-            star_image = g.find("image", class_="unit-stars-svg")
-            tier = star_image.get("alt", "")[-1] if star_image else "1"
-
-            item_images = g.find_all("image", class_="draggable-unit-item")
-            items = [item.get("alt", "") for item in item_images if item.get("alt", "")]
-
-            polygon = g.find("polygon")
-            hex_id = polygon.get("id", "") if polygon else ""
-            cell_id = hex_id.split("_")[1] if "_" in hex_id else ""
-
-            data.append({
-                "name": f"{name} : {tier}", 
-                "items":items, 
-                "cell_id": cell_id
-                })
-        return data
+        """Units on the round's board with their hex (row, col), see positioning.py"""
+        import positioning
+        return positioning.decode_team_builder(soup)
     
     def personal_summary_graph(self, soup, match_data, title):
         stages = []
@@ -491,7 +652,7 @@ class MetaTFT:
         for label in label_elements:
             labels.append({'point':f"{label.get("x","")},{label.get("y","")}", 'name':{label.get_text(strip=True)}})
 
-        match_data[f"personal_summary_graph_{title}"] = {
+        match_data[f"{GRAPH_FIELD}{title}"] = {
             'stages': stages,
             'positions': positions,
             'paths': paths,
@@ -499,55 +660,71 @@ class MetaTFT:
         }
         return match_data
 
-    async def process_tab_content(self, tab_name, page, active_tab, content, match_data):
-        soup = BeautifulSoup(content, 'html.parser')
-        if tab_name.lower() == 'players':
-            match_data = self.players_tab_content(soup, match_data)
-        elif tab_name.lower() == 'personal summary':
-            #region Extract player summary data
-            summary_div = soup.find('div', class_='GameSummary')
-            match_data['personal_summary'] = self.tabs_content(summary_div.find_all('div', class_='PlayerTag')) if summary_div else []
+    async def personal_summary_graphs(self, page, active_tab, match_data):
+        PlayerProfilePageServerDropdownContainer = await active_tab.query_selector('.PlayerProfilePageServerDropdownContainer')
+        await self.throttle()
+        await PlayerProfilePageServerDropdownContainer.click()
+        await page.wait_for_timeout(self.config.waits.settle_ms)
+        MuiListRoot = await page.query_selector('.MuiList-root')
+        MuiListItems = await MuiListRoot.query_selector_all('.MuiMenuItem-root')
+        handledItems = []
+        newMuiListItems = MuiListItems
+        for i, item in enumerate(MuiListItems):
+            for x in newMuiListItems:
+                text2 = await x.inner_text()
+                if text2 not in handledItems:
+                    clickItem = x
+                    break
+            await self.throttle()
+            await clickItem.click()
+            await page.wait_for_timeout(self.config.waits.settle_ms)
+
+            # get data
+            # g x-axis
+            #     g tick
+            #         text
+            #             stage
+            GameSummaryChart = await page.query_selector('.GameSummaryChart')
+            chart_soup = make_soup(await GameSummaryChart.inner_html())
+            match_data = self.personal_summary_graph(chart_soup, match_data, text2)
+            chart_soup.decompose()
+            handledItems.append(text2)
+            if len(handledItems) == len(MuiListItems):
+                break
 
-            # Graph
             PlayerProfilePageServerDropdownContainer = await active_tab.query_selector('.PlayerProfilePageServerDropdownContainer')
+            await self.throttle()
             await PlayerProfilePageServerDropdownContainer.click()
-            await page.wait_for_timeout(500)
-            MuiListRoot = await page.query_selector('.MuiList-root')
-            MuiListItems = await MuiListRoot.query_selector_all('.MuiMenuItem-root')
-            handledItems = []
-            newMuiListItems = MuiListItems
-            for i, item in enumerate(MuiListItems):
-                for x in newMuiListItems:
-                    text2 = await x.inner_text()
-                    if text2 not in handledItems:
-                        clickItem = x
-                        break
-                await clickItem.click()
-                await page.wait_for_timeout(500)
-
-                # get data
-                # g x-axis
-                #     g tick
-                #         text
-                #             stage
-                GameSummaryChart = await page.query_selector('.GameSummaryChart')
-                content = await GameSummaryChart.inner_html()
-                match_data = self.personal_summary_graph(
-                    BeautifulSoup(content, 'html.parser'), 
-                    match_data,
-                    text2)
-                handledItems.append(text2)
-                if len(handledItems) == len(MuiListItems):
-                    break
+            await page.wait_for_timeout(self.config.waits.settle_ms)
+            nenwMuiListRoot = await page.query_selector('.MuiList-root')
+            newMuiListItems = await nenwMuiListRoot.query_selector_all('.MuiMenuItem-root')
+        return match_data
 
-                PlayerProfilePageServerDropdownContainer = await active_tab.query_selector('.PlayerProfilePageServerDropdownContainer')
-                await PlayerProfilePageServerDropdownContainer.click()
-                await page.wait_for_timeout(500)
-                nenwMuiListRoot = await page.query_selector('.MuiList-root')
-                newMuiListItems = await nenwMuiListRoot.query_selector_all('.MuiMenuItem-root')
+    async def process_tab_content(self, tab_name, page, active_tab, content, match_data, fields=None):
+        soup = make_soup(content)
+        try:
+            if self.asset_cache is not None:
+                self.asset_cache.collect_soup(soup)
+            return await self.parse_tab_content(tab_name, page, active_tab, soup, match_data, fields)
+        finally:
+            # free the tree now instead of whenever the cyclic gc gets to it
+            soup.decompose()
+
+    async def parse_tab_content(self, tab_name, page, active_tab, soup, match_data, fields=None):
+        if tab_name.lower() == 'players':
+            match_data = self.players_tab_content(soup, match_data, fields)
+        elif tab_name.lower() == 'personal summary':
+            #region Extract player summary data
+            if self.wants(fields, 'personal_summary'):
+                summary_div = soup.find('div', class_='GameSummary')
+                match_data['personal_summary'] = self.tabs_content(summary_div.find_all('div', class_='PlayerTag')) if summary_div else []
+
+            # Graph, one dropdown click per series
+            if self.wants(fields, GRAPH_FIELD):
+                match_data = await self.personal_summary_graphs(page, active_tab, match_data)
 
             #region Extract stage breakdown data
-            stage_breakdown = soup.find('div', class_='PlayerGameSummaryHighlightStage')
+            stage_breakdown = soup.find('div', class_='PlayerGameSummaryHighlightStage') if self.wants(fields, 'stage_breakdown') else None
             stage_data = []
             stages = stage_breakdown.find_all('div', class_='PlayerGameSummaryStage') if stage_breakdown else []
             
@@ -572,11 +749,12 @@ class MetaTFT:
                 
                 stage_data.append(stage_info)
             
-            match_data['stage_breakdown'] = stage_data
+            if self.wants(fields, 'stage_breakdown'):
+                match_data['stage_breakdown'] = stage_data
             #endregion
 
             # Extract economy data
-            economy_div = soup.find('div', class_='PlayerGameSummaryEconomy')
+            economy_div = soup.find('div', class_='PlayerGameSummaryEconomy') if self.wants(fields, 'economy') else None
             if economy_div:
                 economy_data = {}
                 
@@ -601,7 +779,7 @@ class MetaTFT:
                 match_data['economy'] = economy_data
 
             # Extract planning phase data
-            planning_div = soup.find('div', class_='PlayerGameSummaryActions')
+            planning_div = soup.find('div', class_='PlayerGameSummaryActions') if self.wants(fields, 'planning') else None
             if planning_div:
                 planning_data = {}
                 
@@ -626,7 +804,7 @@ class MetaTFT:
                 match_data['planning'] = planning_data
 
             # Extract key rounds data
-            key_rounds_div = soup.find('div', class_='PlayerGameSummaryKeyRounds')
+            key_rounds_div = soup.find('div', class_='PlayerGameSummaryKeyRounds') if self.wants(fields, 'key_rounds') else None
             if key_rounds_div:
                 key_rounds_data = []
                 key_round_rows = key_rounds_div.find_all('div', class_='KeyRoundRow')
@@ -705,7 +883,8 @@ class MetaTFT:
                 
                 for row in rows:
                     cells = row.find_all('td')
-                    if len(cells) < 0:
+                    # the header row has th cells only
+                    if len(cells) == 0:
                         continue
 
                     stage = cells[0].get_text(strip=True)
@@ -774,13 +953,36 @@ class MetaTFT:
         
         return match_data
     
-    async def get_match_details(self, page, match_id):
+    async def get_match_details(self, page, match_id, tabs=None, fields=None):
+        """
+        Expand a match and parse the selected tabs (default: self.tabs / self.fields).
+        Tabs outside the selection are never clicked.
+        """
+        if self.profiler is None:
+            return await self.scrape_match_details(page, match_id, tabs, fields)
+        with self.profiler.match(match_id):
+            return await self.scrape_match_details(self.profiled_page(page), match_id, tabs, fields)
+
+    async def scrape_match_details(self, page, match_id, tabs=None, fields=None):
+        tabs = select_tabs(tabs, fields) if tabs or fields else self.tabs
+        fields = set(fields) if fields else self.fields
+        shared = None
+        if self.match_index is not None and match_id in self.match_index:
+            shared = self.match_index.get_shared(match_id)
+            tabs = tabs - SHARED_TABS
+            if not tabs:
+                return {'match_id': match_id, **shared}
+        if self.memory_watermark is not None:
+            await self.memory_watermark.wait()
+        if self.drift_monitor is not None:
+            await self.drift_monitor.gate()
         try:
             expand_button = await page.query_selector(f'#{match_id} .PlayerGameExpandImageContainer')
+            await self.throttle()
             await expand_button.click()
             
             await page.wait_for_selector(f'#{match_id} .PlayerGameDropdown', state='visible')
-            await page.wait_for_timeout(1000)
+            await page.wait_for_timeout(self.config.waits.expand_ms)
             
             match_container = await page.query_selector(f'#{match_id}')
             if not match_container:
@@ -794,26 +996,39 @@ class MetaTFT:
             
             match_data = {'match_id': match_id}
             
+            remaining = set(tabs)
             for tab in tab_elements:
+                if not remaining:
+                    break
                 try:
                     tab_name = await tab.text_content()
-                    if tab_name.lower() == 'shop analysis':
+                    if normalize_tab_name(tab_name) not in remaining:
                         continue
-                    await tab.click()
-                    await page.wait_for_timeout(500)
-
-                    active_tab = await match_container.query_selector('.tab-content .tab-pane.active')
-                    if not active_tab:
-                        active_tab = await match_container.query_selector('.PlayerGameDropdown')
-                    
-                    if active_tab:
-                        content = await active_tab.inner_html()
-                        match_data = await self.process_tab_content(tab_name, page, active_tab, content, match_data)
+                    remaining.discard(normalize_tab_name(tab_name))
+                    with self.profile_tab(tab_name):
+                        await self.throttle()
+                        await tab.click()
+                        await page.wait_for_timeout(self.config.waits.settle_ms)
+
+                        active_tab = await match_container.query_selector('.tab-content .tab-pane.active')
+                        if not active_tab:
+                            active_tab = await match_container.query_selector('.PlayerGameDropdown')
+
+                        if active_tab:
+                            content = await active_tab.inner_html()
+                            match_data = await self.process_tab_content(tab_name, page, active_tab, content, match_data, fields)
                 
                 except Exception as e:
                     print(f"Error processing tab {tab_name}: {str(e)}")
                     continue
             
+            if self.drift_monitor is not None:
+                self.drift_monitor.observe(match_data, tabs, fields)
+            if shared is not None:
+                match_data.update({key: value for key, value in shared.items() if key not in match_data})
+            elif self.match_index is not None and 'players' in match_data:
+                shared_fields = [field for tab in SHARED_TABS for field in TAB_FIELDS[tab]]
+                self.match_index.add(match_id, {field: match_data[field] for field in shared_fields if field in match_data})
             return match_data
             
         except Exception as e:
@@ -821,62 +1036,213 @@ class MetaTFT:
             return None
 
     async def get_match_data(self, riot_id, region="tw"):
-        url = f"{self.base_url}/{region}/{riot_id.replace('#', '-')}"
         print(f"Fetching data for {riot_id}...")
-        
+        return await self.with_page(self.fetch_match_data, riot_id, region)
+
+    async def get_match_summaries(self, riot_id, region="tw"):
+        """Summary fields of the listed matches, without expanding any of them"""
+        return await self.with_page(self.fetch_match_summaries, riot_id, region)
+
+    async def get_match_lists(self, riot_id, region="tw", modes=('ranked',)):
+        """match_lists on a pooled or one-off page, None on errors"""
+        async def fetch(page, riot_id, region):
+            try:
+                return await self.match_lists(page, riot_id, region, modes)
+            except CircuitOpenError as e:
+                print(f"Skipping {riot_id}: {e}")
+            except Exception as e:
+                print(f"Error fetching match lists: {e}")
+            return None
+        return await self.with_page(fetch, riot_id, region)
+
+    async def with_page(self, fetch, riot_id, region):
+        """Run fetch(page, riot_id, region) on a pooled page, or on a one-off browser"""
+        if self.browser_pool:
+            async with self.browser_pool.page() as page:
+                return await fetch(self.profiled_page(page), riot_id, region)
+
         async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=True)
+            browser = await p.chromium.launch(headless=self.config.browser.headless)
             context = await browser.new_context(
-                viewport={'width': 1920, 'height': 1080},
-                user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+                viewport=self.config.browser.viewport(),
+                user_agent=self.config.browser.user_agent
             )
             page = await context.new_page()
             
             try:
-                max_retries = 3
-                retry_count = 0
-                while retry_count < max_retries:
-                    try:
-                        await page.goto(url, wait_until='domcontentloaded', timeout=30000)
-                        break
-                    except Exception as e:
-                        retry_count += 1
-                        if retry_count == max_retries:
-                            raise e
-                        await asyncio.sleep(5)
-                
-                ranked_button = await page.wait_for_selector('button:has-text("Ranked")', timeout=30000)
-                await ranked_button.click()
-                
-                await page.wait_for_selector('.PlayerGame', timeout=30000)
-                
-                match_elements = await page.query_selector_all('.PlayerGame')
-                
-                match_id = await match_elements[0].get_attribute('id')
-                match_data = await self.get_match_details(page, match_id)
-                return [match_data]
-            except Exception as e:
-                print(f"Error fetching data: {e}")
-                return None
+                return await fetch(self.profiled_page(page), riot_id, region)
             finally:
                 await browser.close()
 
-    def display_players_summary(self, recent_match, clipboard_text):
+    def profile_url(self, riot_id, region):
+        return f"{self.base_url}/{region}/{riot_id.replace('#', '-')}"
+
+    async def open_profile(self, page, riot_id, region, budget=None, mode=None):
+        """Load a player's profile, pick the queue filter (default self.queue_mode) and wait for the match list"""
+        url = self.profile_url(riot_id, region)
+        # one retry budget per player so a broken profile can't eat the run budget
+        budget = budget or self.resilience.player_budget()
+
+        async def goto(timeout):
+            await self.throttle()
+            return await page.goto(url, wait_until='domcontentloaded', timeout=timeout)
+
+        await self.resilience.call('navigation', goto, region, budget)
+        mode = mode or self.queue_mode
+        if mode:
+            await self.select_queue_mode(page, mode, region, budget)
+        
+        await self.resilience.call(
+            'match_list',
+            lambda timeout: page.wait_for_selector('.PlayerGame', timeout=timeout),
+            region, budget)
+
+    async def select_queue_mode(self, page, mode, region=None, budget=None):
+        """Click a queue filter on an open profile; the site swaps the list without navigating"""
+        label = QUEUE_MODES[normalize_queue_mode(mode)]
+        mode_button = await self.resilience.call(
+            'queue_button',
+            # exact text, so 'All' does not also match e.g. 'All Modes' or 'Overall'
+            lambda timeout: page.wait_for_selector(f'button:text-is("{label}")', timeout=timeout),
+            region, budget)
+        await self.throttle()
+        await mode_button.click()
+
+    async def wait_for_queue_switch(self, page, mode, before_ids):
+        """
+        Wait until a clicked queue filter shows, instead of a fixed pause.
+        Returns False on timeout, e.g. when both queues list the same matches.
+        """
+        try:
+            await page.wait_for_function(QUEUE_SWITCHED_JS, arg=[QUEUE_MODES[mode], before_ids],
+                                         timeout=self.config.waits.load_more_ms)
+            return True
+        except Exception:
+            return False
+
+    async def match_lists(self, page, riot_id, region, modes):
+        """
+        {mode: match summaries} for several queue modes from one profile load.
+        Modes seen within match_list_ttl seconds come from the cache; the rest
+        are read by clicking through their filters on the same page.
+        """
+        modes = [normalize_queue_mode(mode) for mode in modes]
+        now = time.monotonic()
+        # drop expired lists so a long crawl over many players doesn't keep them all
+        self.match_list_cache = {key: cached for key, cached in self.match_list_cache.items()
+                                 if now - cached[0] < self.match_list_ttl}
+        lists = {}
+        for mode in modes:
+            cached = self.match_list_cache.get((riot_id, region, mode))
+            if cached:
+                lists[mode] = cached[1]
+        missing = [mode for mode in modes if mode not in lists]
+        if not missing:
+            return lists
+        budget = self.resilience.player_budget()
+        await self.open_profile(page, riot_id, region, budget, mode=missing[0])
+        for i, mode in enumerate(missing):
+            if i:
+                await self.select_queue_mode(page, mode, region, budget)
+                await self.wait_for_queue_switch(page, mode, [summary['match_id'] for summary in lists[missing[i - 1]]])
+            lists[mode] = await self.list_match_summaries(page)
+            self.match_list_cache[(riot_id, region, mode)] = (time.monotonic(), lists[mode])
+        return lists
+
+    async def http_match_ids(self, riot_id, region):
+        """
+        A profile's match ids without a browser, None when the fast path is off or found nothing.
+        The server-rendered page is not filtered by queue, so unless queue_mode is 'all'
+        these ids are only good for change detection, see http_lists_queue.
+        """
+        if self.http_fetcher is None:
+            return None
+        await self.throttle()
+        return await self.http_fetcher.list_match_ids(self.profile_url(riot_id, region)) or None
+
+    def http_lists_queue(self):
+        """Whether http_match_ids returns the same ids the browser path lists for self.queue_mode"""
+        return self.queue_mode == 'all'
+
+    async def list_match_summaries(self, page):
+        """Id and summary fields of every match card on the page, read in one evaluate call"""
+        summaries = await page.evaluate(MATCH_LIST_JS)
+        if self.asset_cache is not None:
+            self.asset_cache.collect(summaries)
+        return summaries
+
+    async def list_match_ids(self, page):
+        return [summary['match_id'] for summary in await self.list_match_summaries(page)]
+
+    async def load_more_matches(self, page, timeout=None):
+        """
+        Scroll to the end of the match list (and press a "Load More" button when
+        the site shows one) until more .PlayerGame cards appear.
+        Returns False when nothing new was loaded.
+        """
+        count = await page.evaluate('document.querySelectorAll(".PlayerGame").length')
+        await self.throttle()
+        await page.evaluate('window.scrollTo(0, document.body.scrollHeight)')
+        load_more = await page.query_selector('button:has-text("Load More"), button:has-text("Show More")')
+        if load_more:
+            await load_more.click()
+        try:
+            await page.wait_for_function(
+                'count => document.querySelectorAll(".PlayerGame").length > count',
+                arg=count, timeout=timeout or self.config.waits.load_more_ms)
+            return True
+        except Exception:
+            return False
+
+    async def collapse_match(self, page, match_id):
+        """Close an expanded match again so a long history page stays small"""
+        try:
+            expand_button = await page.query_selector(f'#{match_id} .PlayerGameExpandImageContainer')
+            if expand_button:
+                await expand_button.click()
+        except Exception as e:
+            print(f"Error collapsing match {match_id}: {str(e)}")
+
+    async def fetch_match_data(self, page, riot_id, region):
+        try:
+            await self.open_profile(page, riot_id, region)
+            match_id = (await self.list_match_ids(page))[0]
+            match_data = await self.get_match_details(page, match_id)
+            return [match_data]
+        except CircuitOpenError as e:
+            print(f"Skipping {riot_id}: {e}")
+            return None
+        except Exception as e:
+            print(f"Error fetching data: {e}")
+            return None
+
+    async def fetch_match_summaries(self, page, riot_id, region):
+        try:
+            await self.open_profile(page, riot_id, region)
+            return await self.list_match_summaries(page)
+        except CircuitOpenError as e:
+            print(f"Skipping {riot_id}: {e}")
+            return None
+        except Exception as e:
+            print(f"Error fetching summaries: {e}")
+            return None
+
+    def display_players_summary(self, recent_match, clipboard_text, console_text):
         if 'players_summary' in recent_match:
-            print("PLAYERS SUMMARY:")
+            console_text.append("PLAYERS SUMMARY:")
             summary_data = recent_match['players_summary']
             if summary_data:
                 for tag in summary_data:
-                    print(f"+ {tag}")
+                    console_text.append(f"+ {tag}")
                 clipboard_text.extend(["\nSummary:"] + [f"- {tag}" for tag in summary_data])
         return clipboard_text
 
-    def display_avg_opponent_rank(self, recent_match, clipboard_text):
+    def display_avg_opponent_rank(self, recent_match, clipboard_text, console_text):
         """Display average opponent rank data if available"""
         if 'avg_opponent_rank' in recent_match:
-            print("\nAVG RANK:")
+            console_text.append("\nAVG RANK:")
             rank_data = recent_match['avg_opponent_rank']
-            print(f"Tier: {rank_data.get('tier', 'N/A')} {rank_data.get('division', 'N/A')}")
+            console_text.append(f"Tier: {rank_data.get('tier', 'N/A')} {rank_data.get('division', 'N/A')}")
             clipboard_text.extend([
                 "\nAVERAGE OPPONENT RANK:",
                 f"Tier: {rank_data.get('tier', 'N/A')}",
@@ -885,33 +1251,34 @@ class MetaTFT:
             ])
         return clipboard_text
 
-    def display_players_data(self, recent_match, clipboard_text):
-        print("display_players_data")
+    def display_players_data(self, recent_match, clipboard_text, console_text):
+        console_text.append("display_players_data")
         if 'players' in recent_match:
             players_data = recent_match['players']
             
             if isinstance(players_data, list):
                 for player in players_data:
                     if isinstance(player, dict):
-                        print(f"\nP{player.get('placement', 'N/A')} Player: {player.get('name', 'N/A')}#{player.get('tag', 'N/A')}")
-                        print(f"Lv: {player.get('level', 'N/A')}")
-                        print(f"Stage: {player.get('stage', 'N/A')}")
-                        print(f"Damage Done: {player.get('damage_done', 'N/A')}")
-                        print(f"Board Value: {player.get('board_value', 'N/A')}")
+                        console_text.append(f"\nP{player.get('placement', 'N/A')} Player: {player.get('name', 'N/A')}#{player.get('tag', 'N/A')}")
+                        console_text.append(f"Lv: {player.get('level', 'N/A')}")
+                        console_text.append(f"Stage: {player.get('stage', 'N/A')}")
+                        console_text.append(f"Damage Done: {player.get('damage_done', 'N/A')}")
+                        console_text.append(f"Board Value: {player.get('board_value', 'N/A')}")
                         
                         if 'traits' in player:
-                            print("\nTraits:")
+                            console_text.append("\nTraits:")
                             for trait in player['traits']:
-                                print(f"{trait['name']}: {trait['count']}")
+                                console_text.append(f"{trait['name']}: {trait['count']}")
                         
                         # {'tier': '3', 'name': 'Twisted Fate', 'items': ['Hextech Gunblade', "Guinsoo's Rageblade", "Guinsoo's Rageblade"]}
                         if 'units' in player:
-                            print("\nUnits:")
+                            console_text.append("\nUnits:")
                             for unit in player['units']:
-                                print(f"{unit['name']} (Tier {unit['tier']})")
+                                console_text.append(f"{unit['name']} (Tier {unit['tier']})")
                                 if unit['items']:
-                                    print("Items:")
-                                    pprint(unit['items'])
+                                    console_text.append("Items:")
+                                    from pprint import pformat
+                                    console_text.append(pformat(unit['items']))
                         
                         clipboard_text.extend([
                             f"\nPlayer: {player.get('name', 'N/A')} #{player.get('tag', 'N/A')}",
@@ -923,36 +1290,36 @@ class MetaTFT:
                         ])
             else:
                 if isinstance(players_data, dict) and 'html' in players_data:
-                    soup = BeautifulSoup(players_data['html'], 'html.parser')
+                    soup = make_soup(players_data['html'])
                     player_matches = soup.find_all('div', class_='PlayerGameMatch')
                     for player_match in player_matches:
                         player_data = self.extract_player_data(player_match)
-                        print(f"\nP{player_data.get('placement', 'N/A')} Player: {player_data.get('name', 'N/A')} #{player_data.get('tag', 'N/A')}")
-                        print(f"GET Level {player_data.get('level', 0)!=0} Stage {player_data.get('stage', 0)!=0} Damage Done {player_data.get('damage_done', -1)!=-1} Board Value {player_data.get('board_value', -1)!=-1}")
+                        console_text.append(f"\nP{player_data.get('placement', 'N/A')} Player: {player_data.get('name', 'N/A')} #{player_data.get('tag', 'N/A')}")
+                        console_text.append(f"GET Level {player_data.get('level', 0)!=0} Stage {player_data.get('stage', 0)!=0} Damage Done {player_data.get('damage_done', -1)!=-1} Board Value {player_data.get('board_value', -1)!=-1}")
                         
                         # Display traits
                         if 'traits' in player_data:
-                            print("\nTraits:")
+                            console_text.append("\nTraits:")
                             for trait in player_data['traits']:
-                                print(f"{trait['name']}: {trait['count']}")
+                                console_text.append(f"{trait['name']}: {trait['count']}")
                                 #print first one only
-                                print(f"...")
+                                console_text.append(f"...")
                                 break
                         
                         # Display units
                         if 'units' in player_data:
-                            print("\nUnits:")
+                            console_text.append("\nUnits:")
                             for unit in player_data['units']:
-                                print(f"\n{unit['name']} (Tier {unit['tier']})")
+                                console_text.append(f"\n{unit['name']} (Tier {unit['tier']})")
                                 if unit['items']:
-                                    print("Items:")
+                                    console_text.append("Items:")
                                     for item in unit['items']:
-                                        print(f"- {item}")
+                                        console_text.append(f"- {item}")
                                         #print first one only
-                                        print(f"...")
+                                        console_text.append(f"...")
                                         break
                                 #print first one only   
-                                print(f"...")
+                                console_text.append(f"...")
                                 break
                         
                         clipboard_text.extend([
@@ -963,34 +1330,35 @@ class MetaTFT:
                             f"Damage Done: {player_data.get('damage_done', 'N/A')}",
                             f"Board Value: {player_data.get('board_value', 'N/A')}"
                         ])
+                    soup.decompose()
                 else:
-                    print(f"Unexpected players data type: {type(players_data)}")
-                    print(f"Players data content: {players_data}")
+                    console_text.append(f"Unexpected players data type: {type(players_data)}")
+                    console_text.append(f"Players data content: {players_data}")
         return clipboard_text
     
-    def display_personal_summary(self, recent_match, clipboard_text):
+    def display_personal_summary(self, recent_match, clipboard_text, console_text):
         summary_data = recent_match['personal_summary'] if 'personal_summary' in recent_match else []
         if not summary_data:
             return clipboard_text
         
-        print("\nPERSONAL SUMMARY:")
-        print(f"+ {summary_data}")
+        console_text.append("\nPERSONAL SUMMARY:")
+        console_text.append(f"+ {summary_data}")
         clipboard_text.extend(["\nSummary:"] + [f"- {tag}" for tag in summary_data])
         return clipboard_text
 
-    def display_stage_breakdown(self, recent_match, clipboard_text):
+    def display_stage_breakdown(self, recent_match, clipboard_text, console_text):
         """Display stage breakdown data if available"""
         if 'stage_breakdown' in recent_match:
-            print("\nSTAGE BREAKDOWN:")
+            console_text.append("\nSTAGE BREAKDOWN:")
             for stage in recent_match['stage_breakdown']:
-                print(f"\n{stage['name']}:")
-                print(f"Win Rate: {stage['win_rate']}")
+                console_text.append(f"\n{stage['name']}:")
+                console_text.append(f"Win Rate: {stage['win_rate']}")
                 if 'mvp' in stage:
                     mvp = stage['mvp']
-                    print(f"MVP: {mvp['name']}")
-                    print(f"Avg Damage/Round: {mvp['avg_damage']}")
-                    print(f"Max Damage/Round: {mvp['max_damage']}")
-                    print(f"Win Rate: {mvp['win_rate']}")
+                    console_text.append(f"MVP: {mvp['name']}")
+                    console_text.append(f"Avg Damage/Round: {mvp['avg_damage']}")
+                    console_text.append(f"Max Damage/Round: {mvp['max_damage']}")
+                    console_text.append(f"Win Rate: {mvp['win_rate']}")
                 clipboard_text.extend([
                     f"\n{stage['name']}:",
                     f"Win Rate: {stage['win_rate']}",
@@ -1001,17 +1369,17 @@ class MetaTFT:
                 ])
         return clipboard_text
 
-    def display_economy_data(self, recent_match, clipboard_text):
+    def display_economy_data(self, recent_match, clipboard_text, console_text):
         """Display economy data if available"""
         if 'economy' in recent_match:
-            print("\nECONOMY:")
+            console_text.append("\nECONOMY:")
             economy_data = recent_match['economy']
-            print(f"Interest: {economy_data.get('interest', 'N/A')}")
-            print(f"Streaks: {economy_data.get('streaks', 'N/A')}")
-            print(f"Wins: {economy_data.get('wins', 'N/A')}")
-            print(f"Best Streak: {economy_data.get('best streak', 'N/A')}")
-            print(f"Rerolls: {economy_data.get('rerolls', 'N/A')}")
-            print(f"XP Bought: {economy_data.get('xp bought', 'N/A')}")
+            console_text.append(f"Interest: {economy_data.get('interest', 'N/A')}")
+            console_text.append(f"Streaks: {economy_data.get('streaks', 'N/A')}")
+            console_text.append(f"Wins: {economy_data.get('wins', 'N/A')}")
+            console_text.append(f"Best Streak: {economy_data.get('best streak', 'N/A')}")
+            console_text.append(f"Rerolls: {economy_data.get('rerolls', 'N/A')}")
+            console_text.append(f"XP Bought: {economy_data.get('xp bought', 'N/A')}")
             clipboard_text.extend([
                 "\nECONOMY:",
                 f"Interest: {economy_data.get('interest', 'N/A')}",
@@ -1023,15 +1391,15 @@ class MetaTFT:
             ])
         return clipboard_text
 
-    def display_planning_data(self, recent_match, clipboard_text):
+    def display_planning_data(self, recent_match, clipboard_text, console_text):
         """Display planning phase data if available"""
         if 'planning' in recent_match:
-            print("\nPLANNING PHASE:")
+            console_text.append("\nPLANNING PHASE:")
             planning_data = recent_match['planning']
-            print(f"Scouting Time: {planning_data.get('scouting time', 'N/A')}")
-            print(f"Actions/Round: {planning_data.get('actions/round', 'N/A')}")
-            print(f"Repositions: {planning_data.get('repositions', 'N/A')}")
-            print(f"Board Changes: {planning_data.get('board changes', 'N/A')}")
+            console_text.append(f"Scouting Time: {planning_data.get('scouting time', 'N/A')}")
+            console_text.append(f"Actions/Round: {planning_data.get('actions/round', 'N/A')}")
+            console_text.append(f"Repositions: {planning_data.get('repositions', 'N/A')}")
+            console_text.append(f"Board Changes: {planning_data.get('board changes', 'N/A')}")
             clipboard_text.extend([
                 "\nPLANNING PHASE:",
                 f"Scouting Time: {planning_data.get('scouting time', 'N/A')}",
@@ -1041,21 +1409,21 @@ class MetaTFT:
             ])
         return clipboard_text
 
-    def display_key_rounds(self, recent_match, clipboard_text):
+    def display_key_rounds(self, recent_match, clipboard_text, console_text):
         """Display key rounds data if available"""
         if 'key_rounds' in recent_match:
-            print("\nKEY ROUNDS:")
+            console_text.append("\nKEY ROUNDS:")
             for round_data in recent_match['key_rounds']:
-                print(f"\n{round_data['title']}:")
-                print(f"Opponent: {round_data['opponent']}")
+                console_text.append(f"\n{round_data['title']}:")
+                console_text.append(f"Opponent: {round_data['opponent']}")
                 if 'hp_loss' in round_data:
-                    print(f"HP Loss: {round_data['hp_loss']}")
+                    console_text.append(f"HP Loss: {round_data['hp_loss']}")
                 if 'win_chance' in round_data:
-                    print(f"Win Chance: {round_data['win_chance']}")
-                print(f"Stage: {round_data['stage']}")
-                print("Units:")
+                    console_text.append(f"Win Chance: {round_data['win_chance']}")
+                console_text.append(f"Stage: {round_data['stage']}")
+                console_text.append("Units:")
                 for unit in round_data['units']:
-                    print(f"- {unit['name']} (Tier {unit['tier']})")
+                    console_text.append(f"- {unit['name']} (Tier {unit['tier']})")
                 
                 clipboard_text.extend([
                     f"\n{round_data['title']}:",
@@ -1073,46 +1441,46 @@ class MetaTFT:
                     clipboard_text.append(f"- {unit['name']} (Tier {unit['tier']})")
         return clipboard_text
 
-    def display_timeline(self, recent_match, clipboard_text):
+    def display_timeline(self, recent_match, clipboard_text, console_text):
         if 'timeline' in recent_match:
-            print("\nTIMELINE:")
+            console_text.append("\nTIMELINE:")
             timeline_data = recent_match['timeline']
             
             if isinstance(timeline_data, dict):
                 # Handle dictionary format timeline
                 for stage_key, stage_data in timeline_data.items():
                     if isinstance(stage_data, dict):
-                        print(f"\nStage: {stage_key}")
+                        console_text.append(f"\nStage: {stage_key}")
                         if 'units' in stage_data:
-                            print("Board:")
+                            console_text.append("Board:")
                             board_text = ""
                             for unit in stage_data['units']:
                                 unit_text = f"- {unit['name']} ({unit['tier']})"
                                 if 'items' in unit and unit['items']:
                                     unit_text += " items: " + ', '.join(unit['items'])
-                                print(unit_text)
+                                console_text.append(unit_text)
                                 board_text+=(unit_text)
 
                         if 'bench_items' in stage_data:
                             item_bench_text = ""
-                            print("Bench Items:")
+                            console_text.append("Bench Items:")
                             for item in stage_data['bench_items']:
-                                print(f"- {item}")
+                                console_text.append(f"- {item}")
                                 item_bench_text+=(f"- {item}")
 
                         if 'upgrades' in stage_data:
                             upgrades_text = ""
-                            print("Upgrades:")
+                            console_text.append("Upgrades:")
                             for upgrade in stage_data['upgrades']:
-                                print(f"- {upgrade['name']} ({upgrade['tier']})")
+                                console_text.append(f"- {upgrade['name']} ({upgrade['tier']})")
                                 upgrades_text+=(f"- {upgrade['name']} ({upgrade['tier']})")
 
-                        print(f"Level: {stage_data.get('level', 'N/A')}")
-                        print(f"Gold: {stage_data.get('gold', 'N/A')}")
-                        print(f"Rerolls: {stage_data.get('rerolls', 'N/A')}")
-                        print(f"HP: {stage_data.get('hp', 'N/A')}")
-                        print(f"Position: {stage_data.get('position', 'N/A')}")
-                        print(f"Damage: {stage_data.get('damage', 'N/A')}")
+                        console_text.append(f"Level: {stage_data.get('level', 'N/A')}")
+                        console_text.append(f"Gold: {stage_data.get('gold', 'N/A')}")
+                        console_text.append(f"Rerolls: {stage_data.get('rerolls', 'N/A')}")
+                        console_text.append(f"HP: {stage_data.get('hp', 'N/A')}")
+                        console_text.append(f"Position: {stage_data.get('position', 'N/A')}")
+                        console_text.append(f"Damage: {stage_data.get('damage', 'N/A')}")
                         
                         # Add to clipboard text
                         clipboard_text.extend([
@@ -1131,19 +1499,19 @@ class MetaTFT:
                             f"Damage: {stage_data.get('damage', 'N/A')}"
                         ])
             else:
-                print("No timeline data found")
+                console_text.append("No timeline data found")
         return clipboard_text
     
-    def display_round_detail(self, recent_match, clipboard_text):
+    def display_round_detail(self, recent_match, clipboard_text, console_text):
         if 'round_detail' in recent_match:
-            print("\nROUND DETAIL:")
+            console_text.append("\nROUND DETAIL:")
             round_detail_data = recent_match['round_detail']
             
             for round_data in round_detail_data:
-                print(f"\nRound: {round_data['round']}")
-                print(f"Result: {round_data['outcome']}")
-                print(f"Opponent: {round_data['opponent']}")
-                print(f"Team Map: {round_data['team_map']}")
+                console_text.append(f"\nRound: {round_data['round']}")
+                console_text.append(f"Result: {round_data['outcome']}")
+                console_text.append(f"Opponent: {round_data['opponent']}")
+                console_text.append(f"Team Map: {round_data['team_map']}")
 
                 clipboard_text.extend([
                     f"\nRound: {round_data['round']}",
@@ -1153,71 +1521,72 @@ class MetaTFT:
                 ])
         return clipboard_text
 
-    def display_match_history(self, matches, write_file=True):
-        if not matches:
-            print("No matches found")
-            return
-
-        print("\n=== Recent Ranked TFT Matches ===")
-        
-        # Get the most recent match
-        recent_match = matches[0]
+    def render_match(self, recent_match):
+        """Build the console lines and the clipboard/file lines for one match"""
+        console_text = ["\n=== Recent Ranked TFT Matches ==="]
         clipboard_text = []
         
-        print(f"Match ID: {recent_match['match_id']}")
+        console_text.append(f"Match ID: {recent_match['match_id']}")
         clipboard_text.append(f"Match ID: {recent_match['match_id']}")
         
         # Display players summary data
-        clipboard_text = self.display_players_summary(recent_match, clipboard_text)
+        clipboard_text = self.display_players_summary(recent_match, clipboard_text, console_text)
         
         # Display average opponent rank
-        clipboard_text = self.display_avg_opponent_rank(recent_match, clipboard_text)
+        clipboard_text = self.display_avg_opponent_rank(recent_match, clipboard_text, console_text)
         
         # Display players data
-        clipboard_text = self.display_players_data(recent_match, clipboard_text)
+        clipboard_text = self.display_players_data(recent_match, clipboard_text, console_text)
         
         # Display personal summary data
-        clipboard_text = self.display_personal_summary(recent_match, clipboard_text)
+        clipboard_text = self.display_personal_summary(recent_match, clipboard_text, console_text)
         
         # Display stage breakdown
-        clipboard_text = self.display_stage_breakdown(recent_match, clipboard_text)
+        clipboard_text = self.display_stage_breakdown(recent_match, clipboard_text, console_text)
         
         # Display economy data
-        clipboard_text = self.display_economy_data(recent_match, clipboard_text)
+        clipboard_text = self.display_economy_data(recent_match, clipboard_text, console_text)
         
         # Display planning phase data
-        clipboard_text = self.display_planning_data(recent_match, clipboard_text)
+        clipboard_text = self.display_planning_data(recent_match, clipboard_text, console_text)
         
         # Display key rounds data
-        clipboard_text = self.display_key_rounds(recent_match, clipboard_text)
+        clipboard_text = self.display_key_rounds(recent_match, clipboard_text, console_text)
         
         # Display timeline data
-        clipboard_text = self.display_timeline(recent_match, clipboard_text)
+        clipboard_text = self.display_timeline(recent_match, clipboard_text, console_text)
 
-        # Display timeline data
-        clipboard_text = self.display_round_detail(recent_match, clipboard_text)
-        
-        # Copy to clipboard
-        pyperclip.copy('\n'.join(clipboard_text))
-        print("\nData from most recent match has been copied to clipboard!")
-        
-        # Write to text file if write_file is True
-        if write_file:
-            try:
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                filename = f"tft_match_{timestamp}.txt"
-                with open(filename, 'w', encoding='utf-8') as f:
-                    f.write('\n'.join(clipboard_text))
-                print(f"\nMatch data has been written to {filename}")
-            except Exception as e:
-                print(f"Error writing to file: {e}")
-        
-        print("-" * 50)
+        # Display round detail data
+        clipboard_text = self.display_round_detail(recent_match, clipboard_text, console_text)
+
+        console_text.append("-" * 50)
+        return console_text, clipboard_text
+
+    async def output_match_history(self, matches, sinks):
+        """Render the most recent match off the event loop and send it to `sinks` (see output.py)"""
+        if not sinks:
+            return
+        if not matches:
+            print("No matches found")
+            return
+        await output.publish(output.MatchReport(self, matches[0]), sinks)
+
+    def display_match_history(self, matches, write_file=True):
+        """Synchronous wrapper for scripts without an event loop"""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        else:
+            raise RuntimeError("display_match_history can't run inside an event loop, "
+                               "await output_match_history(matches, output.default_sinks()) instead")
+        asyncio.run(self.output_match_history(matches, output.default_sinks(write_file=write_file)))
 
-def get_riot_id():
+def get_riot_id(default_region='tw'):
+    from dotenv import load_dotenv
     load_dotenv()
     riot_id = os.getenv('RIOT_ID')
-    region = os.getenv('REGION', 'tw')
+    region = os.getenv('REGION', default_region)
     
     if riot_id:
         print(f"Using Riot ID, region from .env: {riot_id} {region}")
@@ -1230,14 +1599,63 @@ def get_riot_id():
 def argparse_args():
     parser = argparse.ArgumentParser(description='Fetch TFT match data')
     parser.add_argument('--no-file', action='store_true', help='Do not write match data to file')
+    parser.add_argument('--no-clipboard', action='store_true', help='Do not copy match data to the clipboard')
+    parser.add_argument('--quiet', action='store_true', help='Do not print match data to the console')
+    parser.add_argument('--tabs', default=None, help=f"Comma separated tabs to scrape ({', '.join(name.replace(' ', '_') for name in TAB_FIELDS)}), default from the crawl profile (all)")
+    parser.add_argument('--fields', default=None, help='Comma separated match fields to keep, e.g. players,timeline; only tabs holding them are scraped')
+    parser.add_argument('--match-index', default=None, help='SQLite file of already scraped matches; known matches skip the shared tabs')
+    parser.add_argument('--modes', default=None, help=f"Comma separated queue modes ({', '.join(name.replace(' ', '_') for name in QUEUE_MODES)}); the first one is used for match details")
+    parser.add_argument('--summary-only', action='store_true', help='Only print the summary line of every listed match, no match is expanded')
+    parser.add_argument('--max-rps', type=float, default=None, help='Request rate limit (requests per second), default 1 rps per host; also sets the host rate unless --host-rps is given')
+    parser.add_argument('--host-rps', type=float, default=None, help='Per-host request rate limit (requests per second)')
+    parser.add_argument('--rate-limit-file', default=None, help='Share the rate limit with other processes through this lock file')
+    parser.add_argument('--asset-cache', default=None, help='Directory to keep local copies of the unit, item and trait icons in')
+    parser.add_argument('--profile-dir', default=None, metavar='DIR', help='Profile the run; writes profile.folded (flamegraph), report.txt and matches.jsonl to DIR')
+    add_config_arguments(parser)
     return parser.parse_args()
 
 async def main():
     args = argparse_args()
-    riot_id, region = get_riot_id()
-    tft = MetaTFT()
-    matches = await tft.get_match_data(riot_id, region)
-    tft.display_match_history(matches, write_file=not args.no_file)
+    config = config_from_args(args)
+    max_rps = args.max_rps or config.crawl.max_rps
+    if max_rps or args.host_rps or args.rate_limit_file:
+        configure_rate_limiter(global_rate=max_rps, host_rate=args.host_rps, lock_file=args.rate_limit_file)
+    riot_id, region = get_riot_id(config.crawl.region)
+    modes = args.modes.split(',') if args.modes else config.crawl.modes
+    # command line options win over the config
+    overrides = {'queue_mode': modes[0]}
+    if args.tabs:
+        overrides['tabs'] = args.tabs.split(',')
+    if args.fields:
+        overrides['fields'] = args.fields.split(',')
+    if args.match_index:
+        overrides['match_index'] = MatchIndex(args.match_index)
+    if args.asset_cache:
+        overrides['asset_cache'] = AssetCache(args.asset_cache)
+    tft = MetaTFT.from_config(config, profiler=Profiler() if args.profile_dir else None, **overrides)
+    if tft.profiler is not None:
+        tft.profiler.start()
+    try:
+        if args.summary_only:
+            lists = await tft.get_match_lists(riot_id, region, modes) or {}
+            for mode, summaries in lists.items():
+                print(f"{QUEUE_MODES[mode]}:")
+                for summary in summaries:
+                    print(format_summary(summary))
+        else:
+            matches = await tft.get_match_data(riot_id, region)
+            sinks = output.default_sinks(console=config.output.console and not args.quiet,
+                                         clipboard=config.output.clipboard and not args.no_clipboard,
+                                         write_file=config.output.file and not args.no_file,
+                                         directory=config.output.directory)
+            await tft.output_match_history(matches, sinks)
+    finally:
+        if tft.profiler is not None:
+            tft.profiler.stop()
+            tft.profiler.write(args.profile_dir)
+            print(f"Profile written to {args.profile_dir}")
+    if tft.asset_cache is not None:
+        print(f"{await tft.asset_cache.fetch_pending()} new assets cached in {tft.asset_cache.directory}")
 
 if __name__ == "__main__":
     asyncio.run(main()) 
\ No newline at end of file
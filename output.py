@@ -0,0 +1,100 @@
+import os
+import sys
+import asyncio
+from datetime import datetime
+
+
+class MatchReport:
+    """
+    Console and clipboard/file text of a match, rendered on first access.
+
+    Rendering walks the MetaTFT display_* methods once and fills both
+    outputs; a crawl without sinks never renders anything.
+    """
+
+    def __init__(self, tft, match):
+        self.tft = tft
+        self.match = match
+        self._console_text = None
+        self._clipboard_text = None
+
+    def render(self):
+        if self._console_text is None:
+            self._console_text, self._clipboard_text = self.tft.render_match(self.match)
+        return self
+
+    @property
+    def console(self):
+        return '\n'.join(self.render()._console_text)
+
+    @property
+    def text(self):
+        return '\n'.join(self.render()._clipboard_text)
+
+
+class Sink:
+    async def emit(self, report):
+        raise NotImplementedError
+
+
+class ConsoleSink(Sink):
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+
+    def _write(self, text):
+        self.stream.write(text + '\n')
+        self.stream.flush()
+
+    async def emit(self, report):
+        await asyncio.to_thread(self._write, report.console)
+
+
+class ClipboardSink(Sink):
+    """Copy the report with pyperclip; a missing or broken clipboard only prints a note."""
+
+    async def emit(self, report):
+        try:
+            import pyperclip
+            await asyncio.to_thread(pyperclip.copy, report.text)
+            print("\nData from most recent match has been copied to clipboard!")
+        except Exception as e:
+            print(f"Clipboard not available: {e}")
+
+
+class FileSink(Sink):
+    def __init__(self, directory='.', prefix='tft_match_'):
+        self.directory = directory
+        self.prefix = prefix
+
+    def _write(self, filename, text):
+        with open(filename, 'w', encoding='utf-8') as f:
+            f.write(text)
+
+    async def emit(self, report):
+        try:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = os.path.join(self.directory, f"{self.prefix}{timestamp}.txt")
+            # render before handing off so the writer thread only does I/O
+            text = report.text
+            await asyncio.to_thread(self._write, filename, text)
+            print(f"\nMatch data has been written to {filename}")
+        except Exception as e:
+            print(f"Error writing to file: {e}")
+
+
+def default_sinks(console=True, clipboard=True, write_file=True, directory='.'):
+    sinks = []
+    if console:
+        sinks.append(ConsoleSink())
+    if clipboard:
+        sinks.append(ClipboardSink())
+    if write_file:
+        sinks.append(FileSink(directory))
+    return sinks
+
+async def publish(report, sinks):
+    """Render `report` in a worker thread, then hand it to every sink concurrently."""
+    if not sinks:
+        return
+    await asyncio.to_thread(report.render)
+    await asyncio.gather(*(sink.emit(report) for sink in sinks))
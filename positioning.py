@@ -0,0 +1,188 @@
+import re
+import json
+import numpy as np
+
+ROWS = 4
+COLS = 7
+# channels of an encoded board: unit code, star level, then up to three item codes
+UNIT, STAR, ITEM1, ITEM2, ITEM3 = range(5)
+CHANNELS = 5
+MAX_ITEMS = 3
+# row 0 is the top row of the team-builder svg, the one facing the opponent
+FRONT_ROW = 0
+BACK_ROW = ROWS - 1
+
+NUMBER = re.compile(r'\d+')
+POINT = re.compile(r'(-?\d+(?:\.\d+)?)[ ,]+(-?\d+(?:\.\d+)?)')
+
+
+class Vocabulary:
+    """Unit/item name <-> small int code, 0 is reserved for an empty slot"""
+
+    def __init__(self, names=()):
+        self.names = ['']
+        self.codes = {}
+        for name in names:
+            self.code(name)
+
+    def code(self, name):
+        if name not in self.codes:
+            self.codes[name] = len(self.names)
+            self.names.append(name)
+        return self.codes[name]
+
+    def name(self, code):
+        return self.names[code]
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.names[1:], f)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+
+def _polygon_center(polygon):
+    points = [(float(x), float(y)) for x, y in POINT.findall(polygon.get('points', ''))]
+    if not points:
+        return None
+    return sum(x for x, _ in points) / len(points), sum(y for _, y in points) / len(points)
+
+def hex_cells(team_builder):
+    """
+    polygon id -> (row, col) for every hex of the board.
+
+    With all 28 hexes present their centers are ranked top to bottom into
+    four rows and left to right within a row, which does not depend on how
+    the site numbers them. Otherwise the number in the polygon id is taken
+    as a row-major cell index.
+    """
+    polygons = team_builder.find_all('polygon')
+    centers = [(polygon.get('id', ''), _polygon_center(polygon)) for polygon in polygons]
+    cells = {}
+    if len(centers) == ROWS * COLS and all(center for _, center in centers):
+        by_y = sorted(centers, key=lambda item: item[1][1])
+        for row in range(ROWS):
+            row_cells = sorted(by_y[row * COLS:(row + 1) * COLS], key=lambda item: item[1][0])
+            for col, (hex_id, _) in enumerate(row_cells):
+                cells[hex_id] = (row, col)
+        return cells
+    for polygon in polygons:
+        hex_id = polygon.get('id', '')
+        found = NUMBER.findall(hex_id)
+        if found and int(found[-1]) < ROWS * COLS:
+            cells[hex_id] = divmod(int(found[-1]), COLS)
+    return cells
+
+def _unit_name(g):
+    # the champion portrait is an svg pattern named mask-<set>_<Name>-<n>
+    pattern = g.find('pattern', id=lambda x: x and x.startswith('mask-'))
+    if pattern:
+        parts = pattern['id'].split('_')
+        if len(parts) >= 2:
+            return parts[1].split('-')[0]
+    for image in g.find_all('image'):
+        classes = image.get('class', [])
+        if 'unit-stars-svg' in classes or 'draggable-unit-item' in classes:
+            continue
+        if image.get('alt'):
+            return image['alt']
+        href = image.get('href') or image.get('xlink:href') or ''
+        if href:
+            return href.split('/')[-1].rsplit('.', 1)[0].split('_')[-1]
+    return g.get_text(strip=True)
+
+def _unit_star(g):
+    star_image = g.find('image', class_='unit-stars-svg')
+    if not star_image:
+        return '1'
+    found = NUMBER.findall(star_image.get('alt', '') or (star_image.get('href') or '').split('/')[-1])
+    return found[-1] if found else '1'
+
+def decode_team_builder(team_builder):
+    """
+    Units of a round's `team-builder` svg as
+    [{'name', 'tier', 'items', 'row', 'col'}], row 0 being the front row.
+    """
+    if not team_builder:
+        return []
+    cells = hex_cells(team_builder)
+    units = []
+    for g in team_builder.find_all('g'):
+        polygon = g.find('polygon')
+        # only the innermost group holding both a hex and a unit is a placed unit
+        if not polygon or g.find('g') or not (g.find('image') or g.find('pattern')):
+            continue
+        position = cells.get(polygon.get('id', ''))
+        if position is None:
+            continue
+        item_images = g.find_all('image', class_='draggable-unit-item')
+        units.append({
+            'name': _unit_name(g),
+            'tier': _unit_star(g),
+            'items': [item.get('alt', '') for item in item_images if item.get('alt', '')],
+            'row': position[0],
+            'col': position[1],
+        })
+    return units
+
+def encode_board(units, unit_vocabulary, item_vocabulary):
+    """decode_team_builder units -> int16 array of shape (CHANNELS, ROWS, COLS)"""
+    board = np.zeros((CHANNELS, ROWS, COLS), dtype=np.int16)
+    for unit in units:
+        row, col = unit['row'], unit['col']
+        board[UNIT, row, col] = unit_vocabulary.code(unit['name'])
+        board[STAR, row, col] = int(unit.get('tier') or 1)
+        for i, item in enumerate(unit.get('items', [])[:MAX_ITEMS]):
+            board[ITEM1 + i, row, col] = item_vocabulary.code(item)
+    return board
+
+def encode_boards(boards, unit_vocabulary, item_vocabulary):
+    """Stack many boards into one (N, CHANNELS, ROWS, COLS) array"""
+    encoded = np.zeros((len(boards), CHANNELS, ROWS, COLS), dtype=np.int16)
+    for i, units in enumerate(boards):
+        encoded[i] = encode_board(units, unit_vocabulary, item_vocabulary)
+    return encoded
+
+
+# region bulk analytics over (N, CHANNELS, ROWS, COLS) arrays
+def occupied(boards):
+    return boards[:, UNIT] > 0
+
+def unit_counts(boards):
+    return occupied(boards).sum(axis=(1, 2))
+
+def row_share(boards, row):
+    """Fraction of each board's units standing in `row`"""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return occupied(boards)[:, row, :].sum(axis=1) / unit_counts(boards)
+
+def frontline_share(boards):
+    return row_share(boards, FRONT_ROW)
+
+def backline_share(boards):
+    return row_share(boards, BACK_ROW)
+
+def corner_usage(boards):
+    """Whether each board has a unit in one of the two back corners"""
+    back = occupied(boards)[:, BACK_ROW, :]
+    return back[:, 0] | back[:, COLS - 1]
+
+def placement_by(mask, placements):
+    """Mean placement of boards where `mask` holds vs. where it does not"""
+    placements = np.asarray(placements, dtype=np.float32)
+    mask = np.asarray(mask, dtype=bool)
+    with np.errstate(invalid='ignore'):
+        return float(placements[mask].mean()), float(placements[~mask].mean())
+
+def heatmap(boards, placements=None):
+    """(ROWS, COLS) occupancy rate per hex, or mean placement of boards using each hex"""
+    cells = occupied(boards)
+    if placements is None:
+        return cells.mean(axis=0)
+    weights = np.asarray(placements, dtype=np.float32)[:, None, None]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return (cells * weights).sum(axis=0) / cells.sum(axis=0)
+# endregion
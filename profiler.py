@@ -0,0 +1,227 @@
+import os
+import sys
+import json
+import time
+import inspect
+import threading
+import contextvars
+from contextlib import contextmanager
+from http_fetcher import MATCH_ID
+
+PLAYWRIGHT = 'playwright'
+SLEEP = 'sleep'
+THROTTLE = 'throttle'
+PARSE = 'parse/other'
+CATEGORIES = (PLAYWRIGHT, SLEEP, THROTTLE, PARSE)
+# page calls that only wait, counted as sleep rather than as Playwright work
+SLEEP_METHODS = ('wait_for_timeout',)
+PLAIN_TYPES = (str, bytes, int, float, bool, dict, list, tuple, type(None))
+
+# the match the running task is scraping, so concurrent matches keep separate costs
+_current_match = contextvars.ContextVar('current_match', default=None)
+
+
+def selector_key(method, selector):
+    """'query_selector #TW2_123 .Tab' -> 'query_selector #<match> .Tab', so the same selector adds up across matches"""
+    return MATCH_ID.sub('<match>', ' '.join(f"{method} {selector}".split()))[:160]
+
+
+class ProfiledHandle:
+    """
+    Proxy for a Playwright page, element handle or locator that times every
+    awaited call. Returned handles are wrapped too and remember the selector
+    they came from, so element.click() is reported under that selector.
+    """
+
+    def __init__(self, target, profiler, origin=''):
+        self._target = target
+        self._profiler = profiler
+        self._origin = origin
+
+    def __getattr__(self, name):
+        value = getattr(self._target, name)
+        if not callable(value):
+            return self._profiler.wrap(value, f"{self._origin} {name}".strip())
+        return lambda *args, **kwargs: self._call(name, value, args, kwargs)
+
+    def _call(self, name, method, args, kwargs):
+        args = [arg._target if isinstance(arg, ProfiledHandle) else arg for arg in args]
+        result = method(*args, **kwargs)
+        selector = args[0] if args and isinstance(args[0], str) else ''
+        origin = ' '.join(part for part in (self._origin, selector) if part)
+        if not inspect.isawaitable(result):
+            return self._profiler.wrap(result, origin)
+        return self._timed(result, name, selector_key(name, origin), origin)
+
+    async def _timed(self, awaitable, name, key, origin):
+        started = time.perf_counter()
+        try:
+            result = await awaitable
+        finally:
+            self._profiler.record(SLEEP if name in SLEEP_METHODS else PLAYWRIGHT,
+                                  time.perf_counter() - started, key)
+        return self._profiler.wrap(result, origin)
+
+
+class Profiler:
+    """
+    Where a crawl spends its time.
+
+    A sampling thread records the event loop thread's Python stack every
+    `interval` seconds and writes them as folded stacks (flamegraph.pl,
+    speedscope and inferno all read them). Around that, each match gets a
+    wall time split into time awaiting Playwright, explicit sleeps, rate
+    limiter waits and the rest (parsing and other Python work). Playwright
+    calls and tabs are also totalled per selector and per tab name.
+    """
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.stacks = {}
+        self.samples = 0
+        self.totals = {category: 0.0 for category in CATEGORIES}
+        # key -> [calls, total seconds, max seconds]
+        self.selectors = {}
+        self.tabs = {}
+        self.matches = []
+        self.started = None
+        self.elapsed = 0.0
+        self._thread = None
+        self._stop = threading.Event()
+        self._target_thread = None
+
+    # region sampling
+    def start(self):
+        self.started = time.perf_counter()
+        self._target_thread = threading.get_ident()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample_loop, name='profiler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        if self.started is not None:
+            self.elapsed = time.perf_counter() - self.started
+
+    def _sample_loop(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target_thread)
+            if frame is not None:
+                self.sample(frame)
+
+    def sample(self, frame):
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        stack = ';'.join(reversed(names))
+        self.stacks[stack] = self.stacks.get(stack, 0) + 1
+        self.samples += 1
+    # endregion
+
+    # region wait-time accounting
+    def wrap(self, value, origin=''):
+        if isinstance(value, (list, tuple)) and value and not isinstance(value[0], PLAIN_TYPES):
+            return [ProfiledHandle(item, self, origin) for item in value]
+        if isinstance(value, PLAIN_TYPES) or isinstance(value, ProfiledHandle):
+            return value
+        return ProfiledHandle(value, self, origin)
+
+    def wrap_page(self, page):
+        return page if isinstance(page, ProfiledHandle) else ProfiledHandle(page, self)
+
+    def record(self, category, seconds, key=None):
+        self.totals[category] += seconds
+        if key is not None:
+            self._add(self.selectors, key, seconds)
+        match = _current_match.get()
+        if match is not None:
+            match[category] += seconds
+
+    @staticmethod
+    def _add(table, key, seconds):
+        entry = table.setdefault(key, [0, 0.0, 0.0])
+        entry[0] += 1
+        entry[1] += seconds
+        entry[2] = max(entry[2], seconds)
+
+    @contextmanager
+    def match(self, match_id):
+        """Per-match cost record; whatever is not Playwright, sleep or throttle counts as parse/other"""
+        match = {'match_id': match_id, 'wall': 0.0, **{category: 0.0 for category in CATEGORIES}}
+        token = _current_match.set(match)
+        started = time.perf_counter()
+        try:
+            yield match
+        finally:
+            _current_match.reset(token)
+            match['wall'] = time.perf_counter() - started
+            match[PARSE] = max(0.0, match['wall'] - match[PLAYWRIGHT] - match[SLEEP] - match[THROTTLE])
+            self.totals[PARSE] += match[PARSE]
+            self.matches.append(match)
+
+    @contextmanager
+    def timed(self, category, key=None):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(category, time.perf_counter() - started, key)
+
+    @contextmanager
+    def tab(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._add(self.tabs, name.strip().lower(), time.perf_counter() - started)
+    # endregion
+
+    # region output
+    def hottest_functions(self, top=20):
+        """(frame, samples) of the innermost frames, most sampled first"""
+        leaves = {}
+        for stack, count in self.stacks.items():
+            leaf = stack.rsplit(';', 1)[-1]
+            leaves[leaf] = leaves.get(leaf, 0) + count
+        return sorted(leaves.items(), key=lambda item: item[1], reverse=True)[:top]
+
+    def report(self, top=20):
+        lines = [f"Crawl profile: {self.elapsed:.1f}s wall, {len(self.matches)} matches, "
+                 f"{self.samples} stack samples every {self.interval * 1000:.0f} ms", '',
+                 'Time by category (summed over matches, concurrent matches overlap):']
+        total = sum(self.totals.values()) or 1
+        for category in CATEGORIES:
+            lines.append(f"  {category:<12} {self.totals[category]:9.2f}s  {self.totals[category] / total:6.1%}")
+
+        for title, table in (('Slowest tabs', self.tabs), ('Slowest selectors', self.selectors)):
+            lines += ['', f"{title} (total, mean, max, calls):"]
+            for key, (calls, seconds, longest) in sorted(table.items(), key=lambda item: item[1][1], reverse=True)[:top]:
+                lines.append(f"  {seconds:9.2f}s {seconds / calls:8.3f}s {longest:8.3f}s {calls:6d}  {key}")
+
+        lines += ['', f"Slowest matches (wall, {', '.join(CATEGORIES)}):"]
+        for match in sorted(self.matches, key=lambda match: match['wall'], reverse=True)[:top]:
+            costs = ' '.join(f"{match[category]:8.2f}s" for category in CATEGORIES)
+            lines.append(f"  {match['wall']:8.2f}s {costs}  {match['match_id']}")
+
+        lines += ['', 'Hottest functions (stack samples):']
+        for frame, count in self.hottest_functions(top):
+            lines.append(f"  {count:7d} {count / max(self.samples, 1):6.1%}  {frame}")
+        return '\n'.join(lines)
+
+    def write(self, directory):
+        """profile.folded (flamegraph input), report.txt and one JSON line per match"""
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, 'profile.folded'), 'w', encoding='utf-8') as f:
+            for stack, count in sorted(self.stacks.items()):
+                f.write(f"{stack} {count}\n")
+        with open(os.path.join(directory, 'report.txt'), 'w', encoding='utf-8') as f:
+            f.write(self.report() + '\n')
+        with open(os.path.join(directory, 'matches.jsonl'), 'w', encoding='utf-8') as f:
+            for match in self.matches:
+                f.write(json.dumps(match) + '\n')
+    # endregion
@@ -0,0 +1,119 @@
+import numpy as np
+from match import tier
+
+# one integer ladder: 100 LP per division, 400 per tier, Iron IV 0 LP = 0;
+# master and above share a single LP ladder on top of Diamond I 100 LP
+DIVISION_LP = 100
+TIER_LP = 4 * DIVISION_LP
+TIER_NAMES = [t.value.lower() for t in tier]
+APEX_INDEX = TIER_NAMES.index('master')
+UNKNOWN = -1
+
+# normalized text -> code lookup tables, aliases included
+TIER_CODES = {name: i for i, name in enumerate(TIER_NAMES)}
+TIER_CODES.update({'grand master': TIER_CODES['grandmaster'], 'plat': TIER_CODES['platinum']})
+DIVISION_CODES = {'iv': 4, 'iii': 3, 'ii': 2, 'i': 1, '4': 4, '3': 3, '2': 2, '1': 1, '': 4}
+# BASE_SCORE[tier code, division] is the ladder score at 0 LP; the last row is for unknown tiers
+BASE_SCORE = np.full((len(TIER_NAMES) + 1, 5), UNKNOWN, dtype=np.int32)
+for _index in range(len(TIER_NAMES)):
+    for _division in range(1, 5):
+        BASE_SCORE[_index, _division] = (APEX_INDEX * TIER_LP if _index >= APEX_INDEX
+                                         else _index * TIER_LP + (4 - _division) * DIVISION_LP)
+
+
+def _parse_lp(text):
+    digits = ''.join(ch for ch in str(text) if ch.isdigit() or ch == '-')
+    try:
+        return int(digits)
+    except ValueError:
+        return 0
+
+def _lookup(values, parse):
+    """Apply `parse` to each distinct value only, then broadcast back to every row"""
+    values = np.asarray(values)
+    if values.dtype.kind in 'iuf':
+        return values
+    uniques, inverse = np.unique(values.astype(str), return_inverse=True)
+    return np.array([parse(value) for value in uniques], dtype=np.int32)[inverse].reshape(values.shape)
+
+def tier_codes(tiers):
+    return _lookup(tiers, lambda name: TIER_CODES.get(name.strip().lower(), len(TIER_NAMES)))
+
+def division_codes(divisions):
+    return _lookup(divisions, lambda division: DIVISION_CODES.get(division.strip().lower(), 4))
+
+def lp_values(lps):
+    return _lookup(lps, _parse_lp)
+
+def ladder_scores(tiers, divisions, lps):
+    """Vectorized (tier, division, LP) -> ladder score, UNKNOWN (-1) where the tier is not a rank"""
+    tier_index = tier_codes(tiers)
+    base = BASE_SCORE[tier_index, division_codes(divisions)]
+    return np.where(base == UNKNOWN, UNKNOWN, base + lp_values(lps)).astype(np.int32)
+
+def ladder_score(rank):
+    """{'tier', 'division', 'lp'} dict -> ladder score, None without a known tier"""
+    if not rank:
+        return None
+    score = int(ladder_scores([str(rank.get('tier', ''))], [str(rank.get('division', ''))], [str(rank.get('lp', ''))])[0])
+    return None if score == UNKNOWN else score
+
+def rank_from_score(score):
+    """Ladder score -> {'tier', 'division', 'lp'}, the inverse of ladder_score; None for UNKNOWN"""
+    score = int(score)
+    if score < 0:
+        return None
+    if score >= APEX_INDEX * TIER_LP:
+        return {'tier': TIER_NAMES[APEX_INDEX], 'division': '', 'lp': score - APEX_INDEX * TIER_LP}
+    tier_index, rest = divmod(score, TIER_LP)
+    division_step, lp = divmod(rest, DIVISION_LP)
+    return {'tier': TIER_NAMES[tier_index], 'division': ('IV', 'III', 'II', 'I')[division_step], 'lp': lp}
+
+def tier_index(scores):
+    """Ladder scores -> tier index (apex tiers fold into master), UNKNOWN stays -1"""
+    scores = np.asarray(scores)
+    return np.where(scores < 0, UNKNOWN, np.minimum(scores // TIER_LP, APEX_INDEX))
+
+
+# region lobby analytics over arrays
+def lobby_scores(matches):
+    """Ladder score of each match's lobby average (the Players tab avg_opponent_rank)"""
+    ranks = [match.get('avg_opponent_rank') or {} for match in matches]
+    return ladder_scores([str(r.get('tier', '')) for r in ranks],
+                         [str(r.get('division', '')) for r in ranks],
+                         [str(r.get('lp', '')) for r in ranks])
+
+def lobby_strength(scores, lobby_ids):
+    """Mean ladder score per lobby from per-player scores; unknown ranks are left out"""
+    scores = np.asarray(scores, dtype=np.float64)
+    lobbies, inverse = np.unique(lobby_ids, return_inverse=True)
+    known = scores >= 0
+    totals = np.bincount(inverse[known], weights=scores[known], minlength=len(lobbies))
+    counts = np.bincount(inverse[known], minlength=len(lobbies))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return lobbies, totals / counts
+
+def mmr_adjusted_placement(placements, player_scores, lobby_scores, lp_per_place=200):
+    """
+    Placement minus the placement expected from the rank gap to the lobby:
+    a player `lp_per_place` above the lobby average is expected one place
+    better than 4.5. Negative means better than expected, NaN where either
+    score is UNKNOWN.
+    """
+    placements = np.asarray(placements, dtype=np.float64)
+    player_scores = np.asarray(player_scores, dtype=np.float64)
+    lobby_scores = np.asarray(lobby_scores, dtype=np.float64)
+    gap = np.where((player_scores < 0) | (lobby_scores < 0), np.nan, player_scores - lobby_scores)
+    expected = np.clip(4.5 - gap / lp_per_place, 1, 8)
+    return placements - expected
+
+def per_tier(scores, values):
+    """Mean of `values` per tier (index into TIER_NAMES, apex folded into master), NaN for empty tiers"""
+    tiers = tier_index(scores)
+    values = np.asarray(values, dtype=np.float64)
+    known = tiers >= 0
+    totals = np.bincount(tiers[known], weights=values[known], minlength=APEX_INDEX + 1)
+    counts = np.bincount(tiers[known], minlength=APEX_INDEX + 1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return totals / counts
+# endregion
@@ -0,0 +1,246 @@
+# to run:
+# python rank_store.py build checkpoints/*.jsonl -o ranks
+# python rank_store.py show ranks "name#tag" --days 30 --bucket-hours 24
+import os
+import re
+import json
+import glob
+import time
+import hashlib
+import argparse
+import numpy as np
+from rank import ladder_score
+
+PLAYER = 'player'
+LOBBY = 'lobby'
+AGO = re.compile(r'(\d+|an?)\s+(second|minute|hour|day|week|month|year)s?\s+ago')
+UNIT_SECONDS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400, 'week': 604800, 'month': 2592000, 'year': 31536000}
+
+
+def parse_played_at(text, now):
+    """'12 hours ago' / 'a day ago' -> unix time relative to `now`; `now` when unreadable"""
+    found = AGO.search(str(text or '').lower())
+    if not found:
+        return int(now)
+    count = 1 if found.group(1) in ('a', 'an') else int(found.group(1))
+    return int(now - count * UNIT_SECONDS[found.group(2)])
+
+
+def match_key(match_id):
+    """Stable non-zero int64 for a match id; 0 is left for points appended without one"""
+    if not match_id:
+        return 0
+    return int.from_bytes(hashlib.blake2b(str(match_id).encode('utf-8'), digest_size=7).digest(), 'big') or 1
+
+
+def delta_encode(series, values):
+    """Values sorted by (series, time) -> first value of each series absolute, then differences"""
+    deltas = np.diff(values, prepend=values[:1])
+    starts = np.ones(len(series), dtype=bool)
+    starts[1:] = series[1:] != series[:-1]
+    deltas[starts] = values[starts]
+    return deltas
+
+def delta_decode(series, deltas):
+    totals = np.cumsum(deltas)
+    starts = np.flatnonzero(np.r_[True, series[1:] != series[:-1]]) if len(series) else np.empty(0, dtype=np.int64)
+    offsets = np.r_[0, totals[starts[1:] - 1]] if len(starts) else np.empty(0, dtype=totals.dtype)
+    lengths = np.diff(np.r_[starts, len(series)])
+    return totals - np.repeat(offsets, lengths)
+
+
+class RankStore:
+    """
+    Append-only rank/LP time series, one per (player, kind): the player's own
+    ladder score from the match card, or the lobby average from the Players tab.
+
+    New points are buffered and written by flush() as one compressed chunk,
+    sorted by (series, time) and delta-encoded within each series. Chunks are
+    only ever added, and compact() merges them into one. Reads decode every
+    chunk into per-series arrays once, so range queries are a binary search.
+
+    Card times are only as exact as "2 hours ago", so different matches can
+    share a timestamp and the same match can get two. Each point keeps a key
+    hashed from its match id: reads drop repeats of a (series, match) and
+    keep every match that happens to share a time.
+    """
+
+    def __init__(self, directory='ranks'):
+        self.directory = directory
+        self.series_path = os.path.join(directory, 'series.json')
+        os.makedirs(directory, exist_ok=True)
+        self.series = []
+        self.series_codes = {}
+        if os.path.exists(self.series_path):
+            with open(self.series_path, 'r', encoding='utf-8') as f:
+                for name in json.load(f):
+                    self._series_code(tuple(name))
+        self._pending = []
+        self._columns = None
+
+    def _series_code(self, key):
+        if key not in self.series_codes:
+            self.series_codes[key] = len(self.series)
+            self.series.append(key)
+        return self.series_codes[key]
+
+    def _chunk_paths(self):
+        return sorted(glob.glob(os.path.join(self.directory, 'chunk-*.npz')))
+
+    def append(self, player, kind, timestamp, score, match_id=None):
+        if score is None:
+            return
+        self._pending.append((self._series_code((player, kind)), int(timestamp), int(score), match_key(match_id)))
+        self._columns = None
+
+    def add_match(self, match_data, player=None, now=None):
+        """A history/lobby record: own rank from its summary card, lobby average from the Players tab"""
+        now = time.time() if now is None else now
+        player = player or match_data.get('riot_id', '')
+        summary = match_data.get('summary') or {}
+        timestamp = parse_played_at(summary.get('played_at'), now)
+        match_id = match_data.get('match_id') or summary.get('match_id')
+        self.append(player, PLAYER, timestamp, ladder_score(summary.get('player_rank')), match_id)
+        self.append(player, LOBBY, timestamp, ladder_score(match_data.get('avg_opponent_rank')), match_id)
+
+    def _write_chunk(self, path, series, times, scores, keys):
+        order = np.lexsort((keys, times, series))
+        series, times, scores, keys = series[order], times[order], scores[order], keys[order]
+        # written under a name the chunk glob skips, so a crash never leaves half a chunk behind
+        tmp_path = os.path.join(self.directory, 'chunk.tmp')
+        with open(tmp_path, 'wb') as f:
+            np.savez_compressed(f, series=np.diff(series, prepend=0),
+                                times=delta_encode(series, times), scores=delta_encode(series, scores), keys=keys)
+        os.replace(tmp_path, path)
+
+    def _save_series(self):
+        tmp_path = f"{self.series_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump([list(key) for key in self.series], f)
+        os.replace(tmp_path, self.series_path)
+
+    def flush(self):
+        if not self._pending:
+            return
+        rows = np.array(self._pending, dtype=np.int64)
+        self._pending = []
+        self._save_series()
+        paths = self._chunk_paths()
+        number = int(os.path.basename(paths[-1])[6:-4]) + 1 if paths else 0
+        self._write_chunk(os.path.join(self.directory, f"chunk-{number:06d}.npz"),
+                          rows[:, 0].astype(np.int32), rows[:, 1], rows[:, 2].astype(np.int32), rows[:, 3])
+
+    def _read_chunk(self, path):
+        with np.load(path) as data:
+            # series ids are sorted, so their plain differences are almost all 0
+            series = np.cumsum(data['series']).astype(np.int32)
+            return series, delta_decode(series, data['times']), delta_decode(series, data['scores']), data['keys']
+
+    def columns(self):
+        """
+        (series, times, scores, keys, bounds) of every stored point, sorted by
+        series then time, one point per (series, match). append() also takes
+        points without a match id (key 0), e.g. from other rank sources; those
+        keep one point per (series, time).
+        """
+        if self._columns is None:
+            self.flush()
+            parts = [self._read_chunk(path) for path in self._chunk_paths()]
+            if parts:
+                series, times, scores, keys = (np.concatenate(column) for column in zip(*parts))
+            else:
+                series, times, scores, keys = (np.empty(0, np.int32), np.empty(0, np.int64),
+                                               np.empty(0, np.int32), np.empty(0, np.int64))
+            order = np.lexsort((times, keys, series))
+            series, times, scores, keys = series[order], times[order], scores[order], keys[order]
+            repeat = np.zeros(len(series), dtype=bool)
+            repeat[1:] = ((series[1:] == series[:-1]) & (keys[1:] == keys[:-1])
+                          & ((keys[1:] != 0) | (times[1:] == times[:-1])))
+            series, times, scores, keys = series[~repeat], times[~repeat], scores[~repeat], keys[~repeat]
+            order = np.lexsort((keys, times, series))
+            series, times, scores, keys = series[order], times[order], scores[order], keys[order]
+            bounds = np.searchsorted(series, np.arange(len(self.series) + 1))
+            self._columns = (series, times, scores, keys, bounds)
+        return self._columns
+
+    def compact(self):
+        """Merge every chunk into one"""
+        series, times, scores, keys, _ = self.columns()
+        old_paths = self._chunk_paths()
+        if len(old_paths) <= 1:
+            return
+        number = int(os.path.basename(old_paths[-1])[6:-4]) + 1
+        self._write_chunk(os.path.join(self.directory, f"chunk-{number:06d}.npz"), series, times, scores, keys)
+        for path in old_paths:
+            os.remove(path)
+
+    def range(self, player, kind=PLAYER, start=None, end=None):
+        """(times, scores) of one series within [start, end]"""
+        code = self.series_codes.get((player, kind))
+        if code is None:
+            return np.empty(0, np.int64), np.empty(0, np.int32)
+        _, times, scores, _, bounds = self.columns()
+        times, scores = times[bounds[code]:bounds[code + 1]], scores[bounds[code]:bounds[code + 1]]
+        lo = 0 if start is None else np.searchsorted(times, start, side='left')
+        hi = len(times) if end is None else np.searchsorted(times, end, side='right')
+        return times[lo:hi], scores[lo:hi]
+
+    def downsample(self, player, kind=PLAYER, bucket_seconds=86400, start=None, end=None, how='last'):
+        """One point per time bucket: the bucket's last score or its mean"""
+        times, scores = self.range(player, kind, start, end)
+        if len(times) == 0:
+            return times, scores.astype(np.float64)
+        buckets = times // bucket_seconds
+        first = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+        if how == 'mean':
+            values = np.add.reduceat(scores.astype(np.float64), first) / np.diff(np.r_[first, len(scores)])
+        else:
+            values = scores[np.r_[first[1:] - 1, len(scores) - 1]].astype(np.float64)
+        return buckets[first] * bucket_seconds, values
+
+    def players(self, kind=PLAYER):
+        return [player for player, series_kind in self.series if series_kind == kind]
+
+
+def argparse_args():
+    parser = argparse.ArgumentParser(description='Rank/LP time series of scraped players')
+    commands = parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('build', help='Append the ranks found in history/lobby result files')
+    build.add_argument('inputs', nargs='+', help='.jsonl files or glob patterns')
+    build.add_argument('-o', '--output', default='ranks', help='Store directory')
+    build.add_argument('--compact', action='store_true', help='Merge all chunks into one afterwards')
+    show = commands.add_parser('show', help='Print a player LP trajectory')
+    show.add_argument('store', help='Store directory')
+    show.add_argument('riot_id', help='name#tag')
+    show.add_argument('--days', type=float, default=30, help='How far back to look')
+    show.add_argument('--bucket-hours', type=float, default=24, help='Downsampling bucket size')
+    show.add_argument('--lobby', action='store_true', help='Show the lobby average instead of the player rank')
+    return parser.parse_args()
+
+def main():
+    args = argparse_args()
+    if args.command == 'build':
+        store = RankStore(args.output)
+        for path in sorted({path for pattern in args.inputs for path in glob.glob(pattern)}):
+            # result files keep no scrape time, so relative card times count from the file's mtime
+            now = os.path.getmtime(path)
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        store.add_match(json.loads(line), now=now)
+        store.flush()
+        if args.compact:
+            store.compact()
+        print(f"{len(store.columns()[0])} points in {len(store.series)} series in {args.output}")
+        return
+
+    store = RankStore(args.store)
+    end = time.time()
+    times, scores = store.downsample(args.riot_id, LOBBY if args.lobby else PLAYER,
+                                     int(args.bucket_hours * 3600), start=end - args.days * 86400, end=end)
+    for timestamp, score in zip(times, scores):
+        print(f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(timestamp))}  {score:7.0f}")
+    print(f"{len(times)} points")
+
+if __name__ == "__main__":
+    main()
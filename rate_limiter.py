@@ -0,0 +1,163 @@
+import os
+import json
+import time
+import asyncio
+import threading
+from urllib.parse import urlparse
+
+try:
+    import fcntl
+
+    def _lock_file(f):
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+
+    def _unlock_file(f):
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+except ImportError:  # Windows
+    import msvcrt
+
+    def _lock_file(f):
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+
+    def _unlock_file(f):
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+GLOBAL_KEY = '*'
+
+
+def reserve_tokens(state, rate, capacity, cost, now):
+    """
+    Token bucket with reservations: take `cost` tokens from `state`
+    ([tokens, updated_at]), letting the balance go negative, and return how
+    long the caller has to wait before its tokens are actually available.
+    """
+    tokens, updated_at = state
+    tokens = min(capacity, tokens + (now - updated_at) * rate)
+    tokens -= cost
+    state[0], state[1] = tokens, now
+    return 0.0 if tokens >= 0 else -tokens / rate
+
+
+class MemoryBackend:
+    """Buckets shared by every task and thread of this process."""
+    blocking = False
+
+    def __init__(self):
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def reserve(self, requests, now):
+        with self.lock:
+            wait = 0.0
+            for key, rate, capacity, cost in requests:
+                state = self.buckets.setdefault(key, [capacity, now])
+                wait = max(wait, reserve_tokens(state, rate, capacity, cost, now))
+            return wait
+
+
+class FileLockBackend:
+    """
+    Buckets kept in a small JSON file guarded by an OS file lock, so every
+    process on the box pointing at the same `path` shares one budget.
+    """
+    blocking = True
+
+    def __init__(self, path):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def reserve(self, requests, now):
+        with open(self.path, 'a+', encoding='utf-8') as f:
+            _lock_file(f)
+            try:
+                f.seek(0)
+                raw = f.read()
+                buckets = json.loads(raw) if raw.strip() else {}
+                wait = 0.0
+                for key, rate, capacity, cost in requests:
+                    state = buckets.setdefault(key, [capacity, now])
+                    wait = max(wait, reserve_tokens(state, rate, capacity, cost, now))
+                f.seek(0)
+                f.truncate()
+                f.write(json.dumps(buckets))
+                f.flush()
+            finally:
+                _unlock_file(f)
+        return wait
+
+
+class RateLimiter:
+    """
+    Global + per-host token buckets.
+
+    `await limiter.acquire(url)` before every navigation and click that makes
+    the site do work. `host_limits` maps a host to its own (rate, burst);
+    other hosts use `host_rate`/`host_burst`.
+
+    A crawl only talks to metatft.com, so by default it is held to the host
+    rate: 1 request per second with bursts of 3, whatever the global rate.
+    """
+
+    def __init__(self, global_rate=2.0, global_burst=5, host_rate=1.0, host_burst=3,
+                 host_limits=None, backend=None, clock=time.time):
+        self.global_rate = global_rate
+        self.global_burst = global_burst
+        self.host_rate = host_rate
+        self.host_burst = host_burst
+        self.host_limits = host_limits or {}
+        self.backend = backend or MemoryBackend()
+        # wall clock so several processes sharing a FileLockBackend agree on time
+        self.clock = clock
+        self.waited = 0.0
+        self.acquired = 0
+
+    def set_rate(self, global_rate=None, host_rate=None):
+        if global_rate:
+            self.global_rate = global_rate
+        if host_rate:
+            self.host_rate = host_rate
+
+    def _requests(self, host, cost):
+        requests = [(GLOBAL_KEY, self.global_rate, self.global_burst, cost)]
+        if host:
+            rate, burst = self.host_limits.get(host, (self.host_rate, self.host_burst))
+            requests.append((host, rate, burst, cost))
+        return requests
+
+    async def acquire(self, target=None, cost=1):
+        host = urlparse(target).netloc if target and '://' in target else target
+        requests = self._requests(host, cost)
+        if self.backend.blocking:
+            wait = await asyncio.to_thread(self.backend.reserve, requests, self.clock())
+        else:
+            wait = self.backend.reserve(requests, self.clock())
+        self.acquired += 1
+        if wait > 0:
+            self.waited += wait
+            await asyncio.sleep(wait)
+
+
+_default_limiter = None
+
+def default_rate_limiter():
+    """Process-wide limiter used by every MetaTFT that isn't given one."""
+    global _default_limiter
+    if _default_limiter is None:
+        _default_limiter = RateLimiter()
+    return _default_limiter
+
+def configure_rate_limiter(global_rate=None, host_rate=None, lock_file=None):
+    """
+    Replace the process-wide limiter, e.g. from CLI options or a worker's startup.
+    `host_rate` defaults to `global_rate`: every throttle() also takes a
+    metatft.com host token, so raising only the global rate would change nothing.
+    """
+    global _default_limiter
+    limiter = RateLimiter(backend=FileLockBackend(lock_file) if lock_file else None)
+    limiter.set_rate(global_rate, host_rate or global_rate)
+    _default_limiter = limiter
+    return limiter
@@ -0,0 +1,228 @@
+import time
+import random
+import asyncio
+from collections import deque
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is refused because its circuit breaker is open."""
+
+    def __init__(self, message, retry_after=0.0):
+        super().__init__(message)
+        # seconds until the breaker lets a probe through again
+        self.retry_after = retry_after
+
+
+class RetryBudgetExceeded(Exception):
+    """Raised when a retry is needed but the budget has nothing left."""
+
+
+async def gather_or_cancel(*coroutines):
+    """
+    asyncio.gather that, when one task fails, cancels the others and waits for
+    them before re-raising, so none is still using a page while the caller's
+    cleanup closes the browser pool.
+    """
+    tasks = [asyncio.ensure_future(coroutine) for coroutine in coroutines]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
+class Backoff:
+    """Exponential backoff with full jitter: sleep uniform(0, min(max_delay, base * factor ** attempt))."""
+
+    def __init__(self, base=1.0, factor=2.0, max_delay=30.0, jitter=True):
+        self.base = base
+        self.factor = factor
+        self.max_delay = max_delay
+        self.jitter = jitter
+
+    def delay(self, attempt):
+        ceiling = min(self.max_delay, self.base * self.factor ** attempt)
+        return random.uniform(0, ceiling) if self.jitter else ceiling
+
+
+class RetryBudget:
+    """Number of retries a scope (one player, one run) may still spend."""
+
+    def __init__(self, max_retries):
+        self.max_retries = max_retries
+        self.spent = 0
+
+    @property
+    def remaining(self):
+        return max(0, self.max_retries - self.spent)
+
+    def try_spend(self):
+        if self.spent >= self.max_retries:
+            return False
+        self.spent += 1
+        return True
+
+
+class CircuitBreaker:
+    """
+    Open once the failure rate over the last `window` calls reaches
+    `failure_rate` (after at least `min_calls`), refuse calls for `cooldown`
+    seconds, then let a single probe through (half-open) to decide whether to close.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __init__(self, failure_rate=0.5, window=20, min_calls=5, cooldown=60.0, clock=time.monotonic):
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.cooldown = cooldown
+        self.clock = clock
+        self.results = deque(maxlen=window)
+        self.state = self.CLOSED
+        self.opened_at = None
+        self._probing = False
+
+    def allow(self):
+        if self.state == self.OPEN:
+            if self.clock() - self.opened_at < self.cooldown:
+                return False
+            self.state = self.HALF_OPEN
+            self._probing = False
+        if self.state == self.HALF_OPEN:
+            if self._probing:
+                return False
+            self._probing = True
+        return True
+
+    def release_probe(self):
+        """A probe that ended without a verdict (cancelled): let the next call probe instead"""
+        self._probing = False
+
+    def remaining_cooldown(self):
+        if self.state != self.OPEN:
+            return 0
+        return max(0.0, self.cooldown - (self.clock() - self.opened_at))
+
+    def record_success(self):
+        if self.state == self.HALF_OPEN:
+            self.results.clear()
+            self.state = self.CLOSED
+        self.results.append(True)
+
+    def record_failure(self):
+        self.results.append(False)
+        if self.state == self.HALF_OPEN:
+            self._open()
+            return
+        failures = self.results.count(False)
+        if len(self.results) >= self.min_calls and failures / len(self.results) >= self.failure_rate:
+            self._open()
+
+    def _open(self):
+        self.state = self.OPEN
+        self.opened_at = self.clock()
+        self._probing = False
+
+
+class AdaptiveTimeout:
+    """
+    Timeout that follows observed durations like a TCP retransmission timer:
+    smoothed mean + `k` * smoothed deviation, clamped to [min_ms, max_ms].
+    A timed out attempt doubles the timeout for the next one.
+    """
+
+    def __init__(self, initial_ms=30000, min_ms=5000, max_ms=60000, k=4, alpha=0.125, beta=0.25):
+        self.min_ms = min_ms
+        self.max_ms = max_ms
+        self.k = k
+        self.alpha = alpha
+        self.beta = beta
+        self.mean = None
+        self.deviation = None
+        self.timeout = initial_ms
+
+    def current(self):
+        return int(min(self.max_ms, max(self.min_ms, self.timeout)))
+
+    def observe(self, duration_ms):
+        if self.mean is None:
+            self.mean = duration_ms
+            self.deviation = duration_ms / 2
+        else:
+            self.deviation = (1 - self.beta) * self.deviation + self.beta * abs(self.mean - duration_ms)
+            self.mean = (1 - self.alpha) * self.mean + self.alpha * duration_ms
+        self.timeout = self.mean + self.k * self.deviation
+
+    def expired(self):
+        self.timeout = min(self.max_ms, self.current() * 2)
+
+
+class Resilience:
+    """
+    Shared retry policy for a crawl: one Backoff, a run-wide RetryBudget, a
+    CircuitBreaker per region and an AdaptiveTimeout per named operation.
+    """
+
+    def __init__(self, attempts=3, backoff=None, run_retries=200, player_retries=6,
+                 breaker_factory=CircuitBreaker, timeout_factory=AdaptiveTimeout):
+        self.attempts = attempts
+        self.backoff = backoff or Backoff()
+        self.run_budget = RetryBudget(run_retries)
+        self.player_retries = player_retries
+        self.breaker_factory = breaker_factory
+        self.timeout_factory = timeout_factory
+        self.breakers = {}
+        self.timeouts = {}
+
+    def breaker(self, region):
+        if region not in self.breakers:
+            self.breakers[region] = self.breaker_factory()
+        return self.breakers[region]
+
+    def timeout(self, name):
+        if name not in self.timeouts:
+            self.timeouts[name] = self.timeout_factory()
+        return self.timeouts[name]
+
+    def player_budget(self):
+        return RetryBudget(self.player_retries)
+
+    async def call(self, name, operation, region=None, budget=None):
+        """
+        Await `operation(timeout_ms)` until it succeeds, retrying with backoff.
+
+        Gives up after `attempts` tries, when the player or run budget is spent,
+        or when the region's breaker is open.
+        """
+        breaker = self.breaker(region)
+        timeout = self.timeout(name)
+        attempt = 0
+        while True:
+            if not breaker.allow():
+                raise CircuitOpenError(f"region {region} paused for {breaker.remaining_cooldown():.0f}s",
+                                       retry_after=breaker.remaining_cooldown())
+            started = time.monotonic()
+            try:
+                result = await operation(timeout.current())
+            except Exception as e:
+                breaker.record_failure()
+                if 'timeout' in type(e).__name__.lower() or 'timeout' in str(e).lower():
+                    timeout.expired()
+                attempt += 1
+                if attempt >= self.attempts:
+                    raise
+                if (budget and not budget.try_spend()) or not self.run_budget.try_spend():
+                    raise RetryBudgetExceeded(f"{name}: retry budget exhausted") from e
+                await asyncio.sleep(self.backoff.delay(attempt - 1))
+                continue
+            except BaseException:
+                # cancelled mid-call: no outcome to record, but a half-open probe must not stay claimed
+                breaker.release_probe()
+                raise
+            timeout.observe((time.monotonic() - started) * 1000)
+            breaker.record_success()
+            return result
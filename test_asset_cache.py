@@ -0,0 +1,93 @@
+import os
+import pytest
+from unittest.mock import MagicMock
+from bs4 import BeautifulSoup
+from asset_cache import AssetCache, normalize_asset_url, collect_asset_urls
+
+# test_asset_cache.py
+
+RAW = 'https://cdn.metatft.com/file/metatft/items/TFT_Item_InfinityEdge.png'
+RESIZED = 'https://cdn.metatft.com/cdn-cgi/image/width=32,height=32,format=auto/file/metatft/items/TFT_Item_InfinityEdge.png'
+TACTICIAN = 'https://cdn.metatft.com/file/metatft/tacticians/Pengu.png'
+
+
+def fake_fetcher(contents):
+    fetcher = MagicMock()
+    fetcher.get_content.side_effect = lambda url: contents.get(url)
+    return fetcher
+
+def test_normalize_asset_url_drops_resizing():
+    assert normalize_asset_url(RESIZED) == RAW
+    assert normalize_asset_url(f"https://cdn.metatft.com/cdn-cgi/image/width=48/{RAW}") == RAW
+    assert normalize_asset_url('/img/ranks/gold.png') == 'https://www.metatft.com/img/ranks/gold.png'
+
+def test_collect_asset_urls_walks_match_data():
+    match = {'summary': {'player_tactician_src': TACTICIAN, 'stage': '5-1'},
+             'players': [{'traits': [{'style': f'mask-image: url("{RESIZED}")'}]}]}
+    assert collect_asset_urls(match) == {TACTICIAN, RESIZED}
+
+@pytest.mark.asyncio
+async def test_variants_are_fetched_once_and_share_a_file(tmp_path):
+    fetcher = fake_fetcher({RAW: b'sword', TACTICIAN: b'pengu'})
+    cache = AssetCache(str(tmp_path), fetcher=fetcher)
+    soup = BeautifulSoup(f'<img src="{RESIZED}"><div style="mask-image: url({RAW})"></div>', 'html.parser')
+    cache.collect_soup(soup)
+    cache.collect({'player_tactician_src': TACTICIAN})
+
+    assert await cache.fetch_pending() == 2
+    assert fetcher.get_content.call_count == 2
+    assert cache.path(RAW) == cache.path(RESIZED)
+    with open(cache.path(RESIZED), 'rb') as f:
+        assert f.read() == b'sword'
+    assert cache.rewrite({'src': TACTICIAN}) == {'src': cache.path(TACTICIAN)}
+
+@pytest.mark.asyncio
+async def test_cached_urls_need_no_network(tmp_path):
+    first = AssetCache(str(tmp_path), fetcher=fake_fetcher({RAW: b'sword'}))
+    first.add_url(RAW)
+    await first.fetch_pending()
+
+    fetcher = fake_fetcher({})
+    cache = AssetCache(str(tmp_path), fetcher=fetcher)
+    cache.add_url(RESIZED)
+    assert await cache.fetch_pending() == 0
+    fetcher.get_content.assert_not_called()
+    assert os.path.exists(cache.path(RESIZED))
+
+@pytest.mark.asyncio
+async def test_failed_downloads_stay_uncached(tmp_path):
+    cache = AssetCache(str(tmp_path), fetcher=fake_fetcher({}))
+    cache.add_url(TACTICIAN)
+    assert await cache.fetch_pending() == 0
+    assert cache.failed == 1
+    assert cache.path(TACTICIAN) is None
+
+@pytest.mark.asyncio
+async def test_identical_content_from_many_urls_is_stored_once(tmp_path):
+    urls = [f"https://cdn.metatft.com/file/metatft/items/copy{i}.png" for i in range(16)]
+    cache = AssetCache(str(tmp_path), concurrency=16, fetcher=fake_fetcher({url: b'same' for url in urls}))
+    for url in urls:
+        cache.add_url(url)
+
+    assert await cache.fetch_pending() == 16
+    assert len({cache.path(url) for url in urls}) == 1
+    blob_dir = os.path.dirname(cache.path(urls[0]))
+    assert os.listdir(blob_dir) == [os.path.basename(cache.path(urls[0]))]
+
+@pytest.mark.asyncio
+async def test_a_failed_write_keeps_the_rest_of_the_batch(tmp_path):
+    cache = AssetCache(str(tmp_path), fetcher=fake_fetcher({RAW: b'sword', TACTICIAN: b'pengu'}))
+    store = cache._store
+
+    def flaky_store(url, content):
+        if url == TACTICIAN:
+            raise OSError('disk full')
+        return store(url, content)
+
+    cache._store = flaky_store
+    cache.add_url(RAW)
+    cache.add_url(TACTICIAN)
+
+    assert await cache.fetch_pending() == 1
+    assert cache.path(RAW) is not None
+    assert TACTICIAN in cache.pending
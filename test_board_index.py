@@ -0,0 +1,33 @@
+from board_index import BoardIndex, parse_board
+
+# test_board_index.py
+
+
+def unit(name, tier='1', items=()):
+    return {'name': name, 'tier': tier, 'items': list(items)}
+
+def make_index():
+    index = BoardIndex()
+    index.add('m1:A', [unit('Jinx', '3', ['Infinity Edge']), unit('Vi', '2'), unit('Ekko')])
+    index.add('m1:B', [unit('Jinx', '2'), unit('Vi', '2'), unit('Ekko')])
+    index.add('m2:C', [unit('Ahri', '2', ['Blue Buff']), unit('Sona')])
+    return index
+
+def test_query_ranks_closest_board_first():
+    index = make_index()
+    results = index.query(parse_board(["Jinx:3:Infinity Edge", "Vi:2", "Ekko"]), k=3)
+    assert [board_id for board_id, _ in results] == ['m1:A', 'm1:B']
+    assert results[0][1] > 0.999
+
+def test_incremental_add_and_roundtrip(tmp_path):
+    index = make_index()
+    path = str(tmp_path / 'boards.npz')
+    index.save(path)
+    loaded = BoardIndex.load(path)
+    loaded.add_match({'match_id': 'm3', 'players': [{'name': 'D', 'units': [unit('Ahri', '2', ['Blue Buff']), unit('Sona', '2')]}]})
+    boards = len(loaded)
+    # already indexed boards are not added twice, add() hands back their existing row
+    assert loaded.add('m1:A', [unit('Jinx')]) == loaded.rows['m1:A']
+    assert len(loaded) == boards == 4
+    assert len(loaded.norms) == boards
+    assert loaded.query([unit('Ahri', '2', ['Blue Buff']), unit('Sona', '2')], k=1)[0][0] == 'm3:D'
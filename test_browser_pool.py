@@ -0,0 +1,102 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from browser_pool import BrowserPool
+
+# test_browser_pool.py
+
+
+def make_playwright():
+    """Fake async_playwright() whose chromium.launch returns a fresh browser each call."""
+    browsers = []
+
+    def new_browser():
+        browser = MagicMock()
+        browser.is_connected.return_value = True
+        browser.close = AsyncMock()
+        context = MagicMock()
+        context.close = AsyncMock()
+        page = MagicMock()
+        page.close = AsyncMock()
+        page.evaluate = AsyncMock(return_value=0)
+        context.new_page = AsyncMock(return_value=page)
+        browser.new_context = AsyncMock(return_value=context)
+        browsers.append(browser)
+        return browser
+
+    chromium = MagicMock()
+    chromium.launch = AsyncMock(side_effect=lambda **kwargs: new_browser())
+
+    class DummyAsyncPlaywright:
+        async def __aenter__(self):
+            self.chromium = chromium
+            return self
+        async def __aexit__(self, exc_type, exc, tb):
+            pass
+
+    return DummyAsyncPlaywright, browsers
+
+@pytest.mark.asyncio
+async def test_pool_reuses_warm_browser_and_recycles_context():
+    factory, browsers = make_playwright()
+    async with BrowserPool(size=1, max_pages=2, playwright_factory=factory) as pool:
+        for _ in range(3):
+            async with pool.page() as page:
+                assert page is not None
+
+        # one launch, context recycled once after two pages
+        assert len(browsers) == 1
+        assert browsers[0].new_context.await_count == 2
+        assert pool.recycled == 1
+
+@pytest.mark.asyncio
+async def test_pool_replaces_crashed_browser():
+    factory, browsers = make_playwright()
+    async with BrowserPool(size=1, playwright_factory=factory) as pool:
+        async with pool.page():
+            browsers[0].is_connected.return_value = False
+
+        async with pool.page():
+            pass
+
+        assert len(browsers) == 2
+        assert pool.replaced == 1
+        browsers[0].close.assert_awaited()
+
+@pytest.mark.asyncio
+async def test_failed_relaunch_keeps_the_slot_in_the_pool():
+    factory, browsers = make_playwright()
+    async with BrowserPool(size=1, playwright_factory=factory) as pool:
+        async with pool.page():
+            browsers[0].is_connected.return_value = False
+            pool._launch = AsyncMock(side_effect=RuntimeError('launch failed'))
+
+        # the slot was requeued marked crashed, so the next borrower relaunches it
+        del pool._launch
+        async with pool.page():
+            pass
+        assert pool.replaced == 1
+        assert len(browsers) == 2
+
+@pytest.mark.asyncio
+async def test_failed_start_can_be_retried():
+    factory, browsers = make_playwright()
+    chromium = (await factory().__aenter__()).chromium
+    launch = chromium.launch.side_effect
+
+    def fail_second_launch(**kwargs):
+        if chromium.launch.call_count == 2:
+            raise RuntimeError('launch failed')
+        return launch(**kwargs)
+    chromium.launch.side_effect = fail_second_launch
+
+    pool = BrowserPool(size=2, playwright_factory=factory)
+    with pytest.raises(RuntimeError):
+        await pool.start()
+    # the browser launched before the failure is closed and the pool stays unstarted
+    browsers[0].close.assert_awaited()
+    assert pool._playwright is None and pool._slots == []
+
+    async with pool.page() as page:
+        assert page is not None
+    assert len(pool._slots) == 2
+    await pool.close()
@@ -0,0 +1,88 @@
+import pytest
+from config import Config, PROFILES, load_config, make_resilience
+from metatft_getdata import MetaTFT
+
+# test_config.py
+
+
+def write(tmp_path, text):
+    path = tmp_path / 'crawl.toml'
+    path.write_text(text, encoding='utf-8')
+    return str(path)
+
+def test_defaults_match_the_previous_constants():
+    config = load_config()
+    assert config.name == 'default'
+    assert (config.waits.navigation_ms, config.waits.settle_ms, config.waits.expand_ms) == (30000, 500, 1000)
+    assert config.retries.attempts == 3
+    assert config.browser.viewport() == {'width': 1920, 'height': 1080}
+    assert config.crawl.base_url == "https://www.metatft.com/player"
+
+def test_builtin_profiles_load():
+    for name in PROFILES:
+        assert load_config(profile=name).name == name
+    fast = load_config(profile='fast')
+    assert fast.crawl.concurrency == 4 and fast.crawl.tabs == ['players'] and not fast.output.clipboard
+    assert load_config(profile='debug').browser.headless is False
+
+def test_file_overrides_and_custom_profiles(tmp_path):
+    path = write(tmp_path, """
+profile = "polite"
+[crawl]
+region = "euw"
+[profiles.nightly]
+base = "fast"
+crawl = { concurrency = 6, tabs = "players,timeline" }
+waits = { settle_ms = 300 }
+""")
+    polite = load_config(path)
+    assert polite.name == 'polite' and polite.crawl.region == 'euw' and polite.crawl.max_rps == 0.5
+
+    nightly = load_config(path, 'nightly')
+    assert nightly.crawl.region == 'euw'
+    assert nightly.crawl.concurrency == 6
+    assert nightly.crawl.tabs == ['players', 'timeline']
+    assert nightly.waits.settle_ms == 300 and nightly.waits.expand_ms == 500
+
+@pytest.mark.parametrize('text', [
+    '[crawl]\nconcurrency = "many"',
+    '[crawl]\nthreads = 4',
+    '[network]\ntimeout = 1',
+    '[browser]\nheadless = 1',
+    '[crawl]\nfields = ["timelines"]',
+    '[crawl]\ntabs = "players,shop"',
+    '[crawl]\nmodes = ""',
+    '[crawl]\nmodes = []',
+    '[crawl]\nmodes = ["ranked", "arena"]',
+])
+def test_bad_settings_are_rejected(tmp_path, text):
+    with pytest.raises(ValueError):
+        load_config(write(tmp_path, text))
+
+def test_custom_default_profile_starts_from_default(tmp_path):
+    path = write(tmp_path, """
+profile = "nightly"
+[profiles.nightly]
+crawl = { concurrency = 6 }
+""")
+    nightly = load_config(path)
+    assert nightly.name == 'nightly' and nightly.crawl.concurrency == 6
+    assert nightly.waits.settle_ms == 500
+
+def test_fast_profile_raises_the_rate_limit():
+    fast = load_config(profile='fast')
+    assert fast.crawl.max_rps >= fast.crawl.concurrency
+
+def test_unknown_profile_is_rejected():
+    with pytest.raises(ValueError):
+        load_config(profile='turbo')
+
+def test_metatft_from_config(tmp_path):
+    config = load_config(profile='polite')
+    config.crawl.http = False
+    config.crawl.base_url = 'https://example.com/player'
+    tft = MetaTFT.from_config(config, queue_mode=None)
+    assert tft.base_url == 'https://example.com/player'
+    assert tft.http_fetcher is None and tft.queue_mode is None
+    assert tft.resilience.attempts == 5
+    assert make_resilience(Config()).timeout('goto').current() == 30000
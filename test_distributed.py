@@ -0,0 +1,195 @@
+import json
+import time
+import socket
+import threading
+import pytest
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock
+from distributed import SqliteQueue, SocketQueue, QueueServer, Coordinator, Worker, parse_address, PLAYER, MATCHES
+
+# test_distributed.py
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+    def __call__(self):
+        return self.now
+
+class FakePool:
+    @asynccontextmanager
+    async def page(self):
+        yield MagicMock(query_selector=AsyncMock(return_value=object()))
+
+def test_expired_lease_is_reassigned_and_stale_result_rejected(tmp_path):
+    clock = FakeClock()
+    queue = SqliteQueue(str(tmp_path / "queue.sqlite"), clock=clock)
+    assert queue.put(PLAYER, "tw:a#1", {"riot_id": "a#1"})
+    assert not queue.put(PLAYER, "tw:a#1", {"riot_id": "a#1"})
+
+    job = queue.lease("dead-worker", lease_seconds=60)
+    assert queue.lease("other", lease_seconds=60) is None
+
+    clock.now += 61
+    again = queue.lease("other", lease_seconds=60)
+    assert again["job_id"] == job["job_id"]
+    assert again["attempts"] == 2
+    assert not queue.heartbeat(job["job_id"], "dead-worker")
+    assert not queue.complete(job["job_id"], "dead-worker", {"match_ids": []})
+    assert queue.complete(job["job_id"], "other", {"match_ids": ["TW2_1"]})
+    assert queue.collect()[0]["result"] == {"match_ids": ["TW2_1"]}
+    assert queue.stats()["done"] == 1
+
+def test_fail_retries_until_max_attempts(tmp_path):
+    queue = SqliteQueue(str(tmp_path / "queue.sqlite"), max_attempts=2)
+    queue.put(MATCHES, "tw:a#1", {"match_ids": ["TW2_1"]})
+    for _ in range(2):
+        job = queue.lease("w")
+        queue.fail(job["job_id"], "w", "boom")
+    assert queue.lease("w") is None
+    assert queue.stats()["failed"] == 1
+
+def test_collected_jobs_come_back_until_acked(tmp_path):
+    queue = SqliteQueue(str(tmp_path / "queue.sqlite"))
+    coordinator = Coordinator(queue, str(tmp_path / "results.jsonl"))
+    queue.put(PLAYER, "tw:a#1", {"riot_id": "a#1", "region": "tw"})
+    job = queue.lease("w")
+    queue.complete(job["job_id"], "w", {"match_ids": ["TW2_1"]})
+
+    # a coordinator that crashed before handling the job sees it again
+    assert [row["job_id"] for row in queue.collect()] == [job["job_id"]]
+    coordinator.handle = MagicMock(side_effect=RuntimeError("crash"))
+    with pytest.raises(RuntimeError):
+        coordinator.step()
+    assert [row["job_id"] for row in queue.collect()] == [job["job_id"]]
+
+    del coordinator.handle
+    coordinator.step()
+    assert queue.collect() == []
+    assert queue.stats()["uncollected"] == 0
+
+def test_coordinator_batches_each_players_new_matches(tmp_path):
+    queue = SqliteQueue(str(tmp_path / "queue.sqlite"))
+    output = tmp_path / "results.jsonl"
+    coordinator = Coordinator(queue, str(output), discover=True)
+    coordinator.seed([("a#1", "tw"), ("b#2", "tw")])
+    for match_ids in (["TW2_1", "TW2_2"], ["TW2_1"]):
+        job = queue.lease("w")
+        queue.complete(job["job_id"], "w", {"match_ids": match_ids})
+    assert coordinator.step()
+    batch = queue.lease("w")
+    assert batch["kind"] == MATCHES and batch["payload"]["match_ids"] == ["TW2_1", "TW2_2"]
+    # b#2 only listed a match that is already queued
+    assert queue.lease("w") is None
+
+    queue.complete(batch["job_id"], "w", {"matches": [{"match_id": "TW2_1", "players": [{"name": "c#3", "tag": "#3"}]}],
+                                          "failed": ["TW2_2"]})
+    coordinator.step()
+    assert json.loads(output.read_text())["match_id"] == "TW2_1"
+    assert (coordinator.matches_saved, coordinator.matches_failed) == (1, 1)
+    assert queue.lease("w")["payload"]["riot_id"] == "c#3"
+
+def test_socket_queue_round_trip(tmp_path):
+    server = QueueServer(SqliteQueue(str(tmp_path / "queue.sqlite")), ("127.0.0.1", 0), token="secret")
+    server.start()
+    client = SocketQueue(server.server_address, token="secret")
+    intruder = SocketQueue(server.server_address, token="guess")
+    try:
+        assert client.put_batch(MATCHES, "tw:a#1", {"match_ids": ["TW2_1"]}, "match_ids")
+        job = client.lease("remote")
+        assert job["key"] == "tw:a#1"
+        assert client.heartbeat(job["job_id"], "remote")
+        assert client.complete(job["job_id"], "remote", {"matches": []})
+        assert client.stats()["done"] == 1
+        with pytest.raises(RuntimeError, match="unauthorized"):
+            intruder.stats()
+    finally:
+        client.close()
+        intruder.close()
+        server.shutdown()
+        server.server_close()
+
+def one_shot_server(answer):
+    """Server that reads one request per connection, answers it or not, then hangs up"""
+    listener = socket.create_server(("127.0.0.1", 0))
+    requests = []
+
+    def serve():
+        while True:
+            try:
+                connection, _ = listener.accept()
+            except OSError:
+                return
+            with connection, connection.makefile("rwb") as f:
+                requests.append(json.loads(f.readline()))
+                if answer:
+                    f.write(b'{"result": 1}\n')
+                    f.flush()
+    threading.Thread(target=serve, daemon=True).start()
+    return listener, requests
+
+def test_socket_queue_never_resends_a_written_request():
+    listener, requests = one_shot_server(answer=False)
+    client = SocketQueue(listener.getsockname(), token="secret")
+    try:
+        with pytest.raises(ConnectionError):
+            client.lease("remote")
+        assert [request["method"] for request in requests] == ["lease"]
+    finally:
+        client.close()
+        listener.close()
+
+def test_socket_queue_reconnects_after_the_server_hung_up():
+    listener, requests = one_shot_server(answer=True)
+    client = SocketQueue(listener.getsockname(), token="secret")
+    try:
+        assert client.stats() == 1
+        # the server closed that connection; the next call notices before writing
+        for _ in range(100):
+            if client._server_closed():
+                break
+            time.sleep(0.01)
+        assert client.stats() == 1
+        assert len(requests) == 2
+    finally:
+        client.close()
+        listener.close()
+
+def test_queue_server_needs_a_token_and_binds_locally(tmp_path):
+    with pytest.raises(ValueError):
+        QueueServer(SqliteQueue(str(tmp_path / "queue.sqlite")), ("127.0.0.1", 0))
+    assert parse_address("8765") == ("127.0.0.1", 8765)
+    assert parse_address("0.0.0.0:9000") == ("0.0.0.0", 9000)
+
+@pytest.mark.asyncio
+async def test_worker_runs_leased_jobs(tmp_path):
+    queue = SqliteQueue(str(tmp_path / "queue.sqlite"))
+    queue.put(MATCHES, "tw:a#1", {"match_ids": ["TW2_1", "TW2_2"], "riot_id": "a#1", "region": "tw"})
+    tft = MagicMock(browser_pool=FakePool())
+    tft.asset_cache = MagicMock(pending={'https://cdn.example.com/a.png': {'https://cdn.example.com/a.png'}},
+                                fetch_pending=AsyncMock(return_value=1))
+    tft.open_profile = AsyncMock()
+    tft.collapse_match = AsyncMock()
+    tft.get_match_details = AsyncMock(side_effect=lambda page, match_id: {"match_id": match_id})
+
+    worker = Worker(tft, queue, worker_id="w", exit_when_idle=True)
+    await worker.run()
+
+    assert worker.jobs_done == 1
+    tft.asset_cache.fetch_pending.assert_awaited_once()
+    # one profile load for the whole batch
+    tft.open_profile.assert_awaited_once()
+    assert queue.collect()[0]["result"] == {"matches": [{"match_id": "TW2_1"}, {"match_id": "TW2_2"}], "failed": []}
+
+@pytest.mark.asyncio
+async def test_http_match_list_only_when_it_covers_the_queue(tmp_path):
+    tft = MagicMock(http_match_ids=AsyncMock(return_value=["TW2_1", "TW2_2"]))
+    worker = Worker(tft, SqliteQueue(str(tmp_path / "queue.sqlite")), worker_id="w")
+    payload = {"riot_id": "a#1", "region": "tw", "max_matches": 2}
+
+    tft.http_lists_queue.return_value = False
+    assert await worker.run_player_http(payload) is None
+    tft.http_match_ids.assert_not_called()
+
+    tft.http_lists_queue.return_value = True
+    assert await worker.run_player_http(payload) == {"match_ids": ["TW2_1", "TW2_2"]}
@@ -0,0 +1,89 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from history import Checkpoint, HistoryCrawler, Progress, parse_player
+
+# test_history.py
+
+
+def test_parse_player_keeps_spaces_in_name():
+    assert parse_player("Some Name#1234,NA") == ("Some Name#1234", "na")
+    assert parse_player("Some Name#1234", "tw") == ("Some Name#1234", "tw")
+
+def test_checkpoint_resumes_pending_matches(tmp_path):
+    checkpoint = Checkpoint(str(tmp_path), "TestName#1234", "tw")
+    checkpoint.add_match_ids(["TW2_1", "TW2_2", "TW2_3"])
+    checkpoint.mark_done("TW2_1", {"match_id": "TW2_1"})
+
+    resumed = Checkpoint(str(tmp_path), "TestName#1234", "tw")
+    assert resumed.pending() == ["TW2_2", "TW2_3"]
+    assert resumed.add_match_ids(["TW2_3", "TW2_4"]) == ["TW2_4"]
+
+@pytest.mark.asyncio
+async def test_crawl_player_skips_done_matches(tmp_path):
+    checkpoint = Checkpoint(str(tmp_path), "TestName#1234", "tw")
+    checkpoint.add_match_ids(["TW2_1", "TW2_2"])
+    checkpoint.exhausted = True
+    checkpoint.mark_done("TW2_1", {"match_id": "TW2_1"})
+
+    tft = MagicMock()
+    tft.open_profile = AsyncMock()
+    tft.list_match_ids = AsyncMock(return_value=["TW2_2", "TW2_1"])
+    tft.collapse_match = AsyncMock()
+    tft.get_match_details = AsyncMock(side_effect=lambda page, match_id: {"match_id": match_id})
+    page = MagicMock(query_selector=AsyncMock(return_value=object()))
+
+    crawler = HistoryCrawler(tft, checkpoint_dir=str(tmp_path))
+    crawler.progress = Progress(1)
+    await crawler.crawl_player(page, "TestName#1234", "tw")
+
+    tft.get_match_details.assert_awaited_once_with(page, "TW2_2")
+    assert Checkpoint(str(tmp_path), "TestName#1234", "tw").pending() == []
+
+@pytest.mark.asyncio
+async def test_summary_only_never_expands_matches(tmp_path):
+    checkpoint = Checkpoint(str(tmp_path), "TestName#1234", "tw")
+    checkpoint.add_match_ids(["TW2_1", "TW2_2"])
+    checkpoint.exhausted = True
+    checkpoint.save()
+
+    tft = MagicMock()
+    tft.open_profile = AsyncMock()
+    tft.list_match_ids = AsyncMock(return_value=["TW2_1"])
+    tft.get_match_details = AsyncMock()
+    tft.list_match_summaries = AsyncMock(side_effect=[
+        [{"match_id": "TW2_1", "player_placement": "3"}],
+        [{"match_id": "TW2_1", "player_placement": "3"}, {"match_id": "TW2_2", "player_placement": "7"}],
+    ])
+    tft.load_more_matches = AsyncMock(return_value=True)
+
+    crawler = HistoryCrawler(tft, checkpoint_dir=str(tmp_path), summary_only=True)
+    crawler.progress = Progress(1)
+    await crawler.crawl_player(MagicMock(), "TestName#1234", "tw")
+
+    tft.get_match_details.assert_not_awaited()
+    assert Checkpoint(str(tmp_path), "TestName#1234", "tw").pending() == []
+    assert crawler.progress.matches_done == 2
+
+@pytest.mark.asyncio
+async def test_exhausted_history_picks_up_new_matches(tmp_path):
+    checkpoint = Checkpoint(str(tmp_path), "TestName#1234", "tw")
+    checkpoint.add_match_ids(["TW2_2", "TW2_1"])
+    checkpoint.exhausted = True
+    checkpoint.mark_done("TW2_2", {"match_id": "TW2_2"})
+    checkpoint.mark_done("TW2_1", {"match_id": "TW2_1"})
+
+    tft = MagicMock()
+    tft.open_profile = AsyncMock()
+    tft.list_match_ids = AsyncMock(side_effect=[["TW2_4", "TW2_3"], ["TW2_4", "TW2_3", "TW2_2", "TW2_1"]])
+    tft.load_more_matches = AsyncMock(return_value=True)
+    tft.collapse_match = AsyncMock()
+    tft.get_match_details = AsyncMock(side_effect=lambda page, match_id: {"match_id": match_id})
+    page = MagicMock(query_selector=AsyncMock(return_value=object()))
+
+    crawler = HistoryCrawler(tft, checkpoint_dir=str(tmp_path))
+    crawler.progress = Progress(1)
+    await crawler.crawl_player(page, "TestName#1234", "tw")
+
+    assert [call.args[1] for call in tft.get_match_details.await_args_list] == ["TW2_4", "TW2_3"]
+    resumed = Checkpoint(str(tmp_path), "TestName#1234", "tw")
+    assert resumed.match_ids == ["TW2_4", "TW2_3", "TW2_2", "TW2_1"] and resumed.pending() == []
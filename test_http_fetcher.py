@@ -0,0 +1,40 @@
+import pytest
+from unittest.mock import MagicMock
+from http_fetcher import HttpFetcher, match_ids_from_html
+from metatft_getdata import MetaTFT
+
+# test_http_fetcher.py
+
+
+class FakeResponse:
+    def __init__(self, status_code, text):
+        self.status_code = status_code
+        self.text = text
+        self.content = text.encode('utf-8')
+
+def test_match_ids_from_html_keeps_page_order():
+    html = '<div class="PlayerGame" id="TW2_222222222"></div>{"matches":["TW2_111111111","TW2_222222222"]}'
+    assert match_ids_from_html(html) == ['TW2_222222222', 'TW2_111111111']
+    assert match_ids_from_html('<div id="root"></div>') == []
+
+def test_fetcher_reuses_one_client_and_counts_bytes():
+    client = MagicMock()
+    client.get.side_effect = [FakeResponse(200, 'EUW1_1234567'), FakeResponse(404, 'missing')]
+    fetcher = HttpFetcher(client=client)
+
+    assert fetcher.get('https://example.com/a') == 'EUW1_1234567'
+    assert fetcher.get('https://example.com/b') is None
+    assert fetcher.requests_sent == 2
+    assert fetcher.failures == 1
+    assert fetcher.bytes_received == len('EUW1_1234567') + len('missing')
+
+@pytest.mark.asyncio
+async def test_http_match_ids_falls_back_when_page_needs_js():
+    client = MagicMock()
+    client.get.return_value = FakeResponse(200, '<div id="root"></div>')
+    tft = MetaTFT(http_fetcher=HttpFetcher(client=client))
+    assert await tft.http_match_ids('TestName#1234', 'tw') is None
+
+    client.get.return_value = FakeResponse(200, '<div id="TW2_123456789" class="PlayerGame"></div>')
+    assert await tft.http_match_ids('TestName#1234', 'tw') == ['TW2_123456789']
+    assert client.get.call_args[0][0] == 'https://www.metatft.com/player/tw/TestName-1234'
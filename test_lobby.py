@@ -0,0 +1,108 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from resilience import CircuitOpenError
+from validation import SelectorDriftError
+from lobby import Frontier, LobbyCrawler, rank_priority, riot_id_from_player
+
+# test_lobby.py
+
+
+def test_riot_id_from_player_strips_tagline_from_name():
+    assert riot_id_from_player({'name': 'TestName#TW2', 'tag': '#TW2'}) == 'TestName#TW2'
+    assert riot_id_from_player({'name': 'TestName', 'tag': ''}) is None
+
+def test_frontier_pops_strongest_lobby_first(tmp_path):
+    frontier = Frontier(str(tmp_path / 'frontier.sqlite'))
+    frontier.push('Gold#1', 'tw', rank_priority({'tier': 'gold', 'division': 'I'}))
+    frontier.push('Master#1', 'tw', rank_priority({'tier': 'master', 'division': ''}))
+    frontier.push('Emerald#1', 'tw', rank_priority({'tier': 'emerald', 'division': 'IV'}))
+    assert [frontier.pop()[0] for _ in range(3)] == ['Master#1', 'Emerald#1', 'Gold#1']
+    assert frontier.pop() is None
+
+def test_frontier_claims_each_match_once_across_runs(tmp_path):
+    path = str(tmp_path / 'frontier.sqlite')
+    frontier = Frontier(path)
+    assert frontier.claim_match('TW2_1', 'tw', 'A#1')
+    assert not frontier.claim_match('TW2_1', 'tw', 'B#1')
+    frontier.save_match('TW2_1', {'match_id': 'TW2_1'})
+    # an unfinished claim from a crashed run is dropped on restart
+    assert frontier.claim_match('TW2_2', 'tw', 'A#1')
+    frontier.close()
+
+    frontier = Frontier(path)
+    assert not frontier.claim_match('TW2_1', 'tw', 'C#1')
+    assert frontier.claim_match('TW2_2', 'tw', 'C#1')
+
+def test_discover_queues_lobby_members(tmp_path):
+    frontier = Frontier(str(tmp_path / 'frontier.sqlite'))
+    crawler = LobbyCrawler(tft=None, frontier=frontier, max_depth=2)
+    match_data = {
+        'avg_opponent_rank': {'tier': 'diamond', 'division': 'II'},
+        'players': [{'name': 'A#TW2', 'tag': '#TW2'}, {'name': 'B', 'tag': ''}],
+    }
+    crawler.discover(match_data, 'tw', depth=0)
+    assert frontier.pop() == ('A#TW2', 'tw', 1)
+    crawler.discover(match_data, 'tw', depth=2)
+    assert frontier.pop() is None
+
+def test_deferred_player_waits_for_its_time(tmp_path):
+    frontier = Frontier(str(tmp_path / 'frontier.sqlite'))
+    frontier.push('A#1', 'tw', 10)
+    frontier.push('B#1', 'tw', 1)
+    assert frontier.pop()[0] == 'A#1'
+    frontier.defer('A#1', 'tw', 60)
+    assert frontier.pop()[0] == 'B#1'
+    assert frontier.pop() is None
+    assert frontier.pending_count() == 1
+    frontier.defer('A#1', 'tw', 0)
+    assert frontier.pop()[0] == 'A#1'
+
+@pytest.mark.asyncio
+async def test_open_circuit_defers_without_counting(tmp_path):
+    frontier = Frontier(str(tmp_path / 'frontier.sqlite'))
+    frontier.push('A#1', 'tw', 10)
+    tft = MagicMock(http_match_ids=AsyncMock(return_value=None))
+    crawler = LobbyCrawler(tft, frontier, max_players=1)
+    crawler.crawl_player = AsyncMock(side_effect=CircuitOpenError('region tw paused for 30s', retry_after=30))
+
+    pool = MagicMock()
+    pool.page.return_value.__aenter__ = AsyncMock()
+    pool.page.return_value.__aexit__ = AsyncMock(return_value=False)
+    worker = asyncio.create_task(crawler._worker(pool))
+    await asyncio.sleep(0.1)
+    worker.cancel()
+
+    assert crawler.crawl_player.await_count == 1
+    assert crawler.players_crawled == 0
+    assert frontier.pop() is None and frontier.pending_count() == 1
+
+@pytest.mark.asyncio
+async def test_drift_halt_cancels_other_workers_before_closing_the_pool(tmp_path):
+    frontier = Frontier(str(tmp_path / 'frontier.sqlite'))
+    frontier.push('Slow#1', 'tw', 20)
+    frontier.push('Drift#1', 'tw', 10)
+    tft = MagicMock(browser_pool=None, http_match_ids=AsyncMock(return_value=None))
+    pool = MagicMock(close=AsyncMock())
+    pool.page.return_value.__aenter__ = AsyncMock()
+    pool.page.return_value.__aexit__ = AsyncMock(return_value=False)
+    tft.new_browser_pool.return_value = pool
+    crawler = LobbyCrawler(tft, frontier, concurrency=2)
+    events = []
+
+    async def crawl_player(page, riot_id, region, depth):
+        if riot_id == 'Drift#1':
+            raise SelectorDriftError('players.units collapsed')
+        try:
+            await asyncio.sleep(10)
+        finally:
+            events.append(('cancelled', pool.close.await_count))
+    crawler.crawl_player = crawl_player
+
+    with pytest.raises(SelectorDriftError):
+        await crawler.crawl([])
+
+    # the slow player was stopped before the pool closed and goes back to the queue
+    assert events == [('cancelled', 0)]
+    pool.close.assert_awaited_once()
+    assert frontier.pending_count() == 2
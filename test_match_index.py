@@ -0,0 +1,56 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from match_index import BloomFilter, MatchIndex
+from metatft_getdata import MetaTFT
+
+# test_match_index.py
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    keys = [f"TW2_{i}" for i in range(1000)]
+    for key in keys:
+        bloom.add(key)
+    assert all(key in bloom for key in keys)
+    false_positives = sum(f"NA1_{i}" in bloom for i in range(1000))
+    assert false_positives < 50
+
+def test_match_index_persists_across_runs(tmp_path):
+    path = str(tmp_path / 'index.sqlite')
+    index = MatchIndex(path, capacity=100)
+    index.add('TW2_1', {'players': [{'name': 'A'}]})
+    index.close()
+
+    index = MatchIndex(path, capacity=100)
+    assert 'TW2_1' in index
+    assert 'TW2_2' not in index
+    assert index.get_shared('TW2_1') == {'players': [{'name': 'A'}]}
+
+@pytest.mark.asyncio
+async def test_known_match_skips_shared_tabs(tmp_path):
+    index = MatchIndex(str(tmp_path / 'index.sqlite'), capacity=100)
+    index.add('match123', {'players': [{'name': 'A'}]})
+    tft = MetaTFT(tabs={'players', 'timeline'}, match_index=index)
+    tft.rate_limiter = MagicMock(acquire=AsyncMock())
+
+    tabs = [MagicMock(text_content=AsyncMock(return_value=name), click=AsyncMock()) for name in ('Players', 'Timeline')]
+    match_container = MagicMock(
+        query_selector_all=AsyncMock(return_value=tabs),
+        query_selector=AsyncMock(return_value=MagicMock(inner_html=AsyncMock(return_value=''))))
+    mock_page = AsyncMock()
+    mock_page.query_selector.side_effect = [AsyncMock(), match_container]
+
+    async def fake_process_tab_content(tab_name, page, active_tab, content, match_data, fields=None):
+        match_data['timeline'] = {}
+        return match_data
+    tft.process_tab_content = fake_process_tab_content
+
+    result = await tft.get_match_details(mock_page, 'match123')
+
+    tabs[0].click.assert_not_awaited()
+    tabs[1].click.assert_awaited_once()
+    assert result == {'match_id': 'match123', 'timeline': {}, 'players': [{'name': 'A'}]}
+
+    # nothing per-player selected: no expansion at all
+    tft.tabs = {'players'}
+    assert await tft.get_match_details(AsyncMock(), 'match123') == {'match_id': 'match123', 'players': [{'name': 'A'}]}
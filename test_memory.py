@@ -0,0 +1,36 @@
+# test_memory.py
+import pytest
+from memory import MemoryWatermark, rss_mb
+
+
+def test_rss_mb_reads_current_process():
+    rss = rss_mb()
+    assert rss is None or rss > 0
+
+@pytest.mark.asyncio
+async def test_watermark_waits_until_rss_drops():
+    readings = iter([900, 900, 700])
+    watermark = MemoryWatermark(800, interval=0, reader=lambda: next(readings))
+
+    await watermark.wait()
+
+    assert watermark.pauses == 1
+    assert watermark.peak_mb == 900
+
+@pytest.mark.asyncio
+async def test_watermark_gives_up_after_max_pause():
+    now = [0]
+    def clock():
+        now[0] += 10
+        return now[0]
+    watermark = MemoryWatermark(800, interval=0, max_pause=30, reader=lambda: 900, clock=clock)
+
+    await watermark.wait()
+
+    assert watermark.pauses == 1
+
+@pytest.mark.asyncio
+async def test_watermark_passes_below_limit():
+    watermark = MemoryWatermark(800, reader=lambda: 100)
+    await watermark.wait()
+    assert watermark.pauses == 0
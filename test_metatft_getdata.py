@@ -1,5 +1,7 @@
 import pytest
 from unittest.mock import AsyncMock, patch, MagicMock
+import metatft_getdata
+import bench_startup
 from metatft_getdata import MetaTFT
 
 # test_metatft_getdata.py
@@ -26,9 +28,7 @@ async def test_get_match_data_success(monkeypatch):
     # Mock page interactions
     mock_page.goto.return_value = None
     mock_page.wait_for_selector.return_value = AsyncMock()
-    mock_page.query_selector_all.side_effect = [
-        [AsyncMock(get_attribute=AsyncMock(return_value="match123"))],  # .PlayerGame
-    ]
+    mock_page.evaluate.return_value = [{"match_id": "match123"}]  # .PlayerGame cards
     # Patch get_match_details to return dummy match data
     dummy_match_data = {"match_id": "match123"}
     async def fake_get_match_details(page, match_id):
@@ -84,4 +84,121 @@ async def test_get_match_data_goto_exception(monkeypatch):
     result = await tft.get_match_data(riot_id, region)
 
     # Assert
-    assert result is None
\ No newline at end of file
+    assert result is None
+
+@pytest.mark.asyncio
+async def test_get_match_details_clicks_selected_tabs_only():
+    tft = MetaTFT(tabs={'players', 'timeline'})
+    tft.rate_limiter = MagicMock(acquire=AsyncMock())
+
+    def make_tab(name):
+        return MagicMock(text_content=AsyncMock(return_value=name), click=AsyncMock())
+
+    tabs = [make_tab(name) for name in ('Players', 'Personal Summary', 'Timeline', 'Round Detail', 'Shop Analysis')]
+    active_tab = MagicMock(inner_html=AsyncMock(return_value='<div></div>'))
+    match_container = MagicMock(
+        query_selector_all=AsyncMock(return_value=tabs),
+        query_selector=AsyncMock(return_value=active_tab))
+    mock_page = AsyncMock()
+    mock_page.query_selector.side_effect = [AsyncMock(), match_container]
+
+    parsed = []
+    async def fake_process_tab_content(tab_name, page, active_tab, content, match_data, fields=None):
+        parsed.append(tab_name)
+        return match_data
+    tft.process_tab_content = fake_process_tab_content
+
+    result = await tft.get_match_details(mock_page, "match123")
+
+    assert result == {'match_id': 'match123'}
+    assert parsed == ['Players', 'Timeline']
+    for tab in tabs:
+        assert tab.click.await_count == (1 if tab in (tabs[0], tabs[2]) else 0)
+    # stops reading tab names once every selected tab is done
+    tabs[3].text_content.assert_not_awaited()
+
+def test_select_tabs_rejects_unknown_names():
+    assert metatft_getdata.select_tabs(fields=['timeline', 'economy']) == {'timeline', 'personal summary'}
+    with pytest.raises(ValueError):
+        metatft_getdata.select_tabs(fields=['timelines'])
+    with pytest.raises(ValueError):
+        metatft_getdata.select_tabs(tabs=['players'], fields=['player'])
+    with pytest.raises(ValueError):
+        metatft_getdata.select_tabs(tabs=['shop analysis'])
+    with pytest.raises(ValueError):
+        metatft_getdata.select_tabs(tabs=['players'], fields=['timeline'])
+    with pytest.raises(ValueError):
+        metatft_getdata.select_tabs(tabs=['players', 'timeline'], fields=['players'])
+    assert metatft_getdata.select_tabs(tabs=['personal summary'], fields=[metatft_getdata.GRAPH_FIELD]) == {'personal summary'}
+
+@pytest.mark.asyncio
+async def test_process_tab_content_keeps_no_soup_references(monkeypatch):
+    tft = MetaTFT()
+    soups = []
+    original = metatft_getdata.make_soup
+    def tracking_soup(content):
+        soups.append(original(content))
+        return soups[-1]
+    monkeypatch.setattr(metatft_getdata, "make_soup", tracking_soup)
+    html = '<div class="GameSummary"><div class="PlayerTag PlayerTagGood">Fast 8</div></div>'
+
+    match_data = await tft.process_tab_content("Players", None, None, html, {}, {'players_summary'})
+
+    assert match_data['players_summary'] == ['Fast 8:Good']
+    assert soups[0].contents == []
+
+def test_import_does_not_load_heavy_dependencies():
+    assert bench_startup.heavy_modules_loaded("metatft_getdata") == []
+
+@pytest.mark.asyncio
+async def test_list_match_ids_uses_one_evaluate_call():
+    tft = MetaTFT()
+    page = MagicMock(evaluate=AsyncMock(return_value=[{"match_id": "TW2_1", "queue": "Ranked"}, {"match_id": "TW2_2"}]))
+    page.query_selector_all = AsyncMock()
+
+    assert await tft.list_match_ids(page) == ["TW2_1", "TW2_2"]
+    page.evaluate.assert_awaited_once_with(metatft_getdata.MATCH_LIST_JS)
+    page.query_selector_all.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_match_lists_switch_modes_without_reloading_and_cache():
+    tft = MetaTFT()
+    tft.rate_limiter = MagicMock(acquire=AsyncMock())
+    button = MagicMock(click=AsyncMock())
+    page = MagicMock(goto=AsyncMock(), wait_for_selector=AsyncMock(return_value=button), wait_for_timeout=AsyncMock(),
+                     wait_for_function=AsyncMock())
+    page.evaluate = AsyncMock(side_effect=[[{"match_id": "TW2_1"}], [{"match_id": "TW2_2"}]])
+
+    lists = await tft.match_lists(page, "TestName#1234", "tw", ["ranked", "double_up"])
+    assert lists == {"ranked": [{"match_id": "TW2_1"}], "double up": [{"match_id": "TW2_2"}]}
+    page.goto.assert_awaited_once()
+    selectors = [call.args[0] for call in page.wait_for_selector.await_args_list]
+    assert 'button:text-is("Double Up")' in selectors
+    # waits for the list to change rather than for a fixed time
+    page.wait_for_timeout.assert_not_awaited()
+    assert page.wait_for_function.await_args.kwargs['arg'] == ["Double Up", ["TW2_1"]]
+
+    again = await tft.match_lists(page, "TestName#1234", "tw", ["double up"])
+    assert again == {"double up": [{"match_id": "TW2_2"}]}
+    page.goto.assert_awaited_once()
+
+@pytest.mark.asyncio
+async def test_match_lists_prunes_expired_cache_entries():
+    tft = MetaTFT(match_list_ttl=60)
+    tft.match_list_cache = {("Old#1", "tw", "ranked"): (metatft_getdata.time.monotonic() - 120, []),
+                            ("New#1", "tw", "ranked"): (metatft_getdata.time.monotonic(), [{"match_id": "TW2_3"}])}
+
+    assert await tft.match_lists(MagicMock(), "New#1", "tw", ["ranked"]) == {"ranked": [{"match_id": "TW2_3"}]}
+    assert list(tft.match_list_cache) == [("New#1", "tw", "ranked")]
+
+def test_unknown_queue_mode_is_rejected():
+    with pytest.raises(ValueError):
+        MetaTFT(queue_mode="arena")
+
+@pytest.mark.asyncio
+async def test_display_match_history_refuses_a_running_loop():
+    tft = MetaTFT()
+    tft.output_match_history = MagicMock()
+    with pytest.raises(RuntimeError, match="await output_match_history"):
+        tft.display_match_history([{"match_id": "TW2_1"}], write_file=False)
+    tft.output_match_history.assert_not_called()
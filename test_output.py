@@ -0,0 +1,35 @@
+import io
+import pytest
+from metatft_getdata import MetaTFT
+from output import MatchReport, ConsoleSink, FileSink, publish
+
+# test_output.py
+
+
+MATCH = {
+    'match_id': 'TW2_308169786',
+    'players_summary': ['Top 4:none'],
+    'avg_opponent_rank': {'tier': 'emerald', 'division': 'II', 'lp': '10 LP'},
+    'players': [{'placement': '1', 'name': 'TestName', 'tag': '1234', 'traits': [], 'units': []}],
+}
+
+@pytest.mark.asyncio
+async def test_publish_writes_console_and_file(tmp_path):
+    stream = io.StringIO()
+    report = MatchReport(MetaTFT(), MATCH)
+    await publish(report, [ConsoleSink(stream), FileSink(directory=str(tmp_path))])
+
+    assert 'Match ID: TW2_308169786' in stream.getvalue()
+    files = list(tmp_path.iterdir())
+    assert len(files) == 1
+    text = files[0].read_text(encoding='utf-8')
+    assert 'Player: TestName #1234' in text
+    assert '=== Recent Ranked TFT Matches ===' not in text
+
+@pytest.mark.asyncio
+async def test_no_sinks_never_renders():
+    class ExplodingTFT:
+        def render_match(self, match):
+            raise AssertionError("rendered without a sink")
+
+    await publish(MatchReport(ExplodingTFT(), MATCH), [])
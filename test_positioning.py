@@ -0,0 +1,70 @@
+# test_positioning.py
+import numpy as np
+from bs4 import BeautifulSoup
+import positioning
+from positioning import Vocabulary, decode_team_builder, encode_boards
+
+
+def hex_polygon(index, row, col):
+    x = col * 20 + (10 if row % 2 else 0)
+    y = row * 18
+    points = f"{x},{y} {x + 10},{y + 5} {x + 10},{y + 15} {x},{y + 20} {x - 10},{y + 15} {x - 10},{y + 5}"
+    return f'<polygon id="hex-{index}" points="{points}"></polygon>'
+
+def team_builder_html(units):
+    groups = []
+    for row in range(positioning.ROWS):
+        for col in range(positioning.COLS):
+            index = row * positioning.COLS + col
+            unit = units.get((row, col), '')
+            groups.append(f'<g>{hex_polygon(index, row, col)}{unit}</g>')
+    return f'<div class="team-builder"><svg>{"".join(groups)}</svg></div>'
+
+def unit_html(name, star=None, items=()):
+    html = f'<pattern id="mask-TFT13_{name}-0"></pattern>'
+    if star:
+        html += f'<image class="unit-stars-svg" alt="{star} star"></image>'
+    for item in items:
+        html += f'<image class="draggable-unit-item" alt="{item}"></image>'
+    return html
+
+def test_decode_team_builder_reads_units_and_cells():
+    html = team_builder_html({
+        (0, 3): unit_html('Vi', 2, ['Warmog\'s Armor']),
+        (3, 0): unit_html('Jinx', 3, ['Infinity Edge', 'Guinsoo\'s Rageblade']),
+    })
+    soup = BeautifulSoup(html, 'html.parser').find('div', class_='team-builder')
+    units = sorted(decode_team_builder(soup), key=lambda unit: unit['row'])
+
+    assert units == [
+        {'name': 'Vi', 'tier': '2', 'items': ["Warmog's Armor"], 'row': 0, 'col': 3},
+        {'name': 'Jinx', 'tier': '3', 'items': ['Infinity Edge', "Guinsoo's Rageblade"], 'row': 3, 'col': 0},
+    ]
+
+def test_decode_team_builder_empty_board():
+    assert decode_team_builder(None) == []
+
+def test_encode_boards_and_analytics():
+    units = Vocabulary()
+    items = Vocabulary()
+    boards = encode_boards([
+        [{'name': 'Vi', 'tier': '2', 'items': ['Bramble Vest'], 'row': 0, 'col': 1},
+         {'name': 'Jinx', 'tier': '1', 'items': [], 'row': 3, 'col': 6}],
+        [{'name': 'Vi', 'tier': '1', 'items': [], 'row': 0, 'col': 2}],
+    ], units, items)
+
+    assert boards.shape == (2, positioning.CHANNELS, positioning.ROWS, positioning.COLS)
+    assert boards.dtype == np.int16
+    assert boards[0, positioning.UNIT, 0, 1] == units.code('Vi')
+    assert boards[0, positioning.STAR, 0, 1] == 2
+    assert items.name(boards[0, positioning.ITEM1, 0, 1]) == 'Bramble Vest'
+    assert np.allclose(positioning.frontline_share(boards), [0.5, 1.0])
+    assert positioning.corner_usage(boards).tolist() == [True, False]
+    assert positioning.placement_by(positioning.corner_usage(boards), [2, 6]) == (2.0, 6.0)
+
+def test_vocabulary_round_trip(tmp_path):
+    vocabulary = Vocabulary(['Vi', 'Jinx'])
+    vocabulary.save(tmp_path / 'units.json')
+    loaded = Vocabulary.load(tmp_path / 'units.json')
+    assert loaded.code('Jinx') == vocabulary.code('Jinx')
+    assert loaded.name(0) == ''
@@ -0,0 +1,71 @@
+import os
+import sys
+import asyncio
+import pytest
+from profiler import Profiler, ProfiledHandle, selector_key, PLAYWRIGHT, SLEEP, THROTTLE, PARSE
+
+# test_profiler.py
+
+
+class FakeElement:
+    def __init__(self, text):
+        self.text = text
+
+    async def click(self):
+        await asyncio.sleep(0.01)
+
+    async def text_content(self):
+        return self.text
+
+class FakePage:
+    url = 'https://www.metatft.com/player/tw/a-1'
+
+    async def query_selector_all(self, selector):
+        return [FakeElement('Players'), FakeElement('Timeline')]
+
+    async def wait_for_timeout(self, ms):
+        await asyncio.sleep(ms / 1000)
+
+    async def evaluate(self, script, arg=None):
+        return {'arg': arg}
+
+def test_selector_key_merges_match_ids():
+    assert selector_key('query_selector', '#TW2_123456789 .PlayerGameExpandImageContainer') == \
+        'query_selector #<match> .PlayerGameExpandImageContainer'
+
+@pytest.mark.asyncio
+async def test_match_costs_split_by_category():
+    profiler = Profiler()
+    page = profiler.wrap_page(FakePage())
+    with profiler.match('TW2_123456789'):
+        tabs = await page.query_selector_all('#TW2_123456789 .TabSelection')
+        assert all(isinstance(tab, ProfiledHandle) for tab in tabs)
+        with profiler.tab('Players'):
+            await tabs[0].click()
+            await page.wait_for_timeout(20)
+        with profiler.timed(THROTTLE):
+            await asyncio.sleep(0.01)
+        assert await tabs[1].text_content() == 'Timeline'
+        assert page.url == FakePage.url
+        # handles passed back into the page reach it unwrapped
+        assert await page.evaluate('el => el', tabs[0]) == {'arg': tabs[0]._target}
+
+    match = profiler.matches[0]
+    assert match[PLAYWRIGHT] >= 0.01 and match[SLEEP] >= 0.02 and match[THROTTLE] >= 0.01
+    assert match['wall'] == pytest.approx(sum(match[category] for category in (PLAYWRIGHT, SLEEP, THROTTLE, PARSE)))
+    assert 'click #<match> .TabSelection' in profiler.selectors
+    assert profiler.tabs['players'][0] == 1
+
+def test_sampler_writes_folded_stacks(tmp_path):
+    profiler = Profiler(interval=0.001)
+    profiler.start()
+    profiler.sample(sys._getframe())
+    profiler.stop()
+    profiler.write(str(tmp_path))
+
+    with open(os.path.join(tmp_path, 'profile.folded'), encoding='utf-8') as f:
+        lines = f.read().splitlines()
+    assert any('test_sampler_writes_folded_stacks (test_profiler.py' in line for line in lines)
+    assert all(line.rsplit(' ', 1)[1].isdigit() for line in lines)
+    assert os.path.exists(os.path.join(tmp_path, 'report.txt'))
+    assert 'Slowest selectors' in profiler.report()
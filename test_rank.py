@@ -0,0 +1,34 @@
+import numpy as np
+import rank
+from rank import ladder_score, ladder_scores, rank_from_score, lobby_strength, mmr_adjusted_placement, per_tier, lobby_scores
+
+# test_rank.py
+
+
+def test_ladder_scores_vectorized_match_scalar():
+    tiers = np.array(['gold', 'Gold', 'master', 'unranked', 'challenger'])
+    divisions = np.array(['II', '2', '', '', ''])
+    lps = np.array(['10 LP', '10', '0 LP', '', '812 LP'])
+    scores = ladder_scores(tiers, divisions, lps)
+    assert scores.tolist() == [3 * 400 + 200 + 10, 3 * 400 + 200 + 10, 2800, rank.UNKNOWN, 2800 + 812]
+    assert ladder_score({'tier': 'gold', 'division': 'II', 'lp': '10 LP'}) == scores[0]
+    assert ladder_score({'tier': 'unranked'}) is None
+
+def test_rank_from_score_round_trips():
+    for rank_dict in ({'tier': 'emerald', 'division': 'III', 'lp': 42}, {'tier': 'master', 'division': '', 'lp': 120}):
+        assert rank_from_score(ladder_score(rank_dict)) == rank_dict
+    assert rank_from_score(rank.UNKNOWN) is None
+
+def test_lobby_analytics():
+    lobbies, strength = lobby_strength([1000, 1200, -1, 2000], ['a', 'a', 'a', 'b'])
+    assert lobbies.tolist() == ['a', 'b']
+    assert strength.tolist() == [1100, 2000]
+    assert mmr_adjusted_placement([1, 8], [1400, 1000], [1000, 1000]).tolist() == [-1.5, 3.5]
+    unknown = mmr_adjusted_placement([1, 8, 4], [rank.UNKNOWN, 1000, 1000], [1000, rank.UNKNOWN, 1000])
+    assert np.isnan(unknown[:2]).all() and unknown[2] == -0.5
+    means = per_tier([100, 300, 1300, 3500], [2, 4, 5, 1])
+    assert means[0] == 3 and means[3] == 5 and means[rank.APEX_INDEX] == 1
+
+def test_lobby_scores_from_matches():
+    matches = [{'avg_opponent_rank': {'tier': 'diamond', 'division': 'IV', 'lp': '0 LP'}}, {}]
+    assert lobby_scores(matches).tolist() == [6 * 400, rank.UNKNOWN]
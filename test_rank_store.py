@@ -0,0 +1,62 @@
+import numpy as np
+from rank_store import RankStore, ladder_score, parse_played_at, delta_encode, delta_decode, PLAYER, LOBBY
+
+# test_rank_store.py
+
+
+def test_ladder_score_orders_tiers_divisions_and_lp():
+    assert ladder_score({'tier': 'iron', 'division': 'IV', 'lp': '0 LP'}) == 0
+    assert ladder_score({'tier': 'Emerald', 'division': 'I', 'lp': '50 LP'}) == 5 * 400 + 300 + 50
+    assert ladder_score({'tier': 'grandmaster', 'division': '', 'lp': '420 LP'}) == 7 * 400 + 420
+    assert ladder_score({'tier': '', 'lp': '10'}) is None
+
+def test_parse_played_at():
+    assert parse_played_at('12 hours ago', 100000) == 100000 - 12 * 3600
+    assert parse_played_at('a day ago', 100000) == 100000 - 86400
+    assert parse_played_at('', 100000) == 100000
+
+def test_delta_round_trip_per_series():
+    series = np.array([0, 0, 0, 3, 3], dtype=np.int32)
+    values = np.array([100, 130, 90, 2000, 2010], dtype=np.int64)
+    assert delta_decode(series, delta_encode(series, values)).tolist() == values.tolist()
+
+def test_store_range_downsample_and_compact(tmp_path):
+    store = RankStore(str(tmp_path))
+    for i, score in enumerate([1000, 1020, 1050, 1040]):
+        store.append('a#1', PLAYER, i * 3600, score)
+    store.flush()
+    store.add_match({'riot_id': 'a#1', 'summary': {'played_at': '1 hour ago', 'player_rank': {'tier': 'gold', 'division': 'II', 'lp': '10'}},
+                     'avg_opponent_rank': {'tier': 'gold', 'division': 'I', 'lp': '0'}}, now=10 * 3600)
+    store.flush()
+
+    store = RankStore(str(tmp_path))
+    times, scores = store.range('a#1', PLAYER, start=3600, end=2 * 3600)
+    assert times.tolist() == [3600, 7200]
+    assert scores.tolist() == [1020, 1050]
+    assert store.range('a#1', LOBBY)[1].tolist() == [3 * 400 + 300]
+
+    buckets, values = store.downsample('a#1', PLAYER, bucket_seconds=2 * 3600, end=4 * 3600)
+    assert buckets.tolist() == [0, 7200]
+    assert values.tolist() == [1020, 1040]
+    _, means = store.downsample('a#1', PLAYER, bucket_seconds=2 * 3600, end=4 * 3600, how='mean')
+    assert means.tolist() == [1010, 1045]
+
+    store.compact()
+    assert len(list(tmp_path.glob('chunk-*.npz'))) == 1
+    assert RankStore(str(tmp_path)).range('a#1')[1].tolist() == [1000, 1020, 1050, 1040, 3 * 400 + 200 + 10]
+
+def test_points_dedup_on_match_not_time(tmp_path):
+    store = RankStore(str(tmp_path))
+    gold = {'tier': 'gold', 'division': 'IV', 'lp': '0'}
+    silver = {'tier': 'silver', 'division': 'IV', 'lp': '0'}
+    # two unreadable card times land on the same second, but are different matches
+    store.add_match({'riot_id': 'a#1', 'match_id': 'TW2_1', 'summary': {'player_rank': gold}}, now=5000)
+    store.add_match({'riot_id': 'a#1', 'match_id': 'TW2_2', 'summary': {'player_rank': silver}}, now=5000)
+    store.flush()
+    # the same match read again from a result file with a later mtime
+    store.add_match({'riot_id': 'a#1', 'match_id': 'TW2_1', 'summary': {'played_at': '1 hour ago', 'player_rank': gold}}, now=9000)
+    store.flush()
+
+    times, scores = RankStore(str(tmp_path)).range('a#1')
+    assert times.tolist() == [5000, 5000]
+    assert sorted(scores.tolist()) == [ladder_score(silver), ladder_score(gold)]
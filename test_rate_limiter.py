@@ -0,0 +1,44 @@
+import pytest
+import rate_limiter
+from rate_limiter import RateLimiter, FileLockBackend, MemoryBackend
+
+# test_rate_limiter.py
+
+
+def test_memory_backend_reserves_beyond_burst():
+    backend = MemoryBackend()
+    request = [('*', 2.0, 2, 1)]
+    assert backend.reserve(request, now=100.0) == 0
+    assert backend.reserve(request, now=100.0) == 0
+    # bucket empty: third token is available after 1 / rate seconds, fourth after two
+    assert backend.reserve(request, now=100.0) == pytest.approx(0.5)
+    assert backend.reserve(request, now=100.0) == pytest.approx(1.0)
+
+def test_file_backend_shares_budget_between_limiters(tmp_path):
+    path = str(tmp_path / 'rate.json')
+    first = RateLimiter(global_rate=1.0, global_burst=1, backend=FileLockBackend(path))
+    second = RateLimiter(global_rate=1.0, global_burst=1, backend=FileLockBackend(path))
+    requests = first._requests('www.metatft.com', 1)
+    assert first.backend.reserve(requests, now=10.0) == 0
+    assert second.backend.reserve(second._requests('www.metatft.com', 1), now=10.0) == pytest.approx(1.0)
+
+@pytest.mark.asyncio
+async def test_acquire_limits_per_host():
+    limiter = RateLimiter(global_rate=100, global_burst=100, host_rate=1000, host_burst=1,
+                          host_limits={'cdn.metatft.com': (1000, 5)})
+    await limiter.acquire('https://www.metatft.com/player/tw/x')
+    await limiter.acquire('https://www.metatft.com/player/tw/y')
+    assert limiter.waited > 0
+    waited = limiter.waited
+    for _ in range(5):
+        await limiter.acquire('https://cdn.metatft.com/file/a.png')
+    assert limiter.waited == waited
+
+def test_configure_raises_the_host_rate_with_max_rps():
+    try:
+        limiter = rate_limiter.configure_rate_limiter(global_rate=4)
+        assert (limiter.global_rate, limiter.host_rate) == (4, 4)
+        limiter = rate_limiter.configure_rate_limiter(global_rate=4, host_rate=2)
+        assert limiter.host_rate == 2
+    finally:
+        rate_limiter._default_limiter = None
@@ -0,0 +1,82 @@
+import asyncio
+import pytest
+from resilience import Backoff, CircuitBreaker, AdaptiveTimeout, Resilience, RetryBudgetExceeded, CircuitOpenError
+
+# test_resilience.py
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+    def __call__(self):
+        return self.now
+
+def test_circuit_breaker_opens_and_half_opens():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_rate=0.5, window=4, min_calls=4, cooldown=10, clock=clock)
+    for _ in range(2):
+        breaker.record_success()
+        breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+    clock.now = 11
+    assert breaker.allow()          # probe
+    assert not breaker.allow()      # only one probe at a time
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+def test_adaptive_timeout_tracks_observed_durations():
+    timeout = AdaptiveTimeout(initial_ms=30000, min_ms=1000, max_ms=60000)
+    for _ in range(20):
+        timeout.observe(2000)
+    assert timeout.current() < 5000
+    timeout.expired()
+    assert timeout.current() >= 2 * 2000
+
+@pytest.mark.asyncio
+async def test_resilience_call_respects_player_budget():
+    resilience = Resilience(attempts=5, backoff=Backoff(base=0), player_retries=1)
+    calls = []
+
+    async def failing(timeout):
+        calls.append(timeout)
+        raise Exception("Network error")
+
+    with pytest.raises(RetryBudgetExceeded):
+        await resilience.call('navigation', failing, 'tw', resilience.player_budget())
+    assert len(calls) == 2
+
+@pytest.mark.asyncio
+async def test_resilience_call_refuses_open_region():
+    resilience = Resilience(breaker_factory=lambda: CircuitBreaker(min_calls=1, cooldown=60))
+    resilience.breaker('tw').record_failure()
+
+    async def ok(timeout):
+        return 'ok'
+
+    with pytest.raises(CircuitOpenError):
+        await resilience.call('navigation', ok, 'tw')
+    assert await resilience.call('navigation', ok, 'na') == 'ok'
+
+@pytest.mark.asyncio
+async def test_cancelled_probe_lets_the_next_call_probe():
+    clock = FakeClock()
+    resilience = Resilience(breaker_factory=lambda: CircuitBreaker(min_calls=1, cooldown=10, clock=clock))
+    resilience.breaker('tw').record_failure()
+    clock.now = 11
+
+    async def hang(timeout):
+        await asyncio.sleep(10)
+
+    probe = asyncio.create_task(resilience.call('navigation', hang, 'tw'))
+    await asyncio.sleep(0)
+    probe.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await probe
+
+    async def ok(timeout):
+        return 'ok'
+
+    assert await resilience.call('navigation', ok, 'tw') == 'ok'
+    assert resilience.breaker('tw').state == CircuitBreaker.CLOSED
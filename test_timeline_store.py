@@ -0,0 +1,53 @@
+import numpy as np
+from timeline_store import TimelineStore, encode_stage, decode_stage, parse_number
+
+# test_timeline_store.py
+
+
+def stage(level='', gold='', rerolls='', hp=''):
+    return {'level': level, 'gold': gold, 'rerolls': rerolls, 'hp': hp, 'position': '-', 'damage': '', 'scouting': '-'}
+
+def make_store():
+    store = TimelineStore()
+    store.add_timeline('TW2_1', 'A#1', {
+        '2-1': stage(level='4', gold='30', hp='100'),
+        '3-2': stage(level='6', gold='50', hp='90'),
+        '4-1': stage(level='8', gold='10', rerolls='12', hp='70'),
+    })
+    store.add_timeline('TW2_2', 'A#1', {
+        '4-1': stage(gold='50', hp='60'),
+        '2-1': stage(level='4', gold='10', hp='100'),
+        '4-2': stage(level='8', gold='20', rerolls='3', hp='40'),
+    })
+    return store
+
+def test_stage_and_number_encoding():
+    assert encode_stage('3-2') == 302
+    assert encode_stage('1-3') < encode_stage('3-2') < encode_stage('4-1')
+    assert decode_stage(302) == '3-2'
+    assert parse_number('100') == 100
+    assert np.isnan(parse_number('-'))
+
+def test_economy_queries():
+    store = make_store()
+    stages, gold = store.gold_curve()
+    assert list(stages) == [201, 302, 401, 402]
+    assert list(gold) == [20, 50, 30, 20]
+
+    matches, _, stages, rerolls = store.rolldowns(min_rerolls=5, min_gold_spent=20)
+    assert [store.match_ids[m] for m in matches] == ['TW2_1'] and list(stages) == [401]
+
+    _, hp_loss = store.hp_loss_rate()
+    assert np.isnan(hp_loss[0]) and list(hp_loss[1:]) == [10, 30, 20]
+
+    assert sorted(store.level_timing(8)) == [401, 402]
+    assert store.level_timing_percentiles(8, (50,)) == {50: '4-1'}
+
+def test_save_and_load_roundtrip(tmp_path):
+    store = make_store()
+    path = str(tmp_path / 'timelines.npz')
+    store.save(path)
+    loaded = TimelineStore.load(path)
+    assert len(loaded) == 6
+    assert loaded.match_ids == ['TW2_1', 'TW2_2']
+    np.testing.assert_array_equal(loaded.column('hp'), store.column('hp'))
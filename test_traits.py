@@ -0,0 +1,56 @@
+from bs4 import BeautifulSoup
+from metatft_getdata import MetaTFT
+from traits import parse_style, style_url, tier_color, extract_compact_traits, extract_round_traits
+
+# test_traits.py
+
+TRAIT_URL = 'https://cdn.metatft.com/cdn-cgi/image/width=24/file/metatft/traits/bruiser.png'
+
+PLAYER_ROW = f"""
+<div class="PlayerMatch">
+  <div class="TraitCompactContainer gold"><div class="TraitCompactIconContainer"
+       style='background: rgb(1, 2, 3); mask-image: url("{TRAIT_URL}"); mask-size: contain'></div>4</div>
+  <div class="TraitCompactContainer"><div class="TraitCompactIconContainer"
+       style="-webkit-mask-image: url(https://cdn.metatft.com/file/metatft/traits/sniper.png)"></div><span>2</span></div>
+  <div class="TraitCompactContainer"><div class="TraitCompactIconContainer"></div>1</div>
+</div>
+"""
+
+ROUND_BOARD = """
+<div class="PlayerGameTraitContainer PlayerGameTraitContainerPlayer"><div class="PlayerGameTrait">
+  <div class="display-contents"><img class="TraitBG" src="https://cdn.metatft.com/file/metatft/traitbgs/silver.png">
+    <img class="TraitIcon" alt="Bruiser" src="https://cdn.metatft.com/file/metatft/traits/bruiser.png"></div>
+  <div class="display-contents"><img class="TraitTiny" src="https://cdn.metatft.com/file/metatft/traitbgs/bronze.png">
+    <img class="TraitTiny" alt="Sniper" src="https://cdn.metatft.com/file/metatft/traits/sniper.png"></div>
+</div></div>
+"""
+
+
+def test_parse_style_keeps_url_values_whole():
+    style = f'background: rgb(1, 2, 3); mask-image: url("{TRAIT_URL}")'
+    assert parse_style(style)['mask-image'] == f'url("{TRAIT_URL}")'
+    assert parse_style(style) is parse_style(style)
+    assert style_url(style, 'mask-image') == TRAIT_URL
+    assert style_url('color: red', 'mask-image') == ''
+
+def test_tier_color():
+    assert tier_color('TraitCompactContainer gold') == 'gold'
+    assert tier_color('trait_bg_prismatic') == 'prismatic'
+    assert tier_color('golden') == ''
+
+def test_extract_compact_traits():
+    soup = BeautifulSoup(PLAYER_ROW, 'html.parser')
+    assert extract_compact_traits(soup) == [
+        {'name': 'bruiser', 'count': '4', 'tier': 'gold'},
+        {'name': 'sniper', 'count': '2', 'tier': ''},
+    ]
+    assert MetaTFT().extract_traits(soup) == extract_compact_traits(soup)
+
+def test_extract_round_traits():
+    soup = BeautifulSoup(ROUND_BOARD, 'html.parser')
+    assert extract_round_traits(soup) == [
+        {'name': 'Bruiser', 'count': '', 'tier': 'silver'},
+        {'name': 'Sniper', 'count': '', 'tier': 'bronze'},
+    ]
+    assert MetaTFT().round_detail_tab_get_traits(soup) == extract_round_traits(soup)
+    assert MetaTFT().round_detail_tab_get_traits(None) == []
@@ -0,0 +1,69 @@
+import pytest
+from validation import DriftMonitor, SelectorDriftError, field_completeness, OK, WARN, HALT
+
+# test_validation.py
+
+
+GOOD_MATCH = {
+    'match_id': 'TW2_1',
+    'players_summary': ['Fast 8:Good'],
+    'avg_opponent_rank': {'tier': 'diamond'},
+    'players': [{'placement': '1', 'name': 'a', 'level': '9', 'units': [{'name': 'Vi'}], 'traits': ['Bruiser']}],
+}
+
+def broken_match():
+    match = dict(GOOD_MATCH)
+    match['players'] = [{'placement': '1', 'name': 'a', 'level': '9', 'units': [], 'traits': []}]
+    return match
+
+def test_field_completeness_per_field_and_record():
+    metrics = field_completeness(broken_match(), {'players'})
+    assert metrics['players'] == 1.0
+    assert metrics['players.name'] == 1.0
+    assert metrics['players.units'] == 0.0
+    assert 'timeline' not in metrics
+
+def test_field_completeness_respects_field_selection():
+    metrics = field_completeness({'players': []}, {'players'}, fields={'players'})
+    assert metrics == {'players': 0.0}
+
+@pytest.mark.asyncio
+async def test_monitor_halts_after_completeness_collapses():
+    monitor = DriftMonitor(sample_rate=1.0, window=10, min_samples=4, rng=lambda: 0.0)
+    for _ in range(4):
+        monitor.observe(GOOD_MATCH, {'players'})
+    assert monitor.status == OK
+    for _ in range(3):
+        monitor.observe(broken_match(), {'players'})
+    assert monitor.status == WARN
+    for _ in range(3):
+        monitor.observe(broken_match(), {'players'})
+    assert monitor.status == HALT
+    assert monitor.degraded()[0][0] == 'players.units'
+    with pytest.raises(SelectorDriftError):
+        await monitor.gate()
+
+def test_monitor_samples_only_a_fraction_while_healthy():
+    draws = iter([0.5, 0.05, 0.9])
+    monitor = DriftMonitor(sample_rate=0.1, rng=lambda: next(draws))
+    for _ in range(3):
+        monitor.observe(GOOD_MATCH, {'players'})
+    assert monitor.sampled == 1
+
+@pytest.mark.asyncio
+async def test_monitor_warn_action_never_blocks():
+    monitor = DriftMonitor(sample_rate=1.0, min_samples=1, action='warn')
+    monitor.observe(broken_match(), {'players'})
+    assert monitor.status == HALT
+    await monitor.gate()
+
+def test_carousel_rounds_do_not_count_against_team_map():
+    rounds = [{'round': '2-1', 'hp': '100', 'team_map': [{'name': 'Vi'}]},
+              {'round': '2-4', 'hp': '100', 'team_map': []},
+              {'round': '1-1', 'hp': '100', 'team_map': []}]
+    metrics = field_completeness({'round_detail': rounds}, {'round detail'})
+    assert metrics['round_detail.team_map'] == 1.0
+    assert metrics['round_detail.hp'] == 1.0
+
+def test_players_without_traits_are_not_drift():
+    assert 'players.traits' not in field_completeness(broken_match(), {'players'})
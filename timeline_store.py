@@ -0,0 +1,234 @@
+# to run:
+# python timeline_store.py build checkpoints/*.jsonl -o timelines.npz
+# python timeline_store.py stats timelines.npz --level 8
+import os
+import re
+import json
+import glob
+import argparse
+import numpy as np
+
+NUMERIC_COLUMNS = ('level', 'gold', 'rerolls', 'hp', 'position', 'damage', 'scouting')
+NUMBER = re.compile(r'-?\d+(?:\.\d+)?')
+STAGE = re.compile(r'(\d+)\s*-\s*(\d+)')
+
+
+def encode_stage(stage):
+    """'3-2' -> 302, sorts in play order; -1 when the text has no stage"""
+    found = STAGE.search(stage or '')
+    return int(found.group(1)) * 100 + int(found.group(2)) if found else -1
+
+def decode_stage(code):
+    return f"{int(code) // 100}-{int(code) % 100}"
+
+def parse_number(text):
+    """First number in a timeline cell ('100', '4', '2nd', '12s'), NaN for '-' / 'N/A' / empty"""
+    found = NUMBER.search(text or '')
+    return float(found.group()) if found else np.nan
+
+
+class TimelineStore:
+    """
+    Columnar store of timeline rows, one per (match, player, stage).
+
+    Match and player ids are dictionary-encoded to int32 codes, stages to
+    sortable int16 codes (see encode_stage) and the timeline values to
+    float32 with NaN for missing cells. New rows are buffered and
+    concatenated on the next query.
+    """
+
+    def __init__(self):
+        self.match_ids = []
+        self.players = []
+        self._match_codes = {}
+        self._player_codes = {}
+        self.columns = self._empty_columns()
+        self._pending = []
+
+    @staticmethod
+    def _empty_columns():
+        columns = {
+            'match': np.empty(0, dtype=np.int32),
+            'player': np.empty(0, dtype=np.int32),
+            'stage': np.empty(0, dtype=np.int16),
+        }
+        for name in NUMERIC_COLUMNS:
+            columns[name] = np.empty(0, dtype=np.float32)
+        return columns
+
+    def __len__(self):
+        return len(self.columns['stage']) + len(self._pending)
+
+    def _code(self, codes, values, key):
+        if key not in codes:
+            codes[key] = len(values)
+            values.append(key)
+        return codes[key]
+
+    def add_timeline(self, match_id, player, timeline):
+        """Append a `match_data['timeline']` dict (stage -> stage_data)"""
+        match_code = self._code(self._match_codes, self.match_ids, match_id)
+        player_code = self._code(self._player_codes, self.players, player)
+        for stage, stage_data in timeline.items():
+            stage_code = encode_stage(stage)
+            if stage_code < 0:
+                continue
+            self._pending.append((match_code, player_code, stage_code,
+                                  *(parse_number(stage_data.get(name)) for name in NUMERIC_COLUMNS)))
+
+    def add_match(self, match_data, player=None):
+        if match_data and match_data.get('timeline'):
+            self.add_timeline(match_data['match_id'], player or match_data.get('riot_id', ''), match_data['timeline'])
+
+    def compact(self):
+        if not self._pending:
+            return self
+        rows = np.array(self._pending, dtype=np.float64)
+        self._pending = []
+        new = {'match': rows[:, 0].astype(np.int32), 'player': rows[:, 1].astype(np.int32), 'stage': rows[:, 2].astype(np.int16)}
+        for i, name in enumerate(NUMERIC_COLUMNS, 3):
+            new[name] = rows[:, i].astype(np.float32)
+        self.columns = {name: np.concatenate([self.columns[name], new[name]]) for name in self.columns}
+        return self
+
+    def column(self, name):
+        return self.compact().columns[name]
+
+    def save(self, path):
+        self.compact()
+        np.savez_compressed(path, match_ids=np.array(self.match_ids, dtype=str),
+                            players=np.array(self.players, dtype=str), **self.columns)
+
+    @classmethod
+    def load(cls, path):
+        store = cls()
+        with np.load(path) as data:
+            store.match_ids = data['match_ids'].tolist()
+            store.players = data['players'].tolist()
+            store.columns = {name: data[name] for name in store.columns}
+        store._match_codes = {match_id: i for i, match_id in enumerate(store.match_ids)}
+        store._player_codes = {player: i for i, player in enumerate(store.players)}
+        return store
+
+    @classmethod
+    def from_jsonl(cls, paths):
+        """Build from history.py result files (one match_data per line)"""
+        store = cls()
+        for path in paths:
+            default_player = os.path.splitext(os.path.basename(path))[0]
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        match_data = json.loads(line)
+                        store.add_match(match_data, match_data.get('riot_id') or default_player)
+        return store.compact()
+
+    # region queries
+    def _sorted_groups(self):
+        """Row order sorted by (match, player, stage) and a mask of rows that start a new game"""
+        columns = self.compact().columns
+        order = np.lexsort((columns['stage'], columns['player'], columns['match']))
+        game = columns['match'][order].astype(np.int64) << 32 | columns['player'][order]
+        starts = np.ones(len(order), dtype=bool)
+        starts[1:] = game[1:] != game[:-1]
+        return order, game, starts
+
+    def _mean_per_stage(self, values):
+        stages = self.column('stage')
+        unique_stages, inverse = np.unique(stages, return_inverse=True)
+        valid = ~np.isnan(values)
+        sums = np.bincount(inverse[valid], weights=values[valid], minlength=len(unique_stages))
+        counts = np.bincount(inverse[valid], minlength=len(unique_stages))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return unique_stages, sums / counts
+
+    def per_stage(self, column):
+        """(stage codes, mean of `column` per stage), NaN cells ignored"""
+        return self._mean_per_stage(self.column(column))
+
+    def gold_curve(self):
+        return self.per_stage('gold')
+
+    def rolldowns(self, min_rerolls=5, min_gold_spent=20):
+        """
+        Rows where a player rolled at least `min_rerolls` times and their gold
+        dropped by `min_gold_spent` since the previous stage.
+        Returns (match codes, player codes, stage codes, rerolls).
+        """
+        order, _, starts = self._sorted_groups()
+        columns = self.columns
+        gold = columns['gold'][order]
+        rerolls = columns['rerolls'][order]
+        gold_drop = np.zeros(len(order), dtype=np.float32)
+        gold_drop[1:] = gold[:-1] - gold[1:]
+        gold_drop[starts] = np.nan
+        with np.errstate(invalid='ignore'):
+            mask = (rerolls >= min_rerolls) & (gold_drop >= min_gold_spent)
+        picked = order[mask]
+        return columns['match'][picked], columns['player'][picked], columns['stage'][picked], columns['rerolls'][picked]
+
+    def hp_loss(self):
+        """HP lost at every row versus the previous stage of the same game (NaN at game start)"""
+        order, _, starts = self._sorted_groups()
+        hp = self.columns['hp'][order]
+        loss = np.full(len(order), np.nan, dtype=np.float32)
+        loss[1:] = hp[:-1] - hp[1:]
+        loss[starts] = np.nan
+        result = np.empty_like(loss)
+        result[order] = np.clip(loss, 0, None)
+        return result
+
+    def hp_loss_rate(self):
+        """(stage codes, mean HP lost per round at that stage)"""
+        return self._mean_per_stage(self.hp_loss())
+
+    def level_timing(self, level):
+        """Stage code at which each game first reached `level` (games that never did are left out)"""
+        order, game, _ = self._sorted_groups()
+        with np.errstate(invalid='ignore'):
+            reached = self.columns['level'][order] >= level
+        _, first = np.unique(game[reached], return_index=True)
+        return self.columns['stage'][order][reached][first]
+
+    def level_timing_percentiles(self, level, percentiles=(25, 50, 75)):
+        timings = self.level_timing(level)
+        if len(timings) == 0:
+            return {}
+        # 'lower' keeps real stage codes instead of interpolating 3-7 and 4-1 into 3-54
+        values = np.percentile(timings, percentiles, method='lower')
+        return {p: decode_stage(v) for p, v in zip(percentiles, values)}
+    # endregion
+
+
+def argparse_args():
+    parser = argparse.ArgumentParser(description='Columnar timeline store and economy analytics')
+    commands = parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('build', help='Build a store from history result files')
+    build.add_argument('inputs', nargs='+', help='.jsonl files or glob patterns')
+    build.add_argument('-o', '--output', default='timelines.npz', help='Output .npz file')
+    stats = commands.add_parser('stats', help='Print economy statistics of a store')
+    stats.add_argument('store', help='.npz file written by build')
+    stats.add_argument('--level', type=int, default=8, help='Level for the level timing percentiles')
+    return parser.parse_args()
+
+def main():
+    args = argparse_args()
+    if args.command == 'build':
+        paths = sorted({path for pattern in args.inputs for path in glob.glob(pattern)})
+        store = TimelineStore.from_jsonl(paths)
+        store.save(args.output)
+        print(f"{len(store)} rows from {len(store.match_ids)} matches written to {args.output}")
+        return
+
+    store = TimelineStore.load(args.store)
+    print(f"{len(store)} rows, {len(store.match_ids)} matches, {len(store.players)} players")
+    stages, gold = store.gold_curve()
+    _, hp_loss = store.hp_loss_rate()
+    print("stage  avg gold  avg hp loss")
+    for stage, gold_value, loss in zip(stages, gold, hp_loss):
+        print(f"{decode_stage(stage):>5}  {gold_value:8.1f}  {loss:11.1f}")
+    print(f"Rolldowns: {len(store.rolldowns()[0])}")
+    print(f"Level {args.level} timing: {store.level_timing_percentiles(args.level)}")
+
+if __name__ == "__main__":
+    main()
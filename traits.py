@@ -0,0 +1,95 @@
+import re
+from functools import lru_cache
+from types import MappingProxyType
+
+# property: value pairs of an inline style; url(...) values may hold ';' and ':'
+DECLARATION = re.compile(r'([-\w]+)\s*:\s*((?:url\([^)]*\)|[^;])+)')
+URL = re.compile(r'url\(\s*[\'"]?([^\'")]+)[\'"]?\s*\)')
+# trait tier backgrounds, lowest to highest
+TIER_COLORS = ('bronze', 'silver', 'gold', 'prismatic', 'chromatic', 'unique')
+TIER_COLOR = re.compile(r'\b(' + '|'.join(TIER_COLORS) + r')\b', re.IGNORECASE)
+COUNT = re.compile(r'\d+')
+
+COMPACT_CONTAINER = 'TraitCompactContainer'
+COMPACT_ICON = 'TraitCompactIconContainer'
+ROUND_CONTAINER = 'display-contents'
+ROUND_IMAGES = ('TraitBG', 'TraitTiny', 'TraitIcon', 'TraitIconDark')
+
+
+@lru_cache(maxsize=4096)
+def parse_style(style):
+    """Inline style -> read-only {property: value}; parsed once per distinct string"""
+    return MappingProxyType({name.lower(): value.strip() for name, value in DECLARATION.findall(style or '')})
+
+@lru_cache(maxsize=4096)
+def asset_name(url):
+    """'https://.../traits/Bruiser.png?v=2' -> 'Bruiser'"""
+    return url.split('?')[0].rstrip('/').rsplit('/', 1)[-1].rsplit('.', 1)[0]
+
+def style_url(style, *properties):
+    """First url(...) of the given style properties, '' when none is set"""
+    declarations = parse_style(style)
+    for name in properties:
+        found = URL.search(declarations.get(name, ''))
+        if found:
+            return found.group(1)
+    return ''
+
+@lru_cache(maxsize=1024)
+def tier_color(text):
+    """Tier color named in a background URL or class list, '' when there is none"""
+    found = TIER_COLOR.search(text.replace('_', ' ').replace('-', ' '))
+    return found.group(1).lower() if found else ''
+
+def _classes(tag):
+    return tag.get('class') or ()
+
+def _count(text):
+    found = COUNT.search(text)
+    return found.group(0) if found else ''
+
+
+def extract_compact_traits(container):
+    """
+    Traits of a Players tab row: one find_all over the containers and their
+    mask-image icons, in document order, instead of a find per trait.
+    """
+    traits = []
+    current = None
+    for tag in container.find_all('div', class_=[COMPACT_CONTAINER, COMPACT_ICON]):
+        classes = _classes(tag)
+        if COMPACT_CONTAINER in classes:
+            current = {'name': '', 'count': _count(tag.get_text(strip=True)),
+                       'tier': tier_color(' '.join(classes)) or tier_color(style_url(tag.get('style', ''), 'background-image', 'background'))}
+            traits.append(current)
+        elif current is not None and not current['name']:
+            style = tag.get('style', '')
+            url = style_url(style, 'mask-image', '-webkit-mask-image', 'background-image', 'background')
+            if url:
+                current['name'] = asset_name(url)
+            current['tier'] = current['tier'] or tier_color(' '.join(classes)) or tier_color(parse_style(style).get('background', ''))
+    return [trait for trait in traits if trait['name']]
+
+def extract_round_traits(container):
+    """
+    Traits of a Round Detail board: each display-contents block holds a
+    background image (its file name is the tier color) and an icon (alt is
+    the trait name). Read in one find_all over the blocks and their images.
+    """
+    if container is None:
+        return []
+    traits = []
+    current = None
+    for tag in container.find_all(['div', 'img'], class_=[ROUND_CONTAINER, *ROUND_IMAGES]):
+        if tag.name == 'div':
+            current = {'name': '', 'count': _count(tag.get_text(strip=True)), 'tier': ''}
+            traits.append(current)
+            continue
+        if current is None:
+            continue
+        color = tier_color(asset_name(tag.get('src', '')))
+        if color and not current['tier']:
+            current['tier'] = color
+        elif tag.get('alt') and not current['name']:
+            current['name'] = tag['alt']
+    return [trait for trait in traits if trait['name']]
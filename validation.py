@@ -0,0 +1,159 @@
+import re
+import random
+import asyncio
+from collections import deque
+
+# tab -> match_data fields that must be filled whenever the tab was scraped
+TAB_CHECKS = {
+    'players': ('players_summary', 'avg_opponent_rank', 'players'),
+    'personal summary': ('personal_summary', 'stage_breakdown', 'economy', 'planning', 'key_rounds'),
+    'timeline': ('timeline',),
+    'round detail': ('round_detail',),
+}
+# list/dict field -> keys every record in it should have; traits are left out,
+# a board can legitimately have no active trait
+RECORD_CHECKS = {
+    'players': ('placement', 'name', 'level', 'units'),
+    'timeline': ('level', 'gold', 'hp'),
+    'round_detail': ('round', 'hp', 'team_map'),
+}
+MISSING = (None, '', 'N/A', [], {})
+STAGE = re.compile(r'(\d+)-(\d+)')
+
+
+def is_carousel_round(record):
+    """1-1 and every X-4 from stage 2 on are carousels: no board, so no team_map"""
+    found = STAGE.search(str(record.get('round') or ''))
+    if not found:
+        return False
+    stage, round_number = int(found.group(1)), int(found.group(2))
+    return (stage, round_number) == (1, 1) or (stage >= 2 and round_number == 4)
+
+# (field, key) -> records that are exempt from the check
+RECORD_EXEMPT = {
+    ('round_detail', 'team_map'): is_carousel_round,
+}
+
+OK = 'ok'
+WARN = 'warn'
+HALT = 'halt'
+
+
+class SelectorDriftError(Exception):
+    """Raised when sampled matches show the parsers no longer find their fields."""
+
+
+def is_filled(value):
+    return not any(value is missing or value == missing for missing in MISSING)
+
+def _records(value):
+    if isinstance(value, dict):
+        return list(value.values())
+    return value if isinstance(value, list) else []
+
+def field_completeness(match_data, tabs, fields=None):
+    """
+    metric -> share of checks that found data, for the tabs that were scraped.
+    `<field>` is 1.0 or 0.0; `<field>.<key>` is the share of records holding `key`.
+    """
+    metrics = {}
+    for tab in tabs:
+        for field in TAB_CHECKS.get(tab, ()):
+            if fields is not None and field not in fields:
+                continue
+            value = match_data.get(field)
+            metrics[field] = 1.0 if is_filled(value) else 0.0
+            records = [record for record in _records(value) if isinstance(record, dict)]
+            for key in RECORD_CHECKS.get(field, ()):
+                exempt = RECORD_EXEMPT.get((field, key))
+                checked = [record for record in records if not (exempt and exempt(record))]
+                if checked:
+                    metrics[f"{field}.{key}"] = sum(is_filled(record.get(key)) for record in checked) / len(checked)
+    return metrics
+
+
+class DriftMonitor:
+    """
+    Field completeness over a rolling window of sampled matches.
+
+    A `sample_rate` fraction of matches is checked. Each check adds one
+    completeness value per metric to a `window`-long history. Once a metric
+    has `min_samples` values and its mean drops under `warn_below`, every
+    match is sampled until it recovers. Under `halt_below` the monitor acts:
+    'halt' makes gate() raise SelectorDriftError, 'throttle' makes gate()
+    wait `throttle_delay` seconds per match, and 'warn' only reports.
+    """
+
+    def __init__(self, sample_rate=0.1, window=50, min_samples=10, warn_below=0.9, halt_below=0.5,
+                 action=HALT, throttle_delay=60, rng=random.random):
+        self.sample_rate = sample_rate
+        self.window = window
+        self.min_samples = min_samples
+        self.warn_below = warn_below
+        self.halt_below = halt_below
+        self.action = action
+        self.throttle_delay = throttle_delay
+        self.rng = rng
+        self.history = {}
+        self.sampled = 0
+        self.status = OK
+
+    def should_sample(self):
+        return self.status != OK or self.rng() < self.sample_rate
+
+    def observe(self, match_data, tabs, fields=None):
+        """Check a scraped match (when sampled) and return the new status"""
+        if match_data is None or not self.should_sample():
+            return self.status
+        self.sampled += 1
+        for metric, value in field_completeness(match_data, tabs, fields).items():
+            self.history.setdefault(metric, deque(maxlen=self.window)).append(value)
+        previous = self.status
+        self.status = self._status()
+        if self.status != previous:
+            self.report()
+        return self.status
+
+    def metrics(self):
+        """metric -> rolling completeness, only for metrics with enough samples"""
+        return {metric: sum(values) / len(values)
+                for metric, values in self.history.items() if len(values) >= self.min_samples}
+
+    def degraded(self):
+        """(metric, completeness) under warn_below, worst first"""
+        return sorted(((metric, rate) for metric, rate in self.metrics().items() if rate < self.warn_below),
+                      key=lambda item: item[1])
+
+    def _status(self):
+        degraded = self.degraded()
+        if not degraded:
+            return OK
+        return HALT if degraded[0][1] < self.halt_below else WARN
+
+    def report(self):
+        degraded = self.degraded()
+        if not degraded:
+            print(f"[drift] field completeness back to normal after {self.sampled} sampled matches")
+            return
+        details = ', '.join(f"{metric} {rate:.0%}" for metric, rate in degraded)
+        print(f"[drift] {self.status}: {details} (over the last {self.window} sampled matches)")
+
+    async def gate(self):
+        """Called before each match: stop or slow the crawl while fields are missing"""
+        if self.status != HALT:
+            return
+        if self.action == HALT:
+            details = ', '.join(f"{metric} {rate:.0%}" for metric, rate in self.degraded())
+            raise SelectorDriftError(f"Selector drift, crawl halted: {details}")
+        if self.action == 'throttle':
+            await asyncio.sleep(self.throttle_delay)
+
+
+def add_drift_arguments(parser):
+    parser.add_argument('--validate-sample', type=float, default=0.1, help='Fraction of matches checked for missing fields (0 disables)')
+    parser.add_argument('--on-drift', choices=(HALT, 'throttle', 'warn'), default=HALT, help='What to do when field completeness collapses')
+
+def drift_monitor_from_args(args):
+    if not args.validate_sample:
+        return None
+    return DriftMonitor(sample_rate=args.validate_sample, action=args.on_drift)